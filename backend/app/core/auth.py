@@ -1,3 +1,7 @@
+import hashlib
+import os
+import secrets
+import uuid
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
@@ -7,42 +11,49 @@ from app.models.user import User
 from app.core.database import get_db
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from passlib.context import CryptContext
+from app.core.denylist import token_denylist
+from app.core.loader import loaders_for
+from app.core.passwords import verify_password
 
 # Security settings for JWT authentication
 SECRET_KEY = "supersecretkey"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 class TokenData(BaseModel):
     username: str | None = None
     
 FAKE_USER = {"username": "admin", "password": "1234"}
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
 def authenticate_user(user: User, password: str) -> bool:
     return verify_password(password, user.hashed_password)
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
+    # jti identifies the token so it can be revoked before it expires
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+def generate_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+def hash_refresh_token(token: str) -> str:
+    # Refresh tokens are 256 random bits rather than guessable passwords, so a plain
+    # SHA-256 is enough to protect them at rest and keeps refreshing cheap.
+    return hashlib.sha256(token.encode()).hexdigest()
+
+async def get_user_from_token(token: str | None, db: AsyncSession) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token inválido",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if not token:
+        raise credentials_exception
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -51,8 +62,34 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
+    jti = payload.get("jti")
+    if jti and await token_denylist.is_revoked(db, jti):
+        raise credentials_exception
+
     result = await db.execute(select(User).where(User.username == username))
     user = result.scalar_one_or_none()
     if user is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+    # Requests mostly enrich their results with the current user's name
+    loaders_for(db).users.prime(user.id, user)
+    return user
+
+async def revoke_token(token: str, db: AsyncSession) -> dict | None:
+    """
+    Revoke an access token until it expires and return its claims. Returns None if
+    the token is invalid or predates token IDs and so can't be revoked.
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    if not payload.get("jti"):
+        return None
+    await token_denylist.revoke(db, payload["jti"], datetime.utcfromtimestamp(payload["exp"]))
+    return payload
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    return await get_user_from_token(token, db)
@@ -0,0 +1,27 @@
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+
+class StartupTimer:
+    """Measures how long each startup phase takes, so slow boots can be traced to a phase."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started
+
+    def mark(self, name: str):
+        """Record a phase that ran from the timer's creation until now."""
+        self.phases[name] = time.perf_counter() - self.started
+
+    def report(self) -> str:
+        phases = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.phases.items())
+        return f"{phases} (total {time.perf_counter() - self.started:.3f}s)"
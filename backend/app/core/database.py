@@ -1,18 +1,25 @@
+import hashlib
 import os
+import warnings
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.schema import CreateIndex, CreateTable
 from sqlalchemy.orm import sessionmaker
 from app.models.base import Base
 from app.models.user import User
 from app.models.task import Task
+from app.models.schema_version import SchemaVersion
 from dotenv import load_dotenv
-from passlib.context import CryptContext
-from sqlalchemy import select
-
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from sqlalchemy import delete, select
 
 load_dotenv()
 
+# bcrypt hash of the default admin password (admin123), computed ahead of time so
+# booting never spends CPU on hashing. Deployments can provide their own. If it
+# doesn't match the hashing policy it is replaced on the admin's first login.
+DEFAULT_ADMIN_PASSWORD_HASH = "$2b$12$.WXjw0Kg3A6I28rrVmUcGO6W3QwkfO0g4yTJN.56pELJHM.iH8IZC"
+ADMIN_PASSWORD_HASH = os.getenv("ADMIN_PASSWORD_HASH", DEFAULT_ADMIN_PASSWORD_HASH)
+
 USE_SQLITE = os.getenv("USE_SQLITE", "false").lower() == "true"
 DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -27,9 +34,76 @@ AsyncSessionLocal = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
 
-async def init_db():
-    async with engine.begin() as conn:
+def schema_fingerprint(dialect) -> str:
+    """Hash of the DDL the models compile to, which changes whenever the models do."""
+    ddl = []
+    for table in Base.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        ddl.extend(sorted(str(CreateIndex(index).compile(dialect=dialect)) for index in table.indexes))
+    return hashlib.sha256("\n".join(ddl).encode()).hexdigest()
+
+def missing_schema_objects(connection) -> list:
+    """
+    Columns, indexes and constraints the models declare but the database lacks.
+    create_all only adds whole tables, so these can only come from an Alembic migration.
+    """
+    # Alembic is only needed when the fingerprint has changed, so keep it off the boot path
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+
+    context = MigrationContext.configure(
+        connection, opts={"include_name": lambda name, type_, parents: type_ != "table" or name in Base.metadata.tables}
+    )
+    with warnings.catch_warnings():
+        # SQLite can't reflect the expression indexes; they are skipped either way
+        warnings.simplefilter("ignore")
+        diffs = compare_metadata(context, Base.metadata)
+    missing = []
+    for diff in diffs:
+        if isinstance(diff, tuple) and diff[0] == "add_column":
+            missing.append(f"{diff[2]}.{diff[3].name}")
+        elif isinstance(diff, tuple) and diff[0].startswith("add_"):
+            missing.append(diff[1].name)
+    return missing
+
+async def init_db(bind=None):
+    """
+    Create any missing tables and record the schema's fingerprint. Tables that already
+    exist are left as they are, so if they lack part of the models' schema nothing is
+    recorded and a RuntimeError asks for the migrations instead.
+    """
+    bind = bind or engine
+    async with bind.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        missing = await conn.run_sync(missing_schema_objects)
+        if missing:
+            raise RuntimeError(
+                f"Database schema is behind the models (missing: {', '.join(missing)}); "
+                "run `alembic upgrade head` (make db-migrate)"
+            )
+        await conn.execute(delete(SchemaVersion))
+        await conn.execute(
+            SchemaVersion.__table__.insert().values(id=1, fingerprint=schema_fingerprint(bind.dialect))
+        )
+
+async def ensure_schema(bind=None) -> bool:
+    """
+    Create the schema only if the version table doesn't already record the current
+    one, so a routine boot costs one query instead of create_all's per-table checks.
+    Returns True if the schema was (re)created; raises like init_db if it needs migrating.
+    """
+    bind = bind or engine
+    try:
+        async with bind.connect() as conn:
+            current = (await conn.execute(select(SchemaVersion.fingerprint).where(SchemaVersion.id == 1))).scalar()
+    except DBAPIError:
+        # The version table doesn't exist yet
+        current = None
+
+    if current == schema_fingerprint(bind.dialect):
+        return False
+    await init_db(bind)
+    return True
 
 async def get_db():
     async with AsyncSessionLocal() as session:
@@ -40,12 +114,11 @@ async def create_admin():
         result = await session.execute(select(User).where(User.username == 'admin'))
         existing = result.scalar_one_or_none()
         if not existing:
-            hashed_password = pwd_context.hash('admin123')
             admin = User(
                 username='admin',
                 email='admin@example.com',
                 full_name='Admin User',
-                hashed_password=hashed_password,
+                hashed_password=ADMIN_PASSWORD_HASH,
                 is_active=True,
                 type='admin'
             )
@@ -0,0 +1,60 @@
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.token import RefreshTokenRepository, RevokedTokenRepository
+
+TOKEN_DENYLIST_SYNC_SECONDS = float(os.getenv("TOKEN_DENYLIST_SYNC_SECONDS", "5"))
+
+
+class TokenDenylist:
+    """
+    IDs (jti) of revoked access tokens, kept in memory as an expiring set and persisted
+    in revoked_tokens so every worker shares them.
+
+    Checking a token is a dict lookup. Each worker reloads the set at most once per
+    sync_interval, so a logout through another worker takes effect within that interval
+    and one through this worker immediately. The set only holds tokens that haven't
+    expired yet, so it stays small.
+    """
+
+    def __init__(self, sync_interval: float = TOKEN_DENYLIST_SYNC_SECONDS):
+        self.sync_interval = sync_interval
+        self._entries: Dict[str, datetime] = {}
+        self._synced_at: Optional[float] = None
+
+    def _is_stale(self) -> bool:
+        return self._synced_at is None or time.monotonic() - self._synced_at >= self.sync_interval
+
+    async def sync(self, db: AsyncSession) -> None:
+        # Mark as synced first so concurrent requests don't all reload at once
+        self._synced_at = time.monotonic()
+        now = datetime.utcnow()
+        entries = await RevokedTokenRepository(db).get_active_revoked_tokens_in_db(now)
+        # Keep local revocations the reload may have raced with
+        entries.update({jti: expires_at for jti, expires_at in self._entries.items() if expires_at > now})
+        self._entries = entries
+
+    async def revoke(self, db: AsyncSession, jti: str, expires_at: datetime) -> None:
+        self._entries[jti] = expires_at
+        await RevokedTokenRepository(db).add_revoked_token_in_db(jti, expires_at)
+
+    async def is_revoked(self, db: AsyncSession, jti: str) -> bool:
+        if self._is_stale():
+            await self.sync(db)
+        expires_at = self._entries.get(jti)
+        return expires_at is not None and expires_at > datetime.utcnow()
+
+
+async def prune_expired_tokens(db: AsyncSession) -> None:
+    """Delete revoked and refresh tokens past their expiry, which no check needs anymore."""
+    # Logouts are rare, which makes them a cheap moment to drop rows nobody needs
+    now = datetime.utcnow()
+    await RevokedTokenRepository(db).delete_expired_revoked_tokens_in_db(now)
+    await RefreshTokenRepository(db).delete_expired_refresh_tokens_in_db(now)
+
+
+token_denylist = TokenDenylist()
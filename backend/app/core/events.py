@@ -0,0 +1,136 @@
+import asyncio
+import json
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set
+
+# In-process pub/sub for task and comment change events.
+# Services publish after their write has been committed; the SSE and WebSocket
+# endpoints subscribe.
+
+EVENT_HISTORY_SIZE = 1000
+SUBSCRIBER_BUFFER_SIZE = 100
+
+
+def task_topic(task_id: int) -> str:
+    """Topic carrying the changes of a single task and its comments."""
+    return f"task:{task_id}"
+
+
+@dataclass
+class Event:
+    id: int
+    type: str
+    data: Any
+    topic: Optional[str] = None
+
+    def encode(self) -> str:
+        """Serialize the event in Server-Sent Events wire format."""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+    def to_message(self) -> dict:
+        return {"id": self.id, "type": self.type, "data": self.data}
+
+
+@dataclass(eq=False)
+class Subscriber:
+    queue: asyncio.Queue
+    # None subscribes to every event, otherwise only to events of that topic
+    topic: Optional[str] = None
+    # Events missed before subscribing (Last-Event-ID resume), delivered first
+    backlog: List[Event] = field(default_factory=list)
+    overflowed: bool = False
+
+    async def next_event(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Return the next event, or None if nothing arrived within timeout."""
+        if self.backlog:
+            return self.backlog.pop(0)
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def process_epoch() -> int:
+    """Microseconds since the Unix epoch: a restarted process numbers its events above the last one's."""
+    return time.time_ns() // 1000
+
+
+class EventBroker:
+    """
+    Event ids count up from the epoch the broker was created at, so they don't restart
+    at 0 with the process. A Last-Event-ID this broker can't have issued, one from a
+    previous process or another worker, gets a resync rather than a silent gap.
+    """
+
+    def __init__(
+        self,
+        history_size: int = EVENT_HISTORY_SIZE,
+        buffer_size: int = SUBSCRIBER_BUFFER_SIZE,
+        epoch: Optional[int] = None,
+    ):
+        self.buffer_size = buffer_size
+        self._history: Deque[Event] = deque(maxlen=history_size)
+        # Subscribers indexed by topic (None for the firehose), so publishing only
+        # touches the subscribers that care and idle topics cost nothing
+        self._subscribers: Dict[Optional[str], Set[Subscriber]] = defaultdict(set)
+        self._epoch = process_epoch() if epoch is None else epoch
+        self._last_id = self._epoch
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, event_type: str, data: Any, topic: Optional[str] = None) -> Event:
+        """
+        Record an event and hand it to the firehose and topic subscribers without blocking.
+        A subscriber whose buffer is full is dropped instead of slowing down the
+        publisher; its client can reconnect and resume with Last-Event-ID.
+        """
+        self._last_id += 1
+        event = Event(id=self._last_id, type=event_type, data=data, topic=topic)
+        self._history.append(event)
+
+        targets = list(self._subscribers.get(None, ()))
+        if topic is not None:
+            targets.extend(self._subscribers.get(topic, ()))
+        for subscriber in targets:
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscriber.overflowed = True
+                self.unsubscribe(subscriber)
+        return event
+
+    def subscribe(self, last_event_id: Optional[int] = None, topic: Optional[str] = None) -> Subscriber:
+        """
+        Register a subscriber, to every event or to a single topic. With last_event_id,
+        matching events published after it that are still in the history are replayed
+        first. If the history no longer reaches back that far, or last_event_id wasn't
+        issued by this broker, a "resync" event tells the client to reload its state.
+        """
+        subscriber = Subscriber(queue=asyncio.Queue(maxsize=self.buffer_size), topic=topic)
+        if last_event_id is not None:
+            missed = [
+                event for event in self._history
+                if event.id > last_event_id and (topic is None or event.topic == topic)
+            ]
+            oldest_kept = self._history[0].id if self._history else self._last_id + 1
+            foreign = last_event_id < self._epoch or last_event_id > self._last_id
+            if foreign or last_event_id < oldest_kept - 1:
+                subscriber.backlog.append(Event(id=last_event_id, type="resync", data={}, topic=topic))
+            subscriber.backlog.extend(missed)
+        self._subscribers[topic].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscribers = self._subscribers.get(subscriber.topic)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[subscriber.topic]
+
+
+event_broker = EventBroker()
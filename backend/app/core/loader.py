@@ -0,0 +1,120 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.comment import Comment
+from app.models.task import Task
+from app.models.user import User
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Loads the values of a batch of keys; keys without a value are left out
+BatchFunction = Callable[[List[K]], Awaitable[Dict[K, V]]]
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Batches and memoizes lookups by key.
+
+    load() calls made in the same event loop tick are merged into one call of
+    batch_fn, i.e. a single IN (...) query, which runs once the tick is over.
+    Every key is looked up at most once: later loads get the memoized value
+    (None for a missing key) until clear() forgets it.
+    """
+
+    def __init__(self, batch_fn: BatchFunction):
+        self.batch_fn = batch_fn
+        self._futures: Dict[K, asyncio.Future] = {}
+        # Keys waiting for the next batch, each with the future its loads await
+        self._pending: List[Tuple[K, asyncio.Future]] = []
+        self._dispatches: Set[asyncio.Task] = set()
+
+    def load(self, key: K) -> "asyncio.Future[Optional[V]]":
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[key] = loop.create_future()
+            if not self._pending:
+                loop.call_soon(self._schedule_dispatch)
+            self._pending.append((key, future))
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        """Memoize a value the caller already has, so loading it costs no query."""
+        if key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._futures[key] = future
+
+    def clear(self, key: K) -> None:
+        """Forget a key after a write changed it, so the next load reads it again."""
+        self._futures.pop(key, None)
+
+    def _schedule_dispatch(self) -> None:
+        task = asyncio.ensure_future(self._dispatch())
+        # Keep a reference so the batch isn't garbage collected while it runs
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self) -> None:
+        # The futures are taken from the batch itself rather than the memo, which
+        # clear() may have emptied, or refilled for a key loaded again, in the meantime
+        pending, self._pending = self._pending, []
+        keys = list(dict.fromkeys(key for key, _ in pending))
+        try:
+            values = await self.batch_fn(keys)
+        except Exception as exc:
+            # Nothing is memoized for a failed batch
+            for key, future in pending:
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for key, future in pending:
+            if not future.done():
+                future.set_result(values.get(key))
+
+
+class Loaders:
+    """
+    The loaders of one database session, i.e. of one request. They share the
+    session, which runs one statement at a time, so their batches take turns.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._lock = asyncio.Lock()
+        self.users: DataLoader[int, User] = DataLoader(self._by_id(User))
+        self.tasks: DataLoader[int, Task] = DataLoader(self._by_id(Task))
+        self.comments: DataLoader[int, Comment] = DataLoader(
+            self._by_id(Comment, selectinload(Comment.created_by_user))
+        )
+
+    def _by_id(self, model, *options) -> BatchFunction:
+        async def batch(ids: List[int]) -> Dict[int, object]:
+            async with self._lock:
+                result = await self.db.execute(
+                    select(model)
+                    .where(model.id.in_(ids))
+                    .options(*options)
+                    # Objects already in the session get the current values
+                    .execution_options(populate_existing=True)
+                )
+                return {row.id: row for row in result.scalars().all()}
+        return batch
+
+
+def loaders_for(db: AsyncSession) -> Loaders:
+    """The loaders of a session, created on first use and kept for its lifetime."""
+    loaders = db.info.get("loaders")
+    if loaders is None:
+        loaders = db.info["loaders"] = Loaders(db)
+    return loaders
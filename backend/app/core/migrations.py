@@ -0,0 +1,99 @@
+import os
+import time
+from typing import Optional, Sequence
+
+from alembic import op
+from sqlalchemy import Column, inspect, text
+
+# Helpers for migrations that must not take the application down.
+MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "1000"))
+MIGRATION_BATCH_PAUSE_SECONDS = float(os.getenv("MIGRATION_BATCH_PAUSE_SECONDS", "0.1"))
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def add_column_if_missing(table_name: str, column: Column) -> bool:
+    """
+    Add a column unless it is already there, e.g. on a database built by create_all.
+    SQLite has no ADD COLUMN IF NOT EXISTS, so the table is inspected instead.
+    """
+    existing = {c["name"] for c in inspect(op.get_bind()).get_columns(table_name)}
+    if column.name in existing:
+        return False
+    op.add_column(table_name, column)
+    return True
+
+
+def create_index_online(index_name: str, table_name: str, columns: Sequence[str], **kw) -> None:
+    """
+    Create an index without blocking writes to the table.
+    On Postgres it is built with CREATE INDEX CONCURRENTLY, which can't run inside a
+    transaction. An INVALID index left by an interrupted build is dropped first,
+    because IF NOT EXISTS would otherwise keep it.
+    """
+    if not _is_postgres():
+        op.create_index(index_name, table_name, columns, if_not_exists=True, **kw)
+        return
+
+    with op.get_context().autocommit_block():
+        invalid = op.get_bind().execute(
+            text(
+                "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {"name": index_name},
+        ).first()
+        if invalid:
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+        op.create_index(
+            index_name, table_name, columns, if_not_exists=True, postgresql_concurrently=True, **kw
+        )
+
+
+def drop_index_online(index_name: str, table_name: str) -> None:
+    if not _is_postgres():
+        op.drop_index(index_name, table_name=table_name, if_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index(index_name, table_name=table_name, if_exists=True, postgresql_concurrently=True)
+
+
+def backfill_in_batches(
+    table_name: str,
+    set_clause: str,
+    batch_size: Optional[int] = None,
+    pause_seconds: Optional[float] = None,
+) -> int:
+    """
+    Run UPDATE <table_name> SET <set_clause> over the whole table, walking it by
+    primary key in batches. Every batch commits on its own and is followed by a
+    pause, so the backfill only ever holds a few row locks and leaves capacity
+    for application traffic.
+    Returns the number of rows processed.
+    """
+    batch_size = batch_size or MIGRATION_BATCH_SIZE
+    pause_seconds = MIGRATION_BATCH_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+    bind = op.get_bind()
+
+    processed = 0
+    last_id = 0
+    with op.get_context().autocommit_block():
+        while True:
+            ids = bind.execute(
+                text(f"SELECT id FROM {table_name} WHERE id > :last_id ORDER BY id LIMIT :limit"),
+                {"last_id": last_id, "limit": batch_size},
+            ).scalars().all()
+            if not ids:
+                break
+
+            bind.execute(
+                text(f"UPDATE {table_name} SET {set_clause} WHERE id >= :first_id AND id <= :last_id"),
+                {"first_id": ids[0], "last_id": ids[-1]},
+            )
+            processed += len(ids)
+            last_id = ids[-1]
+            time.sleep(pause_seconds)
+    return processed
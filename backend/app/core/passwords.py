@@ -0,0 +1,137 @@
+"""
+Password hashing policy: python -m app.core.passwords --target-ms 250
+
+Every password is hashed and verified through the one CryptContext built here. The
+scheme and its cost are read from the environment:
+
+- PASSWORD_HASH_SCHEME: bcrypt (default) or argon2, which needs argon2-cffi.
+- PASSWORD_BCRYPT_ROUNDS: bcrypt cost factor (default 12).
+- PASSWORD_ARGON2_TIME_COST, PASSWORD_ARGON2_MEMORY_COST (KiB) and
+  PASSWORD_ARGON2_PARALLELISM: argon2id parameters.
+
+Hashes made with another scheme or cost keep verifying, and are flagged by
+needs_update so they are replaced with the current policy on the next successful
+login. Running the module measures verify latency on this machine and prints the
+settings that come closest to the target without exceeding it.
+"""
+import argparse
+import os
+import statistics
+import time
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+SUPPORTED_SCHEMES = ("bcrypt", "argon2")
+
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")
+PASSWORD_BCRYPT_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", "3"))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", "65536"))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", "4"))
+
+
+def build_password_context(
+    scheme: str = PASSWORD_HASH_SCHEME,
+    bcrypt_rounds: int = PASSWORD_BCRYPT_ROUNDS,
+    argon2_time_cost: int = PASSWORD_ARGON2_TIME_COST,
+    argon2_memory_cost: int = PASSWORD_ARGON2_MEMORY_COST,
+    argon2_parallelism: int = PASSWORD_ARGON2_PARALLELISM,
+) -> CryptContext:
+    if scheme not in SUPPORTED_SCHEMES:
+        raise ValueError(f"Unsupported password hash scheme {scheme!r}, expected one of {SUPPORTED_SCHEMES}")
+
+    # The other scheme stays verifiable but deprecated, so switching rehashes on login
+    schemes = [scheme] + [other for other in SUPPORTED_SCHEMES if other != scheme]
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        # Pinning min and max to the configured cost makes needs_update flag hashes
+        # made with a different cost, whether it was raised or lowered
+        bcrypt__rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__type="ID",
+        argon2__rounds=argon2_time_cost,
+        argon2__min_rounds=argon2_time_cost,
+        argon2__max_rounds=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+pwd_context = build_password_context()
+
+
+def hash_password(plain: str) -> str:
+    return pwd_context.hash(plain)
+
+
+def verify_password(plain: str, hashed: str) -> bool:
+    return pwd_context.verify(plain, hashed)
+
+
+def verify_and_update_password(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and, when its hash doesn't follow the current policy, hash it again.
+    :return: Whether the password matched, and the replacement hash if one is needed.
+    """
+    return pwd_context.verify_and_update(plain, hashed)
+
+
+def measure_verify_ms(context: CryptContext, samples: int = 3) -> float:
+    """Median time in milliseconds to verify a password against a hash made by context."""
+    hashed = context.hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.verify("calibration-password", hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(scheme: str, target_ms: float, samples: int = 3, max_cost: int = 31) -> Tuple[dict, float]:
+    """
+    Find the highest cost whose verify latency stays within target_ms on this machine.
+    bcrypt tunes its rounds; argon2 tunes its time cost at the configured memory cost
+    and parallelism. The lowest cost is returned when even that exceeds the target.
+    :return: The settings as environment variables, and their measured verify latency.
+    """
+    if scheme == "bcrypt":
+        setting, cost, first = "PASSWORD_BCRYPT_ROUNDS", "bcrypt_rounds", 4
+    elif scheme == "argon2":
+        setting, cost, first = "PASSWORD_ARGON2_TIME_COST", "argon2_time_cost", 1
+    else:
+        raise ValueError(f"Unsupported password hash scheme {scheme!r}, expected one of {SUPPORTED_SCHEMES}")
+
+    best_value, best_ms = first, None
+    for value in range(first, max_cost + 1):
+        elapsed_ms = measure_verify_ms(build_password_context(scheme, **{cost: value}), samples)
+        if best_ms is not None and elapsed_ms > target_ms:
+            break
+        best_value, best_ms = value, elapsed_ms
+        if elapsed_ms > target_ms:
+            break
+
+    settings = {"PASSWORD_HASH_SCHEME": scheme, setting: best_value}
+    if scheme == "argon2":
+        settings["PASSWORD_ARGON2_MEMORY_COST"] = PASSWORD_ARGON2_MEMORY_COST
+        settings["PASSWORD_ARGON2_PARALLELISM"] = PASSWORD_ARGON2_PARALLELISM
+    return settings, best_ms
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Pick password hashing parameters for a target verify latency.")
+    parser.add_argument("--scheme", choices=SUPPORTED_SCHEMES, default=PASSWORD_HASH_SCHEME)
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    settings, elapsed_ms = calibrate(args.scheme, args.target_ms, args.samples)
+    print(f"⏱️ Verify takes {elapsed_ms:.0f} ms (target {args.target_ms:.0f} ms) with:")
+    for name, value in settings.items():
+        print(f"{name}={value}")
+
+
+if __name__ == "__main__":
+    main()
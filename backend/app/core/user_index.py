@@ -0,0 +1,101 @@
+import bisect
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+USER_INDEX_RELOAD_SECONDS = float(os.getenv("USER_INDEX_RELOAD_SECONDS", "300"))
+
+
+class UserPrefixIndex:
+    """
+    Process-local prefix index over the active users, for the assignee picker.
+
+    Keys are kept in two sorted arrays of (lowercased key, user id): one of usernames
+    and one of full names and the words in them, so "smi" finds "Alice Smith". A
+    lookup bisects to the first key with the prefix and walks forward until it has
+    enough users, so it costs O(log n + limit) whatever the number of matches.
+
+    AuthRepository keeps the index current for writes handled by this process. Writes
+    through other workers show up when the index is reloaded, at most every
+    reload_interval seconds.
+    """
+
+    def __init__(self, reload_interval: float = USER_INDEX_RELOAD_SECONDS):
+        self.reload_interval = reload_interval
+        self._users: Dict[int, Tuple[str, Optional[str]]] = {}
+        self._usernames: List[Tuple[str, int]] = []
+        self._names: List[Tuple[str, int]] = []
+        self._loaded_at: Optional[float] = None
+
+    @staticmethod
+    def _name_keys(full_name: Optional[str]) -> List[str]:
+        if not full_name:
+            return []
+        full_name = full_name.lower()
+        return sorted({full_name, *full_name.split()})
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.reload_interval
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    def load(self, users: Iterable[Tuple[int, str, Optional[str]]]) -> None:
+        """Replace the contents with (id, username, full_name) rows of the active users."""
+        self._users = {user_id: (username, full_name) for user_id, username, full_name in users}
+        self._usernames = sorted((username.lower(), user_id) for user_id, (username, _) in self._users.items())
+        self._names = sorted(
+            (key, user_id)
+            for user_id, (_, full_name) in self._users.items()
+            for key in self._name_keys(full_name)
+        )
+        self._loaded_at = time.monotonic()
+
+    def remove(self, user_id: int) -> None:
+        entry = self._users.pop(user_id, None)
+        if entry is None:
+            return
+        username, full_name = entry
+        self._discard(self._usernames, (username.lower(), user_id))
+        for key in self._name_keys(full_name):
+            self._discard(self._names, (key, user_id))
+
+    def upsert(self, user_id: int, username: str, full_name: Optional[str], is_active: bool = True) -> None:
+        self.remove(user_id)
+        if not is_active:
+            return
+        self._users[user_id] = (username, full_name)
+        bisect.insort(self._usernames, (username.lower(), user_id))
+        for key in self._name_keys(full_name):
+            bisect.insort(self._names, (key, user_id))
+
+    @staticmethod
+    def _discard(keys: List[Tuple[str, int]], item: Tuple[str, int]) -> None:
+        position = bisect.bisect_left(keys, item)
+        if position < len(keys) and keys[position] == item:
+            del keys[position]
+
+    def suggest(self, query: str, limit: int = 10) -> List[Tuple[int, str, Optional[str]]]:
+        """
+        Up to limit (id, username, full_name) of users matching the prefix.
+        Username matches rank before full name matches; each group is alphabetical,
+        so an exact username comes first.
+        """
+        prefix = query.strip().lower()
+        if not prefix:
+            return []
+
+        found: List[int] = []
+        for keys in (self._usernames, self._names):
+            position = bisect.bisect_left(keys, (prefix,))
+            while position < len(keys) and len(found) < limit:
+                key, user_id = keys[position]
+                if not key.startswith(prefix):
+                    break
+                if user_id not in found:
+                    found.append(user_id)
+                position += 1
+        return [(user_id, *self._users[user_id]) for user_id in found]
+
+
+user_index = UserPrefixIndex()
@@ -1,9 +1,12 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
+from app.core.loader import Loaders
+from app.dependencies.loaders import get_loaders
 from app.repositories.auth import AuthRepository
+from app.repositories.token import RefreshTokenRepository
 from app.services.auth import AuthService
 
-def get_auth_service(db: AsyncSession = Depends(get_db)) -> AuthService:
-    repo = AuthRepository(db)
-    return AuthService(repo)
\ No newline at end of file
+def get_auth_service(db: AsyncSession = Depends(get_db), loaders: Loaders = Depends(get_loaders)) -> AuthService:
+    repo = AuthRepository(db, loaders)
+    return AuthService(repo, RefreshTokenRepository(db))
\ No newline at end of file
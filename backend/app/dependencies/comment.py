@@ -4,8 +4,10 @@ from app.services.comment import CommentService
 from app.repositories.comment import CommentRepository
 from app.repositories.task import TaskRepository
 from app.core.database import get_db
+from app.core.loader import Loaders
+from app.dependencies.loaders import get_loaders
 
-def get_comment_service(db: AsyncSession = Depends(get_db)) -> CommentService:
-    repo = CommentRepository(db)
-    task_repo = TaskRepository(db)  # Assuming you need a task repository as well
+def get_comment_service(db: AsyncSession = Depends(get_db), loaders: Loaders = Depends(get_loaders)) -> CommentService:
+    repo = CommentRepository(db, loaders)
+    task_repo = TaskRepository(db, loaders)  # Assuming you need a task repository as well
     return CommentService(repo, task_repo)
\ No newline at end of file
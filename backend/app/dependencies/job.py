@@ -0,0 +1,9 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.job import JobService
+from app.repositories.job import JobRepository
+from app.core.database import get_db
+
+def get_job_service(db: AsyncSession = Depends(get_db)) -> JobService:
+    repo = JobRepository(db)
+    return JobService(repo)
@@ -0,0 +1,8 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.core.loader import Loaders, loaders_for
+
+def get_loaders(db: AsyncSession = Depends(get_db)) -> Loaders:
+    # FastAPI resolves this once per request, so every repository of the request shares them
+    return loaders_for(db)
@@ -3,7 +3,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.task import TaskService
 from app.repositories.task import TaskRepository
 from app.core.database import get_db
+from app.core.loader import Loaders
+from app.dependencies.loaders import get_loaders
 
-def get_task_service(db: AsyncSession = Depends(get_db)) -> TaskService:
-    repo = TaskRepository(db)
+def get_task_service(db: AsyncSession = Depends(get_db), loaders: Loaders = Depends(get_loaders)) -> TaskService:
+    repo = TaskRepository(db, loaders)
     return TaskService(repo)
\ No newline at end of file
@@ -0,0 +1,9 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.webhook import WebhookService
+from app.repositories.webhook import WebhookRepository
+from app.core.database import get_db
+
+def get_webhook_service(db: AsyncSession = Depends(get_db)) -> WebhookService:
+    repo = WebhookRepository(db)
+    return WebhookService(repo)
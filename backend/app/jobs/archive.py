@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.core.database import AsyncSessionLocal
+from app.repositories.archive import TaskArchiveRepository
+
+logger = logging.getLogger(__name__)
+
+TASK_ARCHIVE_AFTER_DAYS = float(os.getenv("TASK_ARCHIVE_AFTER_DAYS", "30"))
+TASK_ARCHIVE_BATCH_SIZE = int(os.getenv("TASK_ARCHIVE_BATCH_SIZE", "500"))
+TASK_ARCHIVE_PAUSE_SECONDS = float(os.getenv("TASK_ARCHIVE_PAUSE_SECONDS", "0.5"))
+TASK_ARCHIVE_INTERVAL_SECONDS = float(os.getenv("TASK_ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+
+class TaskArchiver:
+    """
+    Moves tasks that were completed or cancelled more than archive_after ago, and
+    their comments, to the archive tables.
+
+    Each batch is its own short transaction followed by a pause, so the mover never
+    holds many locks or competes with request traffic for long. A round keeps going
+    until no task is due, then the archiver sleeps until the next one.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        archive_after: timedelta = timedelta(days=TASK_ARCHIVE_AFTER_DAYS),
+        batch_size: int = TASK_ARCHIVE_BATCH_SIZE,
+        pause: float = TASK_ARCHIVE_PAUSE_SECONDS,
+        interval: float = TASK_ARCHIVE_INTERVAL_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.archive_after = archive_after
+        self.batch_size = batch_size
+        self.pause = pause
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def archive_once(self) -> int:
+        """Archive every task that is due, batch by batch. Returns the number of tasks moved."""
+        closed_before = datetime.utcnow() - self.archive_after
+        moved = 0
+        while True:
+            async with self.session_factory() as db:
+                archived = await TaskArchiveRepository(db).archive_closed_tasks_in_db(closed_before, self.batch_size)
+            moved += archived
+            if archived < self.batch_size:
+                return moved
+            await asyncio.sleep(self.pause)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                moved = await self.archive_once()
+                if moved:
+                    logger.info("Archived %s closed tasks", moved)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Task archiver round failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+task_archiver = TaskArchiver()
+
+
+if __name__ == "__main__":
+    moved = asyncio.run(task_archiver.archive_once())
+    print(f"✅ Archived {moved} closed tasks")
@@ -0,0 +1,21 @@
+import asyncio
+
+from app.core.database import AsyncSessionLocal
+from app.repositories.comment import CommentRepository
+
+
+async def repair_comment_stats(batch_size: int = 500) -> int:
+    """
+    Recompute the denormalized comment stats (comments_count, last_commented_at)
+    of every task from the comments table.
+    :param batch_size: Number of tasks updated per transaction.
+    :return: Number of tasks processed.
+    """
+    async with AsyncSessionLocal() as session:
+        repo = CommentRepository(session)
+        return await repo.recompute_comment_stats_in_db(batch_size=batch_size)
+
+
+if __name__ == "__main__":
+    processed = asyncio.run(repair_comment_stats())
+    print(f"✅ Comment stats recomputed for {processed} tasks")
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.models.job import Job
+from app.repositories.job import JobRepository
+
+logger = logging.getLogger(__name__)
+
+# Reports (progress, total) back to the job row
+ProgressCallback = Callable[[int, Optional[int]], Awaitable[None]]
+JobHandler = Callable[[AsyncSession, Job, ProgressCallback], Awaitable[Any]]
+
+JOB_HEARTBEAT_INTERVAL_SECONDS = float(os.getenv("JOB_HEARTBEAT_INTERVAL_SECONDS", "10"))
+# A job whose owner hasn't checked in for this long is considered lost
+JOB_HEARTBEAT_TIMEOUT_SECONDS = float(os.getenv("JOB_HEARTBEAT_TIMEOUT_SECONDS", "60"))
+
+
+class JobRunner:
+    """
+    Runs long operations in the background of the API process.
+
+    Handlers are registered per job type together with a concurrency cap, so a burst
+    of heavy jobs waits in the queue instead of taking every database connection
+    away from request traffic. Each job runs in its own session and its state is
+    persisted in the jobs table, where GET /jobs/{id} reads it.
+
+    Jobs are tagged with the runner's owner_id, and while any of them is unfinished the
+    runner refreshes their heartbeat every heartbeat_interval. recover() only fails jobs
+    whose heartbeat is older than heartbeat_timeout, so a process booting next to live
+    workers leaves their jobs alone. start() also repeats it every heartbeat_timeout,
+    so jobs of a worker that died while the others kept running are failed too.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        heartbeat_interval: float = JOB_HEARTBEAT_INTERVAL_SECONDS,
+        heartbeat_timeout: float = JOB_HEARTBEAT_TIMEOUT_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.owner_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, JobHandler] = {}
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._recovery: Optional[asyncio.Task] = None
+
+    def register(self, job_type: str, max_concurrency: int = 1):
+        """Decorator registering the handler of a job type."""
+        def decorator(handler: JobHandler) -> JobHandler:
+            self._handlers[job_type] = handler
+            self._limits[job_type] = asyncio.Semaphore(max_concurrency)
+            return handler
+        return decorator
+
+    def has_handler(self, job_type: str) -> bool:
+        return job_type in self._handlers
+
+    def submit(self, job: Job) -> asyncio.Task:
+        """Schedule a queued job. It starts once a slot for its type is free."""
+        task = asyncio.create_task(self._run(job.id, job.type))
+        # Keep a reference so the task isn't garbage collected while it runs
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+        return task
+
+    async def _heartbeat_loop(self) -> None:
+        """Keep this runner's jobs alive while it has any, then exit until the next submit."""
+        while self._tasks:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                async with self.session_factory() as db:
+                    await JobRepository(db).heartbeat_jobs_in_db(self.owner_id)
+            except Exception:
+                logger.exception("Job heartbeat failed")
+
+    async def _run(self, job_id: int, job_type: str) -> None:
+        async with self._limits[job_type]:
+            async with self.session_factory() as db:
+                repo = JobRepository(db)
+                job = await repo.get_job_by_id_in_db(job_id)
+                await repo.mark_job_running_in_db(job_id)
+
+                async def progress(done: int, total: Optional[int] = None):
+                    await repo.update_job_progress_in_db(job_id, done, total)
+
+                try:
+                    result = await self._handlers[job_type](db, job, progress)
+                except asyncio.CancelledError:
+                    await db.rollback()
+                    await repo.fail_job_in_db(job_id, "Cancelled during shutdown")
+                    raise
+                except Exception as exc:
+                    logger.exception("Job %s (%s) failed", job_id, job_type)
+                    await db.rollback()
+                    await repo.fail_job_in_db(job_id, str(exc) or type(exc).__name__)
+                else:
+                    await repo.finish_job_in_db(job_id, result)
+
+    async def recover(self) -> int:
+        """Fail the jobs a process that is gone left unfinished."""
+        stale_before = datetime.utcnow() - timedelta(seconds=self.heartbeat_timeout)
+        async with self.session_factory() as db:
+            return await JobRepository(db).fail_interrupted_jobs_in_db(stale_before)
+
+    async def run_recovery(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_timeout)
+            try:
+                failed = await self.recover()
+                if failed:
+                    logger.warning("Failed %s jobs whose runner stopped heartbeating", failed)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job recovery failed")
+
+    def start(self) -> None:
+        if self._recovery is None:
+            self._recovery = asyncio.create_task(self.run_recovery())
+
+    async def stop(self) -> None:
+        if self._recovery is not None:
+            self._recovery.cancel()
+            await asyncio.gather(self._recovery, return_exceptions=True)
+            self._recovery = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+            self._heartbeat = None
+
+
+job_runner = JobRunner()
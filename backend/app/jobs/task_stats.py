@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from app.core.database import AsyncSessionLocal
+from app.repositories.task_counter import TaskCounterRepository
+
+logger = logging.getLogger(__name__)
+
+TASK_STATS_RECONCILE_INTERVAL_SECONDS = float(os.getenv("TASK_STATS_RECONCILE_INTERVAL_SECONDS", "3600"))
+
+
+class TaskStatsReconciler:
+    """
+    Periodically rebuilds the task counters behind GET /tasks/stats from the tasks
+    table, repairing any drift the write-time updates left behind.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, interval: float = TASK_STATS_RECONCILE_INTERVAL_SECONDS):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def reconcile_once(self) -> int:
+        """Rebuild the counters. Returns the number of counters written."""
+        async with self.session_factory() as db:
+            return await TaskCounterRepository(db).reconcile_task_counters_in_db()
+
+    async def run(self) -> None:
+        while True:
+            # Counters are exact right after startup, so the first rebuild waits a full interval
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reconcile_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Task stats reconciliation failed")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+task_stats_reconciler = TaskStatsReconciler()
+
+
+async def reconcile_task_stats() -> int:
+    """
+    Rebuild the task counters behind GET /tasks/stats from the tasks table.
+    :return: Number of counters written.
+    """
+    return await task_stats_reconciler.reconcile_once()
+
+
+if __name__ == "__main__":
+    written = asyncio.run(reconcile_task_stats())
+    print(f"✅ Task stats reconciled ({written} counters)")
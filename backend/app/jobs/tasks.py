@@ -0,0 +1,35 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.jobs.runner import ProgressCallback, job_runner
+from app.models.job import Job
+from app.repositories.task import TaskRepository
+from app.schemas.task import TaskBulkUpdate
+from app.services.task import TaskService
+
+BULK_UPDATE_JOB = "tasks.bulk_update"
+BULK_UPDATE_BATCH_SIZE = 200
+
+
+@job_runner.register(BULK_UPDATE_JOB, max_concurrency=2)
+async def run_bulk_update(db: AsyncSession, job: Job, progress: ProgressCallback) -> dict:
+    """
+    Apply a bulk update batch by batch. Each batch commits on its own, so locks are
+    short lived and the progress reported is the number of task IDs processed.
+    """
+    task_update = TaskBulkUpdate(**job.payload)
+    service = TaskService(TaskRepository(db))
+    task_ids = task_update.task_ids
+
+    updated_ids = []
+    await progress(0, len(task_ids))
+    for start in range(0, len(task_ids), BULK_UPDATE_BATCH_SIZE):
+        batch = task_ids[start:start + BULK_UPDATE_BATCH_SIZE]
+        tasks = await service.apply_bulk_update(batch, task_update, job.created_by)
+        updated_ids.extend(task.id for task in tasks)
+        await progress(start + len(batch))
+
+    found = set(updated_ids)
+    return {
+        "updated": len(updated_ids),
+        "not_found": [task_id for task_id in task_ids if task_id not in found],
+    }
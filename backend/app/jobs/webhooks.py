@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import os
+import random
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import httpx
+
+from app.core.database import AsyncSessionLocal
+from app.models.outbox import OutboxEvent
+from app.models.webhook import Webhook
+from app.repositories.webhook import WebhookRepository
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", "100"))
+WEBHOOK_MAX_CONCURRENCY = int(os.getenv("WEBHOOK_MAX_CONCURRENCY", "10"))
+WEBHOOK_TIMEOUT_SECONDS = float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", "10"))
+WEBHOOK_POLL_INTERVAL_SECONDS = float(os.getenv("WEBHOOK_POLL_INTERVAL_SECONDS", "1"))
+# How long an outbox event waits before delivery, so transactions that drew lower ids
+# can commit first. Must exceed the longest write transaction.
+WEBHOOK_VISIBILITY_LAG_SECONDS = float(os.getenv("WEBHOOK_VISIBILITY_LAG_SECONDS", "5"))
+
+
+class WebhookDispatcher:
+    """
+    Drains the outbox to the registered webhooks.
+
+    Each endpoint has its own cursor and gets at most one batch in flight, so it sees
+    events in outbox order. Different endpoints are delivered concurrently, up to
+    max_concurrency. A failed batch is retried from the same cursor with exponential
+    backoff, without holding up the other endpoints. Only events below the visibility
+    horizon are delivered or pruned, so an event committed out of id order is not skipped.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        client: Optional[httpx.AsyncClient] = None,
+        batch_size: int = WEBHOOK_BATCH_SIZE,
+        max_concurrency: int = WEBHOOK_MAX_CONCURRENCY,
+        timeout: float = WEBHOOK_TIMEOUT_SECONDS,
+        poll_interval: float = WEBHOOK_POLL_INTERVAL_SECONDS,
+        visibility_lag: float = WEBHOOK_VISIBILITY_LAG_SECONDS,
+        base_backoff: float = 1.0,
+        max_backoff: float = 3600.0,
+    ):
+        self.session_factory = session_factory
+        self.client = client
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.visibility_lag = visibility_lag
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._task: Optional[asyncio.Task] = None
+        self._owns_client = client is None
+
+    def backoff_delay(self, failure_count: int) -> float:
+        """Seconds to wait before retrying after failure_count consecutive failures."""
+        delay = min(self.max_backoff, self.base_backoff * 2 ** (failure_count - 1))
+        # Jitter keeps endpoints that failed together from retrying in lockstep
+        return delay * random.uniform(0.5, 1.0)
+
+    def _build_body(self, webhook: Webhook, events: List[OutboxEvent]) -> dict:
+        return {
+            "webhook_id": webhook.id,
+            "events": [
+                {
+                    "id": event.id,
+                    "type": event.event_type,
+                    "aggregate_id": event.aggregate_id,
+                    "created_at": event.created_at.isoformat() if event.created_at else None,
+                    "data": event.payload,
+                }
+                for event in events
+            ],
+        }
+
+    async def _deliver(self, webhook: Webhook, horizon: int) -> int:
+        async with self._semaphore:
+            # Don't hold a database connection while waiting on the endpoint
+            async with self.session_factory() as db:
+                events = await WebhookRepository(db).get_pending_events_in_db(
+                    webhook.last_event_id, horizon, self.batch_size
+                )
+            if not events:
+                return 0
+
+            try:
+                response = await self.client.post(
+                    webhook.url, json=self._build_body(webhook, events), timeout=self.timeout
+                )
+                response.raise_for_status()
+            except httpx.HTTPError as exc:
+                failures = webhook.failure_count + 1
+                next_attempt_at = datetime.utcnow() + timedelta(seconds=self.backoff_delay(failures))
+                logger.warning("Webhook %s delivery failed (attempt %s): %s", webhook.id, failures, exc)
+                async with self.session_factory() as db:
+                    await WebhookRepository(db).record_failure_in_db(webhook.id, str(exc) or type(exc).__name__, next_attempt_at)
+                return 0
+
+            async with self.session_factory() as db:
+                await WebhookRepository(db).record_delivery_in_db(webhook.id, events[-1].id)
+            return len(events)
+
+    async def dispatch_once(self) -> int:
+        """
+        Deliver one batch to every webhook that is due and prune acknowledged events.
+        Returns the number of events delivered.
+        """
+        if self.client is None:
+            self.client = httpx.AsyncClient()
+
+        now = datetime.utcnow()
+        async with self.session_factory() as db:
+            repo = WebhookRepository(db)
+            horizon = await repo.get_visibility_horizon_in_db(now - timedelta(seconds=self.visibility_lag))
+            webhooks = await repo.get_due_webhooks_in_db(now)
+
+        delivered = sum(await asyncio.gather(*(self._deliver(webhook, horizon) for webhook in webhooks)))
+
+        async with self.session_factory() as db:
+            await WebhookRepository(db).prune_delivered_events_in_db(horizon)
+        return delivered
+
+    async def run(self) -> None:
+        while True:
+            try:
+                delivered = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Webhook dispatcher round failed")
+                delivered = 0
+            # Keep draining while there is a backlog, otherwise poll
+            if delivered == 0:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._owns_client and self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+
+webhook_dispatcher = WebhookDispatcher()
@@ -1,3 +1,9 @@
+import os
+from app.core.boot import StartupTimer
+
+# Started before the remaining imports so their cost shows up in the startup report
+startup_timer = StartupTimer()
+
 from fastapi import FastAPI
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,7 +15,15 @@ from slowapi.errors import RateLimitExceeded
 from app.routers.task import router as api_router
 from app.routers.auth import router as auth_router
 from app.routers.comment import router as comment_router
-from app.core.database import init_db, AsyncSessionLocal, create_admin
+from app.routers.webhook import router as webhook_router
+from app.routers.job import router as job_router
+from app.jobs.runner import job_runner
+from app.jobs.webhooks import webhook_dispatcher
+from app.jobs.archive import task_archiver
+from app.jobs.task_stats import task_stats_reconciler
+from app.core.database import init_db, ensure_schema, AsyncSessionLocal, create_admin
+from app.core.user_index import user_index
+from app.repositories.auth import AuthRepository
 
 app = FastAPI(
     title="Lemon Challenge Task management",
@@ -23,10 +37,48 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 load_dotenv()
 
+# Fast boot only creates the schema when the version table says it changed.
+# FAST_BOOT=false always runs create_all, as before.
+FAST_BOOT = os.getenv("FAST_BOOT", "true").lower() != "false"
+
+startup_timer.mark("imports")
+
+async def run_startup_tasks():
+    """One-off database preparation. The multi-worker launcher runs it once before forking."""
+    with startup_timer.phase("schema"):
+        if FAST_BOOT:
+            await ensure_schema()
+        else:
+            await init_db()
+    with startup_timer.phase("admin"):
+        await create_admin() 
+    with startup_timer.phase("jobs"):
+        await job_runner.recover()
+    with startup_timer.phase("user_index"):
+        async with AsyncSessionLocal() as db:
+            user_index.load(await AuthRepository(db).get_user_index_entries_in_db())
+
 @app.on_event("startup")
 async def startup_event():
-    await init_db()
-    await create_admin() 
+    if os.getenv("APP_STARTUP_TASKS_ENABLED", "true").lower() != "false":
+        await run_startup_tasks()
+        print(f"⏱️ Startup: {startup_timer.report()}")
+    if os.getenv("WEBHOOK_DISPATCHER_ENABLED", "true").lower() != "false":
+        webhook_dispatcher.start()
+    if os.getenv("TASK_ARCHIVER_ENABLED", "true").lower() != "false":
+        task_archiver.start()
+    if os.getenv("TASK_STATS_RECONCILER_ENABLED", "true").lower() != "false":
+        task_stats_reconciler.start()
+    if os.getenv("JOB_RECOVERY_ENABLED", "true").lower() != "false":
+        job_runner.start()
+    app.state.startup_timings = startup_timer.phases
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await webhook_dispatcher.stop()
+    await task_archiver.stop()
+    await task_stats_reconciler.stop()
+    await job_runner.stop()
 
 app.add_middleware(
     CORSMiddleware,
@@ -38,4 +90,6 @@ app.add_middleware(
     
 app.include_router(api_router)
 app.include_router(auth_router, tags=["auth"])
-app.include_router(comment_router, tags=["comments"])
\ No newline at end of file
+app.include_router(comment_router, tags=["comments"])
+app.include_router(webhook_router, tags=["webhooks"])
+app.include_router(job_router, tags=["jobs"])
\ No newline at end of file
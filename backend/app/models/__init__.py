@@ -2,5 +2,14 @@ from app.models.user import User
 from app.models.task import Task
 from app.models.base import Base
 from app.models.comment import Comment
+from app.models.outbox import OutboxEvent
+from app.models.webhook import Webhook
+from app.models.job import Job
+from app.models.task_counter import TaskCounter
+from app.models.schema_version import SchemaVersion
+from app.models.revoked_token import RevokedToken
+from app.models.refresh_token import RefreshToken
+from app.models.archive import ArchivedTask, ArchivedComment
+from app.models.task_event import TaskEvent
 
-__all__ = ["User", "Task", "Base", "Comment"]
\ No newline at end of file
+__all__ = ["User", "Task", "Base", "Comment", "OutboxEvent", "Webhook", "Job", "TaskCounter", "SchemaVersion", "RevokedToken", "RefreshToken", "ArchivedTask", "ArchivedComment", "TaskEvent"]
\ No newline at end of file
@@ -0,0 +1,53 @@
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, ForeignKey, Index, Text
+from sqlalchemy.orm import relationship
+from app.models.base import Base
+
+
+class ArchivedTask(Base):
+    """
+    A closed task moved out of tasks by the archiver, with the columns it had there.
+    Keeping finished work apart keeps tasks and its indexes down to the live working
+    set. Only the indexes history lookups need are kept here.
+    """
+    __tablename__ = "tasks_archive"
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String)
+    description = Column(String, nullable=True)
+    status = Column(String)
+    priority = Column(String)
+    priority_rank = Column(SmallInteger, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+    due_date = Column(DateTime, nullable=True)
+    comments_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_commented_at = Column(DateTime, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    created_by = Column(Integer, ForeignKey("users.id"), index=True)
+    updated_by = Column(Integer, ForeignKey("users.id"))
+    assigned_to = Column(Integer, ForeignKey("users.id"), index=True)
+
+    archived_at = Column(DateTime, nullable=False)
+
+    comments = relationship("ArchivedComment", back_populates="task")
+
+    def __repr__(self):
+        return f"<ArchivedTask(id={self.id}, title={self.title}, status={self.status})>"
+
+
+class ArchivedComment(Base):
+    """A comment of an archived task, moved together with it."""
+    __tablename__ = "comments_archive"
+    __table_args__ = (Index("ix_comments_archive_task_id_created_at", "task_id", "created_at"),)
+
+    id = Column(Integer, primary_key=True)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+
+    task_id = Column(Integer, ForeignKey("tasks_archive.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    created_by_user = relationship("User", viewonly=True)
+    task = relationship("ArchivedTask", back_populates="comments")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Text
 from datetime import datetime
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import relationship
@@ -7,6 +7,12 @@ from app.models.base import Base
 
 class Comment(Base):
     __tablename__ = "comments"
+    # Serves a task's comments newest first and the per-task comment stats. Ids are never
+    # reused on SQLite either, as archived comments keep theirs.
+    __table_args__ = (
+        Index("ix_comments_task_id_created_at", "task_id", "created_at"),
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text, nullable=False)
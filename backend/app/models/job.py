@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from datetime import datetime
+from app.models.base import Base
+
+
+class Job(Base):
+    """
+    A long running operation executed in the background by the job runner.
+    The row is the source of truth for its progress and outcome.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    type = Column(String, nullable=False, index=True)  # e.g. tasks.bulk_update
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed
+    payload = Column(JSON, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+
+    # Units of work done so far out of total, reported by the handler
+    progress = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=True)
+
+    created_by = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # The runner process holding the job and when it last checked in; a job whose
+    # heartbeat went stale was lost with its process
+    owner_id = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, type={self.type}, status={self.status})>"
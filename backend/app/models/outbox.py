@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from datetime import datetime
+from app.models.base import Base
+
+
+class OutboxEvent(Base):
+    """
+    Change events written in the same transaction as the task/comment write that
+    produced them, and later delivered to webhooks by the dispatcher.
+    """
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String, nullable=False)  # e.g. task.created, comment.deleted
+    aggregate_type = Column(String, nullable=False)  # task, comment
+    aggregate_id = Column(Integer, nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, event_type={self.event_type}, aggregate_id={self.aggregate_id})>"
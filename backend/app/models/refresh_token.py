@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime
+from app.models.base import Base
+
+
+class RefreshToken(Base):
+    """
+    A refresh token handed out at login. Only the SHA-256 digest of the token is
+    stored. Every refresh rotates it: the presented token is marked used and a new
+    one is issued in the same family, so presenting a used token again means it
+    leaked and the whole family is revoked.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    token_hash = Column(String, nullable=False, unique=True, index=True)
+    # Shared by every token rotated from the same login
+    family_id = Column(String, nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    used_at = Column(DateTime, nullable=True)
+    revoked_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<RefreshToken(id={self.id}, family_id={self.family_id}, user_id={self.user_id})>"
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.models.base import Base
+
+
+class SchemaVersion(Base):
+    """
+    Single row recording the fingerprint of the schema the database was last
+    created with, so a booting worker can tell whether there is anything to do.
+    """
+    __tablename__ = "schema_version"
+
+    id = Column(Integer, primary_key=True)
+    fingerprint = Column(String, nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SchemaVersion(fingerprint={self.fingerprint}, applied_at={self.applied_at})>"
@@ -1,23 +1,56 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
+# Numeric order of the priorities, stored in priority_rank. Unknown values rank as low.
+TASK_PRIORITY_RANKS = {"low": 0, "medium": 1, "high": 2, "urgent": 3}
+# Tasks in these statuses are done with and leave the work queue
+CLOSED_TASK_STATUSES = ("completed", "cancelled")
+OPEN_TASK_CONDITION = text("status NOT IN ('completed', 'cancelled')")
+CLOSED_TASK_CONDITION = text("status IN ('completed', 'cancelled')")
+# Columns ix_tasks_queue carries besides its key, so queue reads don't visit the table.
+# title and description are free text and stay out: a btree entry is capped at ~2.7kB.
+TASK_QUEUE_INCLUDED_COLUMNS = (
+    "status",
+    "priority",
+    "created_at",
+    "updated_at",
+    "created_by",
+    "updated_by",
+    "comments_count",
+    "last_commented_at",
+    "version",
+)
+
+
+def rank_of_priority(priority) -> int:
+    return TASK_PRIORITY_RANKS.get(priority, 0)
+
 class Task(Base):
     __tablename__ = 'tasks'
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     description = Column(String, nullable=True)
-    status = Column(String, default='pending')  # pending, hold, in_progress, completed, cancelled
-    priority = Column(String, default="low")  # low, medium, high, urgent
+    status = Column(String, default='pending', index=True)  # pending, hold, in_progress, completed, cancelled
+    priority = Column(String, default="low", index=True)  # low, medium, high, urgent
+    # priority as a number, so SQL orders by importance rather than alphabetically
+    priority_rank = Column(SmallInteger, nullable=False, default=0, server_default="0", index=True)
     created_at = Column(DateTime, nullable=True)
     updated_at = Column(DateTime, nullable=True)
-    due_date = Column(DateTime, nullable=True)
+    due_date = Column(DateTime, nullable=True, index=True)
 
+    # Denormalized comment stats, kept in sync by CommentRepository
+    comments_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_commented_at = Column(DateTime, nullable=True)
 
-    created_by = Column(Integer, ForeignKey("users.id"))
-    updated_by = Column(Integer, ForeignKey("users.id"))
-    assigned_to = Column(Integer, ForeignKey("users.id"))
+    # Optimistic concurrency token, bumped by every write to the task
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+
+    created_by = Column(Integer, ForeignKey("users.id"), index=True)
+    updated_by = Column(Integer, ForeignKey("users.id"), index=True)
+    assigned_to = Column(Integer, ForeignKey("users.id"), index=True)
 
     #relacion con tabla Comments
     comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan")
@@ -27,5 +60,33 @@ class Task(Base):
     updater = relationship("User", back_populates="tasks_updated", foreign_keys=[updated_by])
     assignee = relationship("User", back_populates="tasks_assigned", foreign_keys=[assigned_to])
 
+    __table_args__ = (
+        # The work queue of each assignee in the order GET /tasks/next serves it,
+        # limited to open tasks so finished work doesn't pile up in the index. On
+        # Postgres it covers the claim pick and every queue field but title and
+        # description, which are then the only ones read from the table.
+        Index(
+            "ix_tasks_queue",
+            "assigned_to",
+            priority_rank.desc(),
+            "due_date",
+            "id",
+            postgresql_include=TASK_QUEUE_INCLUDED_COLUMNS,
+            postgresql_where=OPEN_TASK_CONDITION,
+            sqlite_where=OPEN_TASK_CONDITION,
+        ),
+        # Closed tasks by age, for the archiver to find the ones due to move out
+        Index(
+            "ix_tasks_archivable",
+            "updated_at",
+            postgresql_where=CLOSED_TASK_CONDITION,
+            sqlite_where=CLOSED_TASK_CONDITION,
+        ),
+        # Archived tasks keep their ids, and their history stays keyed by them, so an
+        # id must never be handed out again. Postgres sequences never do; SQLite
+        # reuses the highest rowid unless the table is AUTOINCREMENT.
+        {"sqlite_autoincrement": True},
+    )
+
     def __repr__(self):
         return f"<Task(id={self.id}, title={self.title}, status={self.status})>"
\ No newline at end of file
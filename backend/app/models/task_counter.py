@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String
+from app.models.base import Base
+
+
+class TaskCounter(Base):
+    """
+    Number of tasks per value of a dimension (status, priority, assignee).
+    Kept in sync by TaskRepository in the same transaction as each task write,
+    so statistics never have to scan the tasks table.
+    """
+    __tablename__ = "task_counters"
+
+    dimension = Column(String, primary_key=True)  # status, priority, assignee
+    key = Column(String, primary_key=True)  # e.g. pending, high, the assignee's user ID
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TaskCounter(dimension={self.dimension}, key={self.key}, count={self.count})>"
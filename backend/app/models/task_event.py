@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, JSON
+from app.models.base import Base
+
+
+class TaskEvent(Base):
+    """
+    One entry of a task's append-only history, written by TaskRepository in the same
+    transaction as the write it records.
+
+    changes maps each field the write set to its new value, and previous maps the same
+    fields to the values they replaced, read by the write itself. A created event has
+    every tracked field in changes and no previous; a deleted event has the task's last
+    values in previous. There is no foreign key to tasks, so the history outlives
+    deleted and archived tasks.
+    """
+    __tablename__ = "task_events"
+    # A task's history in order, and the keyset pagination of GET /tasks/{id}/history
+    __table_args__ = (Index("ix_task_events_task_id_id", "task_id", "id"),)
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, nullable=False)
+    event_type = Column(String, nullable=False)  # created, updated, status_changed, claimed, deleted, archived
+    changes = Column(JSON, nullable=False)
+    previous = Column(JSON, nullable=True)
+    version = Column(Integer, nullable=True)  # Task version after the write
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<TaskEvent(id={self.id}, task_id={self.task_id}, event_type={self.event_type})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import Base
@@ -26,5 +26,27 @@ class User(Base):
     tasks_updated = relationship("Task", back_populates="updater", foreign_keys="Task.updated_by")
     tasks_assigned = relationship("Task", back_populates="assignee", foreign_keys="Task.assigned_to")
 
+    __table_args__ = (
+        # Directory pages filtered by type and status, in username order
+        Index("ix_users_type_is_active_username", "type", "is_active", "username"),
+        # Case-insensitive prefix search. text_pattern_ops lets Postgres serve
+        # LIKE 'abc%' from the index whatever the database collation is.
+        Index(
+            "ix_users_username_prefix",
+            func.lower(username).label("username_lower"),
+            postgresql_ops={"username_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_users_email_prefix",
+            func.lower(email).label("email_lower"),
+            postgresql_ops={"email_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_users_full_name_prefix",
+            func.lower(full_name).label("full_name_lower"),
+            postgresql_ops={"full_name_lower": "text_pattern_ops"},
+        ),
+    )
+
     def __repr__(self):
         return f"<User(id={self.id}, username={self.username}, email={self.email})>"
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from datetime import datetime
+from app.models.base import Base
+
+
+class Webhook(Base):
+    __tablename__ = "webhooks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, nullable=False)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Delivery cursor: id of the last outbox event this endpoint acknowledged.
+    # Events are delivered strictly in id order, so each endpoint sees them in order;
+    # the cursor never passes the dispatcher's visibility horizon, so a transaction that
+    # commits after a higher id was delivered can't be skipped.
+    last_event_id = Column(Integer, nullable=False, default=0)
+
+    # Retry state, reset after every successful delivery
+    failure_count = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+
+    def __repr__(self):
+        return f"<Webhook(id={self.id}, url={self.url}, last_event_id={self.last_event_id})>"
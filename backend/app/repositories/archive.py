@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.archive import ArchivedComment, ArchivedTask
+from app.models.comment import Comment
+from app.models.task import CLOSED_TASK_CONDITION, Task
+from app.repositories.task_counter import COUNTED_TASK_FIELDS, TaskCounterRepository
+from app.repositories.task_event import TaskEventRepository
+
+TASK_COLUMN_NAMES = [column.name for column in Task.__table__.c]
+COMMENT_COLUMN_NAMES = [column.name for column in Comment.__table__.c]
+
+
+class TaskArchiveRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.counters = TaskCounterRepository(db)
+        self.history = TaskEventRepository(db)
+
+    def _archivable_tasks(self, closed_before: datetime, batch_size: int):
+        # Served by the partial ix_tasks_archivable index. On Postgres rows another
+        # writer holds are skipped rather than waited for; the next batch gets them.
+        return (
+            select(Task.id, Task.version, *(getattr(Task, field) for field in COUNTED_TASK_FIELDS.values()))
+            .where(CLOSED_TASK_CONDITION, Task.updated_at < closed_before)
+            .order_by(Task.updated_at, Task.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+
+    async def archive_closed_tasks_in_db(self, closed_before: datetime, batch_size: int) -> int:
+        """
+        Move up to batch_size tasks closed (completed or cancelled) before closed_before
+        from tasks to tasks_archive, together with their comments, in one transaction.
+        The moved tasks leave the task counters, which describe the live tasks.
+        Returns the number of tasks moved.
+        """
+        rows = (await self.db.execute(self._archivable_tasks(closed_before, batch_size))).all()
+        if not rows:
+            await self.db.rollback()
+            return 0
+        task_ids = [row.id for row in rows]
+        now = datetime.utcnow()
+
+        await self.db.execute(
+            insert(ArchivedTask).from_select(
+                TASK_COLUMN_NAMES + ["archived_at"],
+                select(*Task.__table__.c, literal(now)).where(Task.id.in_(task_ids)),
+            )
+        )
+        await self.db.execute(
+            insert(ArchivedComment).from_select(
+                COMMENT_COLUMN_NAMES,
+                select(*Comment.__table__.c).where(Comment.task_id.in_(task_ids)),
+            )
+        )
+        await self.db.execute(
+            delete(Comment).where(Comment.task_id.in_(task_ids)).execution_options(synchronize_session=False)
+        )
+        await self.db.execute(
+            delete(Task).where(Task.id.in_(task_ids)).execution_options(synchronize_session=False)
+        )
+        await self.counters.apply_changes((row._mapping, None) for row in rows)
+        await self.history.record_events("archived", [(row.id, row.version, {}, None) for row in rows], None)
+        await self.db.commit()
+        return len(task_ids)
@@ -1,18 +1,20 @@
 from app.repositories.interfaces.auth import AbstractAuthRepository
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from passlib.context import CryptContext
+from typing import Optional
+from sqlalchemy import func, or_, select, update
 from fastapi import Depends
 from app.core.database import get_db
+from app.core.loader import Loaders, loaders_for
+from app.core.passwords import hash_password, verify_and_update_password, verify_password
+from app.core.user_index import user_index
 
 from app.models.user import User
 from app.schemas.auth import UserCreate
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 class AuthRepository(AbstractAuthRepository):
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, loaders: Optional[Loaders] = None):
         self.db = db
+        self.loaders = loaders or loaders_for(db)
         
     async def get_user_by_username(self, username: str) -> User | None:
         return await self.get_user_by_username_in_db(username)
@@ -21,19 +23,25 @@ class AuthRepository(AbstractAuthRepository):
         return await self.get_user_by_email_in_db(email)
     
     async def create_user(self, user_data, hashed: bool = False) -> User:
-        hashed_password = pwd_context.hash(user_data.password)
+        hashed_password = hash_password(user_data.password)
         return await self.create_user_in_db(user_data, hashed_password)
     
     def hash_password(self, plain: str) -> str:
-        return pwd_context.hash(plain)
+        return hash_password(plain)
     
     def verify_password(self, plain: str, hashed: str) -> bool:
-        return pwd_context.verify(plain, hashed)
+        return verify_password(plain, hashed)
+
+    def verify_and_update_password(self, plain: str, hashed: str):
+        return verify_and_update_password(plain, hashed)
 
     async def get_user_by_username_in_db(self, username: str):
         result = await self.db.execute(select(User).where(User.username == username))
         return result.scalar_one_or_none()
 
+    async def get_user_by_id_in_db(self, user_id: int):
+        return await self.loaders.users.load(user_id)
+
     async def get_user_by_email_in_db(self, email: str):
         result = await self.db.execute(select(User).where(User.email == email))
         return result.scalar_one_or_none()
@@ -43,7 +51,7 @@ class AuthRepository(AbstractAuthRepository):
                # Si se indica que la contraseña ya está hasheada, no la hasheamos de nuevo
                user_data.password = user_data.password
            else:
-                user_data.password = pwd_context.hash(user_data.password)
+                user_data.password = hash_password(user_data.password)
 
            new_user = User(
                username=user_data.username,
@@ -57,12 +65,54 @@ class AuthRepository(AbstractAuthRepository):
            self.db.add(new_user)
            await self.db.commit()
            await self.db.refresh(new_user)
+           user_index.upsert(new_user.id, new_user.username, new_user.full_name, new_user.is_active)
            return new_user
 
     async def get_all_users_in_db(self):
         result = await self.db.execute(select(User))
         return result.scalars().all()
 
+    async def get_user_index_entries_in_db(self):
+        """(id, username, full_name) of every active user, to load the prefix index."""
+        result = await self.db.execute(
+            select(User.id, User.username, User.full_name).where(User.is_active.is_(True))
+        )
+        return result.all()
+
+    async def list_users_in_db(
+        self,
+        limit: int,
+        after_username: Optional[str] = None,
+        type: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        search: Optional[str] = None,
+        compact: bool = False,
+    ):
+        """
+        Users in username order, starting after after_username (keyset pagination).
+        search is a case-insensitive prefix of the username, email or full name.
+        With compact only (id, username) rows are loaded.
+        """
+        stmt = select(User.id, User.username) if compact else select(User)
+        if after_username is not None:
+            stmt = stmt.where(User.username > after_username)
+        if type is not None:
+            stmt = stmt.where(User.type == type)
+        if is_active is not None:
+            stmt = stmt.where(User.is_active == is_active)
+        if search:
+            escaped = search.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            pattern = f"{escaped}%"
+            stmt = stmt.where(
+                or_(
+                    func.lower(User.username).like(pattern, escape="\\"),
+                    func.lower(User.email).like(pattern, escape="\\"),
+                    func.lower(User.full_name).like(pattern, escape="\\"),
+                )
+            )
+        result = await self.db.execute(stmt.order_by(User.username).limit(limit))
+        return result.all() if compact else result.scalars().all()
+
     async def delete_user_in_db(self, user_id: int):
         user = await self.db.get(User, user_id)
         if not user:
@@ -70,8 +120,19 @@ class AuthRepository(AbstractAuthRepository):
 
         await self.db.delete(user)
         await self.db.commit()
+        self.loaders.users.clear(user_id)
+        user_index.remove(user_id)
         return user
 
+    async def update_password_hash_in_db(self, user_id: int, hashed_password: str) -> None:
+        await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(hashed_password=hashed_password)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+
     async def update_user_in_db(self, user_id: int, update_data: dict):
         user = await self.db.get(User, user_id)
         if not user:
@@ -87,4 +148,5 @@ class AuthRepository(AbstractAuthRepository):
         
         await self.db.commit()
         await self.db.refresh(user)
+        user_index.upsert(user.id, user.username, user.full_name, user.is_active)
         return user
\ No newline at end of file
@@ -1,21 +1,31 @@
 
-from typing import List, Optional
+from typing import Dict, List, Optional
+from datetime import datetime
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
+from app.models.archive import ArchivedComment
 from app.models.comment import Comment
+from app.models.task import Task
 from app.schemas.comment import TaskCommentCreate, TaskCommentResponse
+from app.schemas.auth import UserResponse
 from app.repositories.interfaces.comment import AbstractCommentRepository
+from app.repositories.outbox import OutboxRepository
 from app.models.user import User
+from app.core.loader import Loaders, loaders_for
 
 class CommentRepository(AbstractCommentRepository):
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, loaders: Optional[Loaders] = None):
         self.db = db
+        self.loaders = loaders or loaders_for(db)
+        self.outbox = OutboxRepository(db)
 
     async def enrich_comments_with_usernames(self, comments: List[Comment]) -> List[TaskCommentResponse]:
         user_ids = {comment.user_id for comment in comments if comment.user_id}
-        result = await self.db.execute(select(User).where(User.id.in_(user_ids)))
-        user_map = {user.id: user.username for user in result.scalars().all()}
+        users = await self.loaders.users.load_many(user_ids)
+        user_map = {user.id: user.username for user in users if user}
 
         return [
             TaskCommentResponse(
@@ -36,36 +46,189 @@ class CommentRepository(AbstractCommentRepository):
             comments = result.scalars().all()
             return [TaskCommentResponse.from_orm(comment) for comment in comments]
 
-    async def get_comment_by_id_in_db(self, comment_id: int) -> Optional[Comment]:
+    async def get_archived_comments_for_task_in_db(self, task_id: int) -> List[ArchivedComment]:
+        result = await self.db.execute(
+            select(ArchivedComment)
+            .where(ArchivedComment.task_id == task_id)
+            .options(selectinload(ArchivedComment.created_by_user))
+        )
+        return result.scalars().all()
+
+    async def get_latest_comments_for_tasks_in_db(self, task_ids: List[int], per_task: int) -> Dict[int, List[Comment]]:
+        # Rank each task's comments newest first and keep the top per_task rows,
+        # so every requested task is served by a single query.
+        ranked = (
+            select(
+                Comment.id,
+                func.row_number()
+                .over(
+                    partition_by=Comment.task_id,
+                    order_by=(Comment.created_at.desc(), Comment.id.desc()),
+                )
+                .label("rank"),
+            )
+            .where(Comment.task_id.in_(task_ids))
+            .subquery()
+        )
         result = await self.db.execute(
             select(Comment)
-            .where(Comment.id == comment_id)
-            .options(selectinload(Comment.created_by_user))
+            .join(ranked, ranked.c.id == Comment.id)
+            .where(ranked.c.rank <= per_task)
+            .options(joinedload(Comment.created_by_user))
+            .order_by(Comment.task_id, ranked.c.rank)
         )
-        return result.scalar_one_or_none()
 
-    async def add_comment_to_task_in_db(self, task_id: int, comment_data: TaskCommentCreate, user_id: int) -> Comment:
-        new_comment = Comment(
-            content=comment_data.content,
-            task_id=task_id,
-            user_id=user_id
+        grouped = {task_id: [] for task_id in task_ids}
+        for comment in result.scalars().all():
+            grouped[comment.task_id].append(comment)
+        return grouped
+
+    async def get_comment_by_id_in_db(self, comment_id: int) -> Optional[Comment]:
+        return await self.loaders.comments.load(comment_id)
+
+    def _supports_writable_cte(self) -> bool:
+        # Postgres can join INSERT/DELETE ... RETURNING to users inside one statement
+        return self.db.bind.dialect.name == "postgresql"
+
+    async def _execute_returning_with_author(self, stmt) -> Optional[TaskCommentResponse]:
+        """
+        Run an INSERT/DELETE ... RETURNING on comments and build the response with the
+        author's fields from the same round trip.
+        """
+        if self._supports_writable_cte():
+            written = stmt.cte("written_comment")
+            result = await self.db.execute(
+                select(written, User).join(User, User.id == written.c.user_id)
+            )
+            row = result.first()
+            author = row.User if row else None
+        else:
+            row = (await self.db.execute(stmt)).first()
+            # The author is normally the current user, already loaded by authentication
+            author = await self.loaders.users.load(row.user_id) if row else None
+
+        if row is None:
+            return None
+        return TaskCommentResponse(
+            id=row.id,
+            content=row.content,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            task_id=row.task_id,
+            created_by_user=UserResponse.from_orm(author),
         )
-        self.db.add(new_comment)
-        await self.db.commit()
-        await self.db.refresh(new_comment)
 
+    async def _bump_task_comment_stats(self, task_id: int, delta: int, last_commented_at) -> bool:
+        self.loaders.tasks.clear(task_id)
         result = await self.db.execute(
-            select(Comment)
-            .where(Comment.id == new_comment.id)
-            .options(selectinload(Comment.created_by_user))
+            update(Task)
+            .where(Task.id == task_id)
+            .values(comments_count=Task.comments_count + delta, last_commented_at=last_commented_at)
+            .execution_options(synchronize_session=False)
         )
-        return result.scalar_one()
+        return result.rowcount > 0
 
-    async def delete_comment_from_task_in_db(self, comment_id: int) -> Optional[Comment]:
-        comment = await self.db.get(Comment, comment_id, options=[selectinload(Comment.created_by_user)])
-        if not comment:
+    async def add_comment_to_task_in_db(self, task_id: int, comment_data: TaskCommentCreate, user_id: int) -> Optional[TaskCommentResponse]:
+        """
+        Insert a comment and return it with its author.
+        Returns None when the task does not exist.
+        """
+        now = datetime.utcnow()
+        stmt = (
+            insert(Comment)
+            .values(
+                content=comment_data.content,
+                task_id=task_id,
+                user_id=user_id,
+                created_at=now,
+                updated_at=now,
+            )
+            .returning(*Comment.__table__.c)
+        )
+        try:
+            new_comment = await self._execute_returning_with_author(stmt)
+        except IntegrityError:
+            # Foreign key violation: the task does not exist
+            await self.db.rollback()
             return None
-        deleted_comment_data = TaskCommentResponse.from_orm(comment)
-        await self.db.delete(comment)
+
+        # Keep the task's denormalized comment stats in the same transaction. A miss here
+        # also catches missing tasks on backends that don't enforce foreign keys (SQLite).
+        if not await self._bump_task_comment_stats(task_id, 1, now):
+            await self.db.rollback()
+            return None
+
+        self.outbox.stage_event("comment.created", new_comment.id, new_comment)
         await self.db.commit()
-        return deleted_comment_data
\ No newline at end of file
+        return new_comment
+
+    async def delete_comment_from_task_in_db(self, comment_id: int, task_id: Optional[int] = None, owner_id: Optional[int] = None) -> Optional[TaskCommentResponse]:
+        """
+        Delete a comment and return it with its author.
+        When task_id or owner_id are given the comment must also match them.
+        Returns None when no comment was deleted.
+        """
+        stmt = delete(Comment).where(Comment.id == comment_id)
+        if task_id is not None:
+            stmt = stmt.where(Comment.task_id == task_id)
+        if owner_id is not None:
+            stmt = stmt.where(Comment.user_id == owner_id)
+        stmt = stmt.returning(*Comment.__table__.c)
+
+        deleted_comment = await self._execute_returning_with_author(stmt)
+        if deleted_comment is None:
+            return None
+
+        self.loaders.comments.clear(comment_id)
+        await self._bump_task_comment_stats(
+            deleted_comment.task_id, -1, self._last_commented_at_subquery()
+        )
+        self.outbox.stage_event("comment.deleted", deleted_comment.id, deleted_comment)
+        await self.db.commit()
+        return deleted_comment
+
+    def _comments_count_subquery(self):
+        return (
+            select(func.count(Comment.id))
+            .where(Comment.task_id == Task.id)
+            .scalar_subquery()
+        )
+
+    def _last_commented_at_subquery(self):
+        return (
+            select(func.max(Comment.created_at))
+            .where(Comment.task_id == Task.id)
+            .scalar_subquery()
+        )
+
+    async def recompute_comment_stats_in_db(self, batch_size: int = 500) -> int:
+        """
+        Recompute comments_count and last_commented_at for every task.
+        Tasks are walked by id in batches of batch_size, each batch being a single
+        UPDATE committed on its own so locks are held only briefly.
+        Returns the number of tasks processed.
+        """
+        processed = 0
+        last_id = 0
+        while True:
+            result = await self.db.execute(
+                select(Task.id).where(Task.id > last_id).order_by(Task.id).limit(batch_size)
+            )
+            task_ids = result.scalars().all()
+            if not task_ids:
+                break
+
+            await self.db.execute(
+                update(Task)
+                .where(Task.id.in_(task_ids))
+                .values(
+                    comments_count=self._comments_count_subquery(),
+                    last_commented_at=self._last_commented_at_subquery(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.commit()
+
+            processed += len(task_ids)
+            last_id = task_ids[-1]
+        return processed
\ No newline at end of file
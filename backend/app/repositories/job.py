@@ -0,0 +1,82 @@
+from typing import Any, Optional
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job import Job
+
+
+class JobRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_job_in_db(
+        self, job_type: str, payload: dict, user_id: int, owner_id: Optional[str] = None
+    ) -> Job:
+        job = Job(
+            type=job_type,
+            status="queued",
+            payload=jsonable_encoder(payload),
+            created_by=user_id,
+            owner_id=owner_id,
+            heartbeat_at=datetime.utcnow(),
+        )
+        self.db.add(job)
+        await self.db.commit()
+        await self.db.refresh(job)
+        return job
+
+    async def get_job_by_id_in_db(self, job_id: int) -> Optional[Job]:
+        return await self.db.get(Job, job_id)
+
+    async def _update_job(self, job_id: int, **values) -> None:
+        await self.db.execute(
+            update(Job).where(Job.id == job_id).values(**values).execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+
+    async def mark_job_running_in_db(self, job_id: int) -> None:
+        await self._update_job(job_id, status="running", started_at=datetime.utcnow())
+
+    async def update_job_progress_in_db(self, job_id: int, progress: int, total: Optional[int] = None) -> None:
+        values = {"progress": progress}
+        if total is not None:
+            values["total"] = total
+        await self._update_job(job_id, **values)
+
+    async def finish_job_in_db(self, job_id: int, result: Any) -> None:
+        await self._update_job(
+            job_id, status="succeeded", result=jsonable_encoder(result), finished_at=datetime.utcnow()
+        )
+
+    async def fail_job_in_db(self, job_id: int, error: str) -> None:
+        await self._update_job(job_id, status="failed", error=error[:500], finished_at=datetime.utcnow())
+
+    async def heartbeat_jobs_in_db(self, owner_id: str) -> int:
+        """Mark every unfinished job of a runner process as still alive."""
+        result = await self.db.execute(
+            update(Job)
+            .where(Job.owner_id == owner_id, Job.status.in_(("queued", "running")))
+            .values(heartbeat_at=datetime.utcnow())
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def fail_interrupted_jobs_in_db(self, stale_before: datetime) -> int:
+        """
+        Fail queued or running jobs whose runner stopped heartbeating before stale_before.
+        Jobs live in the memory of their process, so once it is gone nothing will ever
+        pick them up again; jobs of processes that are still alive are left alone.
+        """
+        result = await self.db.execute(
+            update(Job)
+            .where(
+                Job.status.in_(("queued", "running")),
+                (Job.heartbeat_at.is_(None)) | (Job.heartbeat_at < stale_before),
+            )
+            .values(status="failed", error="Interrupted by a server restart", finished_at=datetime.utcnow())
+        )
+        await self.db.commit()
+        return result.rowcount
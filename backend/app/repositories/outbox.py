@@ -0,0 +1,23 @@
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.outbox import OutboxEvent
+
+
+class OutboxRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def stage_event(self, event_type: str, aggregate_id: int, payload) -> OutboxEvent:
+        """
+        Add an outbox event to the current transaction without committing, so it is
+        persisted if and only if the write that produced it is.
+        """
+        event = OutboxEvent(
+            event_type=event_type,
+            aggregate_type=event_type.split(".", 1)[0],
+            aggregate_id=aggregate_id,
+            payload=jsonable_encoder(payload),
+        )
+        self.db.add(event)
+        return event
@@ -1,19 +1,87 @@
-from typing import List, Optional
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
 from datetime import datetime
 
 from app.models.user import User
+from app.core.loader import Loaders, loaders_for
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import and_, bindparam, select, union_all, update
+from sqlalchemy.sql import Select
 
-from app.models.task import Task
-from app.schemas.task import TaskCreate, TaskResponse, TaskUpdate, TaskBulkUpdate
+from app.models.archive import ArchivedTask
+from app.models.task import OPEN_TASK_CONDITION, Task, rank_of_priority
+from app.schemas.task import TaskCreate, TaskFieldsResponse, TaskResponse, TaskUpdate, TaskBulkUpdate
 from app.schemas.auth import UserResponse
 from sqlalchemy.orm import selectinload
 from app.repositories.interfaces.task import AbstractTaskRepository
+from app.repositories.outbox import OutboxRepository
+from app.repositories.task_counter import COUNTED_TASK_FIELDS, TaskCounterRepository
+from app.repositories.task_event import TASK_HISTORY_FIELDS, TaskEventRepository, history_changes, history_previous
+
+# Filter statements kept for reuse; the least recently used shape is dropped past this
+FILTER_STATEMENT_CACHE_SIZE = 256
+
+# Attempts at claiming a task where SKIP LOCKED isn't available and another
+# claimer can take the candidate between picking and updating it
+CLAIM_MAX_ATTEMPTS = 5
+
+
+def task_sort_columns(tasks) -> dict:
+    """Sort keys accepted by filter_tasks_in_db, over the columns of tasks (a table or subquery)."""
+    return {
+        "id": tasks.c.id,
+        "title": tasks.c.title,
+        "status": tasks.c.status,
+        "priority": tasks.c.priority_rank,
+        "due_date": tasks.c.due_date,
+        "created_at": tasks.c.created_at,
+        "updated_at": tasks.c.updated_at,
+    }
+
+
+def task_filters(tasks) -> dict:
+    """Conditions accepted by filter_tasks_in_db, each bound to the parameter of the same name."""
+    return {
+        "status": tasks.c.status.in_(bindparam("status", expanding=True)),
+        "priority": tasks.c.priority.in_(bindparam("priority", expanding=True)),
+        "assigned_to": tasks.c.assigned_to == bindparam("assigned_to"),
+        "created_by": tasks.c.created_by == bindparam("created_by"),
+        "due_after": tasks.c.due_date >= bindparam("due_after"),
+        "due_before": tasks.c.due_date < bindparam("due_before"),
+        # Bound to the current time
+        "overdue": and_(tasks.c.due_date < bindparam("overdue"), tasks.c.status != "completed"),
+        # Bound to a LIKE pattern
+        "search": tasks.c.title.ilike(bindparam("search"), escape="\\"),
+    }
+
+
+TASK_SORT_COLUMNS = task_sort_columns(Task.__table__)
+TASK_FILTERS = task_filters(Task.__table__)
+
+# TaskResponse fields that hold a user's name rather than a column value
+TASK_USER_FIELDS = ("created_by", "updated_by", "assigned_to")
+
+# Live and archived tasks together, for reads that include history. The filters are
+# pushed down into both halves, so each is still served by its own indexes.
+ALL_TASKS = union_all(
+    select(*Task.__table__.c),
+    select(*(ArchivedTask.__table__.c[column.name] for column in Task.__table__.c)),
+).subquery("all_tasks")
 
 class TaskRepository(AbstractTaskRepository):
-    def __init__(self, db: AsyncSession):
+    # Filter statements by shape: the filters used, the sort order, whether there is
+    # a limit, whether archived tasks are included and the fields returned. Values are
+    # bound at execution, so every request with the same shape reuses one statement and
+    # SQLAlchemy's cached compilation of it. Shapes combine, so the cache is an LRU
+    # bounded by FILTER_STATEMENT_CACHE_SIZE.
+    _filter_statements: OrderedDict[tuple, Select] = OrderedDict()
+
+    def __init__(self, db: AsyncSession, loaders: Optional[Loaders] = None):
         self.db = db
+        self.loaders = loaders or loaders_for(db)
+        self.outbox = OutboxRepository(db)
+        self.counters = TaskCounterRepository(db)
+        self.history = TaskEventRepository(db)
         
     async def enrich_tasks_with_usernames(self, tasks: list[Task]) -> list[TaskResponse]:
         user_ids = set()
@@ -25,8 +93,8 @@ class TaskRepository(AbstractTaskRepository):
             if task.assigned_to:
                 user_ids.add(task.assigned_to)
 
-        result = await self.db.execute(select(User).where(User.id.in_(user_ids)))
-        user_map = {user.id: user.username for user in result.scalars().all()}
+        users = await self.loaders.users.load_many(user_ids)
+        user_map = {user.id: user.username for user in users if user}
 
         return [
             TaskResponse(
@@ -40,11 +108,132 @@ class TaskRepository(AbstractTaskRepository):
                 updated_at=t.updated_at,
                 created_by=user_map.get(t.created_by, "Desconocido"),
                 updated_by=user_map.get(t.updated_by, "Desconocido"),
-                assigned_to=user_map.get(t.assigned_to, "Desconocido") if t.assigned_to else None
+                assigned_to=user_map.get(t.assigned_to, "Desconocido") if t.assigned_to else None,
+                comments_count=t.comments_count or 0,
+                last_commented_at=t.last_commented_at,
+                version=t.version or 1,
             )
             for t in tasks
         ]
 
+    def _stage_task_event(self, event_type: str, source) -> None:
+        # source is a Task or a RETURNING row; both expose the task columns as attributes.
+        # Every write stages an event, so this is also where a loaded copy is forgotten.
+        self.loaders.tasks.clear(source.id)
+        payload = {column.name: getattr(source, column.name) for column in Task.__table__.c}
+        self.outbox.stage_event(event_type, source.id, payload)
+
+    def _counted_fields_of(self, source) -> dict:
+        return {field: getattr(source, field) for field in COUNTED_TASK_FIELDS.values()}
+
+    def _replaced_fields(self, values: dict) -> List[str]:
+        """
+        Fields whose old values a write needs: the tracked fields it sets, for the
+        history, and every counted field when it moves a counter.
+        """
+        fields = [field for field in TASK_HISTORY_FIELDS if field in values]
+        counted = COUNTED_TASK_FIELDS.values()
+        if set(values) & set(counted):
+            fields += [field for field in counted if field not in fields]
+        return fields
+
+    async def _update_returning_old(self, stmt, task_id: int, values: dict, *columns, **options):
+        """
+        Run a task UPDATE ... RETURNING columns. Returns the row, or None when nothing
+        matched, and the values the write replaced (see _replaced_fields).
+
+        On Postgres the old values come back from the same statement: the row is locked
+        and read in a FROM subquery (UPDATE tasks ... FROM (SELECT ... FOR UPDATE) old
+        RETURNING old.*), so the counters and history start from exactly the values this
+        write replaced. SQLite has no row locks and can't return columns of a joined
+        table, so there they are read just before the UPDATE.
+        """
+        fields = self._replaced_fields(values)
+        if not fields:
+            row = (await self.db.execute(stmt.returning(*columns).execution_options(**options))).first()
+            return row, {}
+
+        if self.db.bind.dialect.name == "postgresql":
+            old = (
+                select(Task.id, *(getattr(Task, field) for field in fields))
+                .where(Task.id == task_id)
+                .with_for_update()
+                .subquery("old")
+            )
+            stmt = stmt.where(Task.id == old.c.id).returning(
+                *columns, *(old.c[field].label(f"old_{field}") for field in fields)
+            )
+            row = (await self.db.execute(stmt.execution_options(**options))).first()
+            if row is None:
+                return None, None
+            return row, {field: row._mapping[f"old_{field}"] for field in fields}
+
+        result = await self.db.execute(select(*(getattr(Task, field) for field in fields)).where(Task.id == task_id))
+        old_row = result.first()
+        row = (await self.db.execute(stmt.returning(*columns).execution_options(**options))).first()
+        if row is None:
+            return None, None
+        return row, old_row._asdict()
+
+    async def _update_counters(self, old: dict, source) -> None:
+        # old holds the counted fields only when the write moved a counter
+        if set(COUNTED_TASK_FIELDS.values()) <= old.keys():
+            await self.counters.apply_change(old, self._counted_fields_of(source))
+
+    def _username_subquery(self, user_column):
+        return select(User.username).where(User.id == user_column).scalar_subquery()
+
+    def _enriched_task_columns(self, tasks=Task.__table__, fields: Optional[Tuple[str, ...]] = None):
+        # Task columns plus the usernames of the related users, so a single
+        # RETURNING clause yields everything a TaskResponse needs. With fields, only
+        # the columns (and usernames) behind those TaskResponse fields are selected.
+        if fields is None:
+            return (
+                *tasks.c,
+                self._username_subquery(tasks.c.created_by).label("created_by_username"),
+                self._username_subquery(tasks.c.updated_by).label("updated_by_username"),
+                self._username_subquery(tasks.c.assigned_to).label("assigned_to_username"),
+            )
+        columns = [tasks.c[field] for field in fields]
+        columns += [
+            self._username_subquery(tasks.c[field]).label(f"{field}_username")
+            for field in fields
+            if field in TASK_USER_FIELDS
+        ]
+        return tuple(columns)
+
+    def _task_response_from_row(self, row) -> TaskResponse:
+        return TaskResponse(
+            id=row.id,
+            title=row.title,
+            description=row.description,
+            status=row.status,
+            priority=row.priority,
+            due_date=row.due_date,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            created_by=row.created_by_username or "Desconocido",
+            updated_by=row.updated_by_username or "Desconocido",
+            assigned_to=(row.assigned_to_username or "Desconocido") if row.assigned_to else None,
+            comments_count=row.comments_count or 0,
+            last_commented_at=row.last_commented_at,
+            version=row.version,
+        )
+
+    def _task_fields_from_row(self, row, fields: Tuple[str, ...]) -> TaskFieldsResponse:
+        values = {}
+        for field in fields:
+            value = getattr(row, field)
+            if field in TASK_USER_FIELDS and value is not None:
+                value = getattr(row, f"{field}_username") or "Desconocido"
+            values[field] = value
+        return TaskFieldsResponse(**values)
+
+    def _task_from_row(self, row, fields: Optional[Tuple[str, ...]]):
+        if fields is None:
+            return self._task_response_from_row(row)
+        return self._task_fields_from_row(row, fields)
+
     async def create_task_in_db(self, task_data: TaskCreate, user_id: int) -> Task:
         now = datetime.utcnow()
         new_task = Task(
@@ -52,6 +241,7 @@ class TaskRepository(AbstractTaskRepository):
             description=task_data.description,
             status=task_data.status,
             priority=task_data.priority,
+            priority_rank=rank_of_priority(task_data.priority),
             due_date=task_data.due_date,
             assigned_to=task_data.assigned_to,
             created_by=user_id,
@@ -60,54 +250,127 @@ class TaskRepository(AbstractTaskRepository):
             updated_at=now,
         )
         self.db.add(new_task)
+        await self.db.flush()
+        await self.counters.apply_change(None, self._counted_fields_of(new_task))
+        await self.history.record_events("created", [(new_task.id, new_task.version, history_changes(new_task), None)], user_id)
+        self._stage_task_event("task.created", new_task)
         await self.db.commit()
         await self.db.refresh(new_task)
         return new_task
 
 
-    async def update_task_in_db(self, task_id: int, task_data: TaskUpdate, user_id: int) -> Optional[Task]:
-        task = await self.db.get(Task, task_id)
-        if not task:
-            return None
+    def _versioned_update(self, task_id: int, values: dict, user_id: int, expected_version: Optional[int] = None):
+        """
+        Build the UPDATE for a task write. When expected_version is given the version
+        check is part of the WHERE clause, so a concurrent edit makes it match no rows.
+        """
+        stmt = update(Task).where(Task.id == task_id)
+        if expected_version is not None:
+            stmt = stmt.where(Task.version == expected_version)
+        if "priority" in values:
+            values = {**values, "priority_rank": rank_of_priority(values["priority"])}
+        return stmt.values(
+            **values,
+            updated_by=user_id,
+            updated_at=datetime.utcnow(),
+            version=Task.version + 1,
+        )
 
+    async def update_task_in_db(self, task_id: int, task_data: TaskUpdate, user_id: int, expected_version: Optional[int] = None) -> Optional[Task]:
+        """
+        Update a task with a single conditional UPDATE ... RETURNING.
+        Returns None if the task does not exist or its version does not match expected_version.
+        """
+        values = {}
         if task_data.title is not None:
-            task.title = task_data.title
+            values["title"] = task_data.title
         if task_data.description is not None:
-            task.description = task_data.description
+            values["description"] = task_data.description
         if task_data.status is not None:
-            task.status = task_data.status
+            values["status"] = task_data.status
         if task_data.priority is not None:
-            task.priority = task_data.priority
+            values["priority"] = task_data.priority
         if task_data.due_date is not None:
-            task.due_date = task_data.due_date
+            values["due_date"] = task_data.due_date
         if task_data.assigned_to is not None:
-            task.assigned_to = task_data.assigned_to
+            values["assigned_to"] = task_data.assigned_to
+
+        row, old = await self._update_returning_old(
+            self._versioned_update(task_id, values, user_id, expected_version),
+            task_id,
+            values,
+            Task,
+            # Refresh a copy of the task already in the session rather than keep its stale values
+            populate_existing=True,
+        )
+        task = row[0] if row else None
+        if task:
+            await self._update_counters(old, task)
+            changes = history_changes(values)
+            await self.history.record_events(
+                "updated", [(task.id, task.version, changes, history_previous(old, changes))], user_id
+            )
+            self._stage_task_event("task.updated", task)
+        await self.db.commit()
+        return task
 
-        task.updated_by = user_id
-        task.updated_at = datetime.utcnow()
 
+    async def patch_task_in_db(self, task_id: int, fields: dict, user_id: int, expected_version: Optional[int] = None) -> Optional[TaskResponse]:
+        """
+        Apply only the given fields to a task with a single UPDATE ... RETURNING
+        and return the enriched row. Returns None if the task does not exist or
+        its version does not match expected_version.
+        """
+        row, old = await self._update_returning_old(
+            self._versioned_update(task_id, fields, user_id, expected_version),
+            task_id,
+            fields,
+            *self._enriched_task_columns(),
+            synchronize_session=False,
+        )
+        if row is None:
+            return None
+        await self._update_counters(old, row)
+        changes = history_changes(fields)
+        await self.history.record_events(
+            "updated", [(row.id, row.version, changes, history_previous(old, changes))], user_id
+        )
+        self._stage_task_event("task.updated", row)
         await self.db.commit()
-        await self.db.refresh(task)
-        return task
+        return self._task_response_from_row(row)
 
 
     async def bulk_update_tasks_in_db(self, task_ids: List[int], update_data: TaskBulkUpdate, user_id: int) -> List[Task]:
-        result = await self.db.execute(select(Task).where(Task.id.in_(task_ids)))
+        result = await self.db.execute(
+            select(Task).where(Task.id.in_(task_ids)).execution_options(populate_existing=True)
+        )
         tasks = result.scalars().all()
 
+        written = history_changes(update_data.dict(exclude_none=True))
+        changes = []
+        events = []
         for task in tasks:
+            old = self._counted_fields_of(task)
+            previous = history_previous(history_changes(task), written)
             if update_data.status is not None:
                 task.status = update_data.status
             if update_data.assigned_to is not None:
                 task.assigned_to = update_data.assigned_to
             if update_data.priority is not None:
                 task.priority = update_data.priority
+                task.priority_rank = rank_of_priority(update_data.priority)
             if update_data.due_date is not None:
                 task.due_date = update_data.due_date
 
             task.updated_by = user_id
             task.updated_at = datetime.utcnow()
+            task.version = (task.version or 1) + 1
+            changes.append((old, self._counted_fields_of(task)))
+            events.append((task.id, task.version, written, previous))
+            self._stage_task_event("task.updated", task)
 
+        await self.counters.apply_changes(changes)
+        await self.history.record_events("updated", events, user_id)
         await self.db.commit()
         return tasks
 
@@ -117,8 +380,170 @@ class TaskRepository(AbstractTaskRepository):
         return result.scalars().all()
 
 
+    def _filter_statement(
+        self,
+        filter_names: Tuple[str, ...],
+        sort: Tuple[Tuple[str, bool], ...],
+        limited: bool,
+        include_archived: bool,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> Select:
+        shape = (filter_names, sort, limited, include_archived, fields)
+        stmt = self._filter_statements.get(shape)
+        if stmt is not None:
+            self._filter_statements.move_to_end(shape)
+        else:
+            tasks = ALL_TASKS if include_archived else Task.__table__
+            sort_columns = task_sort_columns(tasks)
+            conditions = task_filters(tasks)
+            order_by = [
+                sort_columns[field].desc() if descending else sort_columns[field].asc()
+                for field, descending in sort
+            ]
+            stmt = (
+                select(*self._enriched_task_columns(tasks, fields))
+                .where(*(conditions[name] for name in filter_names))
+                # id breaks ties so pages are stable
+                .order_by(*order_by, tasks.c.id)
+                .offset(bindparam("offset"))
+            )
+            if limited:
+                stmt = stmt.limit(bindparam("limit"))
+            self._filter_statements[shape] = stmt
+            if len(self._filter_statements) > FILTER_STATEMENT_CACHE_SIZE:
+                self._filter_statements.popitem(last=False)
+        return stmt
+
+    async def filter_tasks_in_db(
+        self,
+        filters: dict,
+        sort: Sequence[Tuple[str, bool]] = (),
+        skip: int = 0,
+        limit: Optional[int] = None,
+        include_archived: bool = False,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[TaskResponse]:
+        """
+        Tasks matching every filter in filters (name -> value, see TASK_FILTERS), in the
+        order given by sort as (field, descending) pairs, with their users' names.
+        Only live tasks unless include_archived. Runs as a single query.
+        With fields, only those TaskResponse fields are read and returned, as
+        TaskFieldsResponse.
+        """
+        filter_names = tuple(sorted(filters))
+        stmt = self._filter_statement(filter_names, tuple(sort), limit is not None, include_archived, fields)
+        params = {**filters, "offset": skip}
+        if limit is not None:
+            params["limit"] = limit
+        result = await self.db.execute(stmt, params)
+        return [self._task_from_row(row, fields) for row in result.all()]
+
+
+    def _claimable_task(self):
+        # The most important unassigned pending task, read off ix_tasks_queue alone
+        return (
+            select(Task.id)
+            .where(Task.assigned_to.is_(None), Task.status == "pending", OPEN_TASK_CONDITION)
+            .order_by(Task.priority_rank.desc(), Task.due_date.asc().nulls_last(), Task.id)
+            .limit(1)
+        )
+
+    def _claim(self, task_id, user_id: int):
+        # Repeats the eligibility check, so a task someone else claimed first matches no rows
+        return (
+            self._versioned_update(task_id, {"status": "in_progress", "assigned_to": user_id}, user_id)
+            .where(Task.status == "pending", Task.assigned_to.is_(None))
+            .returning(*self._enriched_task_columns())
+            .execution_options(synchronize_session=False)
+        )
+
+    async def claim_next_task_in_db(self, user_id: int) -> Optional[TaskResponse]:
+        """
+        Assign the next unassigned pending task to user_id and set it in progress.
+        Returns None when there is nothing to claim.
+
+        On Postgres the pick and the update are one statement, and the pick skips rows
+        locked by concurrent claimers (FOR UPDATE SKIP LOCKED). They don't queue behind
+        each other; each one takes the next free task. Elsewhere the candidate is
+        updated only if it is still unclaimed, and picking again if it isn't.
+        """
+        if self.db.bind.dialect.name == "postgresql":
+            candidate = self._claimable_task().with_for_update(skip_locked=True).scalar_subquery()
+            row = (await self.db.execute(self._claim(candidate, user_id))).first()
+        else:
+            row = None
+            for _ in range(CLAIM_MAX_ATTEMPTS):
+                task_id = (await self.db.execute(self._claimable_task())).scalar_one_or_none()
+                if task_id is None:
+                    break
+                row = (await self.db.execute(self._claim(task_id, user_id))).first()
+                if row is not None:
+                    break
+
+        if row is None:
+            await self.db.rollback()
+            return None
+        # The counters are the last write so their rows stay locked only until the commit
+        await self._update_counters({**self._counted_fields_of(row), "status": "pending", "assigned_to": None}, row)
+        await self.history.record_events(
+            "claimed",
+            [
+                (
+                    row.id,
+                    row.version,
+                    {"status": row.status, "assigned_to": row.assigned_to},
+                    # Only a pending, unassigned task can be claimed
+                    {"status": "pending", "assigned_to": None},
+                )
+            ],
+            user_id,
+        )
+        self._stage_task_event("task.claimed", row)
+        await self.db.commit()
+        return self._task_response_from_row(row)
+
+    async def get_next_tasks_in_db(
+        self, assignee_id: int, limit: int, fields: Optional[Tuple[str, ...]] = None
+    ) -> List[TaskResponse]:
+        """
+        The limit most important open tasks of an assignee: highest priority first,
+        then earliest due date, tasks without one last.
+        The conditions and order match ix_tasks_queue, so the rows are read off the
+        index in order and the scan stops after limit entries. The index covers every
+        field but title and description, so with fields= leaving those out the table
+        isn't read at all.
+        """
+        result = await self.db.execute(
+            select(*self._enriched_task_columns(fields=fields))
+            .where(Task.assigned_to == assignee_id, OPEN_TASK_CONDITION)
+            .order_by(Task.priority_rank.desc(), Task.due_date.asc().nulls_last(), Task.id)
+            .limit(limit)
+        )
+        return [self._task_from_row(row, fields) for row in result.all()]
+
+
     async def get_task_by_id_in_db(self, task_id: int) -> Optional[Task]:
-        return await self.db.get(Task, task_id)
+        return await self.loaders.tasks.load(task_id)
+
+    async def get_task_history_in_db(self, task_id: int, before_id: Optional[int], limit: int) -> List[tuple]:
+        return await self.history.get_task_events_in_db(task_id, before_id, limit)
+
+    async def get_task_fields_in_db(
+        self, task_id: int, fields: Tuple[str, ...], include_archived: bool = False
+    ) -> Optional[TaskFieldsResponse]:
+        """The given TaskResponse fields of a task, reading only the columns behind them."""
+        tasks = ALL_TASKS if include_archived else Task.__table__
+        result = await self.db.execute(
+            select(*self._enriched_task_columns(tasks, fields)).where(tasks.c.id == task_id)
+        )
+        row = result.first()
+        return self._task_fields_from_row(row, fields) if row else None
+
+    async def get_archived_task_in_db(self, task_id: int) -> Optional[TaskResponse]:
+        archive = ArchivedTask.__table__
+        result = await self.db.execute(select(*self._enriched_task_columns(archive)).where(archive.c.id == task_id))
+        row = result.first()
+        return self._task_response_from_row(row) if row else None
 
 
     async def get_tasks_created_by_user_in_db(self, user_id: int) -> List[Task]:
@@ -136,6 +561,18 @@ class TaskRepository(AbstractTaskRepository):
         return result.scalars().all()
 
 
+    async def get_task_stats_in_db(self) -> dict:
+        """Task counts by status, priority and assignee, plus the overdue count."""
+        counters = await self.counters.get_counters_in_db()
+        return {
+            "total": sum(counters["status"].values()),
+            "by_status": counters["status"],
+            "by_priority": counters["priority"],
+            "by_assignee": counters["assignee"],
+            "overdue": await self.counters.count_overdue_tasks_in_db(datetime.utcnow()),
+        }
+
+
     async def get_overdue_tasks_in_db(self) -> List[Task]:
         now = datetime.utcnow()
         result = await self.db.execute(select(Task).where(Task.due_date < now, Task.status != "completed"))
@@ -159,24 +596,33 @@ class TaskRepository(AbstractTaskRepository):
         return result.scalars().all()
 
 
-    async def update_task_status_in_db(self, task_id: int, status: str, user_id: int) -> Optional[Task]:
-        task = await self.db.get(Task, task_id)
-        if not task:
-            return None
-
-        task.status = status
-        task.updated_by = user_id
-        task.updated_at = datetime.utcnow()
-
+    async def update_task_status_in_db(self, task_id: int, status: str, user_id: int, expected_version: Optional[int] = None) -> Optional[Task]:
+        row, old = await self._update_returning_old(
+            self._versioned_update(task_id, {"status": status}, user_id, expected_version),
+            task_id,
+            {"status": status},
+            Task,
+            populate_existing=True,
+        )
+        task = row[0] if row else None
+        if task:
+            await self._update_counters(old, task)
+            await self.history.record_events(
+                "status_changed", [(task.id, task.version, {"status": status}, {"status": old["status"]})], user_id
+            )
+            self._stage_task_event("task.status_changed", task)
         await self.db.commit()
-        await self.db.refresh(task)
         return task
 
-    async def delete_task_in_db(self, task_id: int) -> Optional[Task]:
-        task = await self.db.get(Task, task_id)
+    async def delete_task_in_db(self, task_id: int, user_id: Optional[int] = None) -> Optional[Task]:
+        # Fresh values, as the counters and history start from them
+        task = await self.db.get(Task, task_id, populate_existing=True)
         if not task:
             return None
 
+        self._stage_task_event("task.deleted", task)
+        await self.counters.apply_change(self._counted_fields_of(task), None)
+        await self.history.record_events("deleted", [(task.id, task.version, {}, history_changes(task))], user_id)
         await self.db.delete(task)
         await self.db.commit()
         return task
\ No newline at end of file
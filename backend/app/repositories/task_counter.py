@@ -0,0 +1,103 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+from datetime import datetime
+
+from sqlalchemy import String, cast, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.task import Task
+from app.models.task_counter import TaskCounter
+
+# Counter dimension -> task column it counts
+COUNTED_TASK_FIELDS = {"status": "status", "priority": "priority", "assignee": "assigned_to"}
+UNASSIGNED_KEY = "unassigned"
+MISSING_KEY = "none"
+
+
+def counter_key(dimension: str, value) -> str:
+    if value is None:
+        return UNASSIGNED_KEY if dimension == "assignee" else MISSING_KEY
+    return str(value)
+
+
+class TaskCounterRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _insert(self):
+        dialect = self.db.bind.dialect.name
+        return pg_insert(TaskCounter) if dialect == "postgresql" else sqlite_insert(TaskCounter)
+
+    async def apply_change(self, old: Optional[Mapping], new: Optional[Mapping]) -> None:
+        """
+        Move a task between counters. old and new map task column names to values;
+        old is None for a created task and new is None for a deleted one.
+        Does not commit, so the counters change together with the task write.
+        """
+        await self.apply_changes([(old, new)])
+
+    async def apply_changes(self, changes: Iterable[Tuple[Optional[Mapping], Optional[Mapping]]]) -> None:
+        """Apply the (old, new) changes of several tasks with a single upsert."""
+        deltas = defaultdict(int)
+        for old, new in changes:
+            for dimension, field in COUNTED_TASK_FIELDS.items():
+                if old is not None:
+                    deltas[(dimension, counter_key(dimension, old[field]))] -= 1
+                if new is not None:
+                    deltas[(dimension, counter_key(dimension, new[field]))] += 1
+
+        # Sorted so concurrent writes lock the counter rows in the same order
+        # and can't deadlock each other
+        rows = [
+            {"dimension": dimension, "key": key, "count": delta}
+            for (dimension, key), delta in sorted(deltas.items())
+            if delta
+        ]
+        if not rows:
+            return
+
+        # One upsert for every counter touched by the write
+        stmt = self._insert().values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TaskCounter.dimension, TaskCounter.key],
+            set_={"count": TaskCounter.count + stmt.excluded.count},
+        )
+        await self.db.execute(stmt)
+
+    async def get_counters_in_db(self) -> Dict[str, Dict[str, int]]:
+        result = await self.db.execute(select(TaskCounter).where(TaskCounter.count != 0))
+        counters = {dimension: {} for dimension in COUNTED_TASK_FIELDS}
+        for counter in result.scalars().all():
+            counters.setdefault(counter.dimension, {})[counter.key] = counter.count
+        return counters
+
+    async def count_overdue_tasks_in_db(self, now: datetime) -> int:
+        # Overdue depends on the clock rather than on writes, so it can't be a
+        # write-time counter; it is served from the due_date index instead
+        result = await self.db.execute(
+            select(func.count(Task.id)).where(Task.due_date < now, Task.status != "completed")
+        )
+        return result.scalar()
+
+    async def reconcile_task_counters_in_db(self) -> int:
+        """
+        Rebuild every counter from a GROUP BY over the tasks table in a single
+        transaction, repairing any drift. Returns the number of counters written.
+        """
+        await self.db.execute(delete(TaskCounter))
+        written = 0
+        for dimension, field in COUNTED_TASK_FIELDS.items():
+            column = getattr(Task, field)
+            fallback = UNASSIGNED_KEY if dimension == "assignee" else MISSING_KEY
+            key = func.coalesce(cast(column, String), fallback)
+            result = await self.db.execute(
+                TaskCounter.__table__.insert().from_select(
+                    ["dimension", "key", "count"],
+                    select(literal(dimension), key, func.count(Task.id)).group_by(key),
+                )
+            )
+            written += result.rowcount
+        await self.db.commit()
+        return written
@@ -0,0 +1,73 @@
+from typing import Iterable, List, Optional, Tuple
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.task_event import TaskEvent
+from app.models.user import User
+
+# Task fields recorded in the history. priority_rank follows priority, and the
+# event's own user and time stand in for updated_by and updated_at.
+TASK_HISTORY_FIELDS = ("title", "description", "status", "priority", "due_date", "assigned_to")
+
+
+def history_changes(values) -> dict:
+    """The tracked fields of values, a dict of written fields or a task."""
+    if isinstance(values, dict):
+        return {field: values[field] for field in TASK_HISTORY_FIELDS if field in values}
+    return {field: getattr(values, field) for field in TASK_HISTORY_FIELDS}
+
+
+def history_previous(old, changes: dict) -> dict:
+    """The values the fields in changes had before the write, out of old."""
+    return {field: old[field] for field in changes}
+
+
+class TaskEventRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record_events(
+        self,
+        event_type: str,
+        entries: Iterable[Tuple[int, Optional[int], dict, Optional[dict]]],
+        user_id: Optional[int],
+    ) -> None:
+        """
+        Append one event per (task_id, version, changes, previous) entry with a single
+        INSERT. Does not commit, so the history is written if and only if the task write is.
+        """
+        now = datetime.utcnow()
+        rows = [
+            {
+                "task_id": task_id,
+                "event_type": event_type,
+                "changes": jsonable_encoder(changes),
+                "previous": jsonable_encoder(previous),
+                "version": version,
+                "user_id": user_id,
+                "created_at": now,
+            }
+            for task_id, version, changes, previous in entries
+        ]
+        if rows:
+            await self.db.execute(insert(TaskEvent).values(rows))
+
+    async def get_task_events_in_db(self, task_id: int, before_id: Optional[int], limit: int) -> List[tuple]:
+        """
+        Up to limit (event, username) of a task, newest first, starting below before_id.
+        Served by ix_task_events_task_id_id.
+        """
+        stmt = (
+            select(TaskEvent, User.username)
+            .outerjoin(User, User.id == TaskEvent.user_id)
+            .where(TaskEvent.task_id == task_id)
+            .order_by(TaskEvent.id.desc())
+            .limit(limit)
+        )
+        if before_id is not None:
+            stmt = stmt.where(TaskEvent.id < before_id)
+        result = await self.db.execute(stmt)
+        return result.all()
@@ -0,0 +1,86 @@
+from typing import Dict, Optional
+from datetime import datetime
+
+from sqlalchemy import select, delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.refresh_token import RefreshToken
+from app.models.revoked_token import RevokedToken
+
+
+class RevokedTokenRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add_revoked_token_in_db(self, jti: str, expires_at: datetime) -> None:
+        self.db.add(RevokedToken(jti=jti, expires_at=expires_at))
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            # Already revoked
+            await self.db.rollback()
+
+    async def get_active_revoked_tokens_in_db(self, now: datetime) -> Dict[str, datetime]:
+        result = await self.db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > now)
+        )
+        return {jti: expires_at for jti, expires_at in result.all()}
+
+    async def delete_expired_revoked_tokens_in_db(self, now: datetime) -> int:
+        result = await self.db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+        await self.db.commit()
+        return result.rowcount
+
+
+class RefreshTokenRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add_refresh_token_in_db(self, user_id: int, family_id: str, token_hash: str, expires_at: datetime) -> RefreshToken:
+        token = RefreshToken(user_id=user_id, family_id=family_id, token_hash=token_hash, expires_at=expires_at)
+        self.db.add(token)
+        await self.db.commit()
+        return token
+
+    async def get_refresh_token_by_hash_in_db(self, token_hash: str) -> Optional[RefreshToken]:
+        result = await self.db.execute(select(RefreshToken).where(RefreshToken.token_hash == token_hash))
+        return result.scalar_one_or_none()
+
+    async def rotate_refresh_token_in_db(self, token_id: int, token_hash: str, expires_at: datetime) -> bool:
+        """
+        Mark a refresh token used and add its successor in one transaction.
+        Returns False when the token was already used or revoked, e.g. by a concurrent
+        refresh, in which case nothing is written.
+        """
+        now = datetime.utcnow()
+        result = await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == token_id, RefreshToken.used_at.is_(None), RefreshToken.revoked_at.is_(None))
+            .values(used_at=now)
+            .returning(RefreshToken.family_id, RefreshToken.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        row = result.first()
+        if row is None:
+            await self.db.rollback()
+            return False
+
+        self.db.add(RefreshToken(user_id=row.user_id, family_id=row.family_id, token_hash=token_hash, expires_at=expires_at))
+        await self.db.commit()
+        return True
+
+    async def revoke_refresh_token_family_in_db(self, family_id: str) -> int:
+        result = await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def delete_expired_refresh_tokens_in_db(self, now: datetime) -> int:
+        result = await self.db.execute(delete(RefreshToken).where(RefreshToken.expires_at <= now))
+        await self.db.commit()
+        return result.rowcount
@@ -0,0 +1,106 @@
+from typing import List, Optional
+from datetime import datetime
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.outbox import OutboxEvent
+from app.models.webhook import Webhook
+from app.schemas.webhook import WebhookCreate
+
+
+class WebhookRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_webhook_in_db(self, webhook_data: WebhookCreate) -> Webhook:
+        # New endpoints only receive events written after they were registered
+        last_event_id = (await self.db.execute(select(func.max(OutboxEvent.id)))).scalar() or 0
+        webhook = Webhook(url=str(webhook_data.url), is_active=True, last_event_id=last_event_id)
+        self.db.add(webhook)
+        await self.db.commit()
+        await self.db.refresh(webhook)
+        return webhook
+
+    async def get_all_webhooks_in_db(self) -> List[Webhook]:
+        result = await self.db.execute(select(Webhook).order_by(Webhook.id))
+        return result.scalars().all()
+
+    async def delete_webhook_in_db(self, webhook_id: int) -> Optional[Webhook]:
+        webhook = await self.db.get(Webhook, webhook_id)
+        if not webhook:
+            return None
+
+        await self.db.delete(webhook)
+        await self.db.commit()
+        return webhook
+
+    async def get_due_webhooks_in_db(self, now: datetime) -> List[Webhook]:
+        result = await self.db.execute(
+            select(Webhook).where(
+                Webhook.is_active.is_(True),
+                (Webhook.next_attempt_at.is_(None)) | (Webhook.next_attempt_at <= now),
+            )
+        )
+        return result.scalars().all()
+
+    async def get_visibility_horizon_in_db(self, settled_before: datetime) -> int:
+        """
+        Outbox id below which no more events can show up.
+
+        Ids are drawn when an event is inserted but the row only becomes visible when its
+        transaction commits, so a slow transaction can publish an id below ones already
+        delivered. Writers commit right after staging their events, so anything older than
+        settled_before has committed or rolled back; the horizon stops at the first event
+        that is younger, and cursors never move past an id that could still be filled in.
+        """
+        young = (
+            await self.db.execute(select(func.min(OutboxEvent.id)).where(OutboxEvent.created_at > settled_before))
+        ).scalar()
+        if young is not None:
+            return young
+        newest = (await self.db.execute(select(func.max(OutboxEvent.id)))).scalar()
+        return newest + 1 if newest is not None else 0
+
+    async def get_pending_events_in_db(self, after_id: int, horizon: int, limit: int) -> List[OutboxEvent]:
+        result = await self.db.execute(
+            select(OutboxEvent)
+            .where(OutboxEvent.id > after_id, OutboxEvent.id < horizon)
+            .order_by(OutboxEvent.id)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    async def record_delivery_in_db(self, webhook_id: int, last_event_id: int) -> None:
+        await self.db.execute(
+            update(Webhook)
+            .where(Webhook.id == webhook_id)
+            .values(last_event_id=last_event_id, failure_count=0, next_attempt_at=None, last_error=None)
+        )
+        await self.db.commit()
+
+    async def record_failure_in_db(self, webhook_id: int, error: str, next_attempt_at: datetime) -> None:
+        await self.db.execute(
+            update(Webhook)
+            .where(Webhook.id == webhook_id)
+            .values(
+                failure_count=Webhook.failure_count + 1,
+                next_attempt_at=next_attempt_at,
+                last_error=error[:500],
+            )
+        )
+        await self.db.commit()
+
+    async def prune_delivered_events_in_db(self, horizon: int) -> int:
+        """Delete outbox events below the horizon that every active webhook has acknowledged."""
+        min_cursor = (
+            await self.db.execute(select(func.min(Webhook.last_event_id)).where(Webhook.is_active.is_(True)))
+        ).scalar()
+        if min_cursor is None:
+            # No endpoints to deliver to: nothing settled needs to be kept
+            min_cursor = horizon - 1
+        result = await self.db.execute(
+            delete(OutboxEvent).where(OutboxEvent.id <= min_cursor, OutboxEvent.id < horizon)
+        )
+        await self.db.commit()
+        return result.rowcount
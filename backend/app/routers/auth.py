@@ -1,24 +1,24 @@
 from app.dependencies.auth import get_auth_service
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from fastapi.security import OAuth2PasswordRequestForm
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from datetime import timedelta, datetime
 from typing import List, Optional
-from passlib.context import CryptContext
 
 
 from app.models.user import User
 from app.core.database import get_db
 from app.core.limiter import limiter
-from app.schemas.auth import LoginResponse, LoginRequest, UserResponse, UserCreate, UserUpdate
-from app.core.auth import authenticate_user, create_access_token, get_current_user
+from app.core.passwords import hash_password
+from app.schemas.auth import LoginResponse, LoginRequest, RefreshRequest, UserPage, UserResponse, UserSuggestion, UserSummary, UserCreate, UserUpdate
+from app.core.auth import ACCESS_TOKEN_EXPIRE_MINUTES, authenticate_user, create_access_token, get_current_user, revoke_token
 from app.services.auth import AuthService
 
 router = APIRouter()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
+# Logout also answers clients that no longer hold a token
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 @router.post("/auth/login", response_model=LoginResponse)
 async def login(
@@ -28,19 +28,53 @@ async def login(
     """
     Login endpoint for user authentication.
     This endpoint uses OAuth2PasswordRequestForm to receive username and password.
-    It authenticates the user and returns an access token if successful.
+    It authenticates the user and returns an access token if successful, together
+    with a refresh token that /auth/refresh exchanges for new access tokens.
     :param form_data: OAuth2PasswordRequestForm containing username and password.
     :param auth_service: AuthService dependency for user authentication.
-    :return: LoginResponse schema containing the access token, token type, and user data.
+    :return: LoginResponse schema containing the access and refresh tokens, token type, and user data.
     :raises HTTPException: If the credentials are invalid, it raises a 401 Unauthorized error.
     """
     user = await auth_service.authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    access_token = create_access_token(data={"sub": user.username}, expires_delta=timedelta(minutes=30))
+    refresh_token, session_id = await auth_service.start_session(user)
+    access_token = create_access_token(
+        data={"sub": user.username, "sid": session_id},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
     return LoginResponse(
         access_token=access_token,
         token_type="bearer",
+        refresh_token=refresh_token,
+        user=UserResponse.from_orm(user)
+    )
+
+
+@router.post("/auth/refresh", response_model=LoginResponse)
+@limiter.exempt
+async def refresh(
+    refresh_data: RefreshRequest,
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    """
+    Exchange a refresh token for a new access token.
+    The refresh token is rotated: the one sent is used up and a new one is returned.
+    Sending a used refresh token again revokes the whole session.
+    :param refresh_data: RefreshRequest schema containing the refresh token.
+    :param auth_service: AuthService dependency for session management.
+    :return: LoginResponse schema containing the new access and refresh tokens, token type, and user data.
+    :raises HTTPException: If the refresh token is invalid, expired or reused, it raises a 401 Unauthorized error.
+    """
+    user, refresh_token, session_id = await auth_service.refresh_session(refresh_data.refresh_token)
+    access_token = create_access_token(
+        data={"sub": user.username, "sid": session_id},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return LoginResponse(
+        access_token=access_token,
+        token_type="bearer",
+        refresh_token=refresh_token,
         user=UserResponse.from_orm(user)
     )
 
@@ -64,12 +98,26 @@ async def register(
 
 @router.post("/auth/logout")
 @limiter.exempt
-async def logout():
+async def logout(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+    auth_service: AuthService = Depends(get_auth_service),
+):
     """
     Logout endpoint.
     This endpoint is used to log out the user by invalidating the access token.
+    The token's ID is added to the denylist, so it is rejected until it expires,
+    and the refresh tokens of its session are revoked.
+    :param token: The bearer token to revoke, if one was sent.
+    :param db: Database session dependency.
+    :param auth_service: AuthService dependency for session management.
     :return: A message indicating successful logout.
     """
+    claims = await revoke_token(token, db) if token else None
+    if claims:
+        if claims.get("sid"):
+            await auth_service.end_session(claims["sid"])
+        return {"message": "Logout successful. The token has been revoked."}
     return {"message": "Logout successful. Please delete the token on the client side."}
 
 
@@ -95,15 +143,63 @@ async def check_permissions(current_user: User = Depends(get_current_user)):
     return UserResponse.from_orm(current_user)
 
 
-@router.get("/users/getall", response_model=List[UserResponse])
-async def get_all_users(auth_service: AuthService = Depends(get_auth_service)):
-    """ Get all users.
-    This endpoint retrieves all users from the database.
+@router.get("/users", response_model=UserPage)
+async def list_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    type: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    q: Optional[str] = Query(None, min_length=1),
+    view: str = Query("full", pattern="^(full|compact)$"),
+    current_user: User = Depends(get_current_user),
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    """
+    List users, one page at a time.
+    Users are returned in username order. Pass the next_cursor of a page as cursor
+    to get the following one.
+    :param cursor: Cursor returned with the previous page.
+    :param limit: Maximum number of users in the page.
+    :param type: Only users of this type, e.g. "admin" or "user".
+    :param is_active: Only active or inactive users.
+    :param q: Case-insensitive prefix of the username, email or full name.
+    :param view: "compact" returns only id and username, for pickers.
+    :param current_user: User dependency to get the currently authenticated user.
+    :param auth_service: AuthService dependency for user management.
+    :return: UserPage schema containing the users and the next cursor.
+    :raises HTTPException: If the cursor is invalid, it raises a 400 Bad Request error.
+    """
+    compact = view == "compact"
+    users, next_cursor = await auth_service.list_users(
+        limit, cursor=cursor, type=type, is_active=is_active, search=q, compact=compact
+    )
+    schema = UserSummary if compact else UserResponse
+    return UserPage(items=[schema.from_orm(u) for u in users], next_cursor=next_cursor)
+
+
+@router.get("/users/suggest", response_model=List[UserSuggestion])
+@limiter.exempt
+async def suggest_users(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    """
+    Suggest users for autocomplete, e.g. the assignee picker.
+    Served from an in-memory prefix index instead of the database. Usernames
+    starting with q rank first, then full names with a word starting with q.
+    :param q: Prefix typed so far, case-insensitive.
+    :param limit: Maximum number of suggestions.
+    :param current_user: User dependency to get the currently authenticated user.
     :param auth_service: AuthService dependency for user management.
-    :return: List of UserResponse schemas containing all users' data.
+    :return: List of UserSuggestion schemas with the matching users.
     """
-    users = await auth_service.get_all_users()
-    return [UserResponse.from_orm(u) for u in users]
+    suggestions = await auth_service.suggest_users(q, limit)
+    return [
+        UserSuggestion(id=user_id, username=username, full_name=full_name)
+        for user_id, username, full_name in suggestions
+    ]
 
 
 @router.post("/users", response_model=UserResponse)
@@ -178,7 +274,7 @@ async def admin_update_user(
 
     # 4. Si se envió una nueva contraseña Y no está vacía, hasheala.
     if "password" in update_data and update_data["password"]:
-        update_data["password"] = pwd_context.hash(update_data["password"])
+        update_data["password"] = hash_password(update_data["password"])
     # Si se envió el campo "password" pero está vacío, elimínalo para no actualizarlo.
     elif "password" in update_data:
         del update_data["password"]
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.schemas.comment import TaskComment, TaskCommentResponse
@@ -11,6 +11,8 @@ from app.dependencies.task import get_task_service
 
 router = APIRouter()
 
+MAX_BATCH_TASK_IDS = 100
+
 
 @router.post("/tasks/{task_id}/comments", response_model=TaskCommentResponse)
 async def add_task_comment(
@@ -37,23 +39,51 @@ async def add_task_comment(
 
 async def get_task_comments(
     task_id: int,
+    include_archived: bool = False,
     service: CommentService = Depends(get_comment_service),
 ):
     """
     Get all comments for a specific task.
     Args:
         task_id (int): The ID of the task for which comments are retrieved.
+        include_archived (bool): Also look the task up among the archived ones.
         db (AsyncSession): Database session dependency.
     Returns:
         List[TaskCommentResponse]: A list of comments for the specified task with enriched user information.
     Raises:
         HTTPException: If the task is not found or if no comments are found.
     """
-    comments = await service.get_comments_for_task(task_id)
+    comments = await service.get_comments_for_task(task_id, include_archived)
     if not comments:
         raise HTTPException(status_code=404, detail="No comments found for this task")
     return comments
 
+@router.get("/comments", response_model=Dict[int, List[TaskCommentResponse]])
+
+async def get_latest_comments_for_tasks(
+    task_ids: str = Query(..., description="Comma separated task IDs, e.g. 1,2,3"),
+    per_task: int = Query(5, ge=1, le=50),
+    service: CommentService = Depends(get_comment_service),
+):
+    """
+    Get the latest comments of several tasks in a single round trip.
+    Args:
+        task_ids (str): Comma separated IDs of the tasks whose comments are retrieved.
+        per_task (int): Maximum number of comments returned for each task, newest first.
+        service (CommentService): Comment service dependency.
+    Returns:
+        Dict[int, List[TaskCommentResponse]]: The latest comments grouped by task ID.
+    Raises:
+        HTTPException: If the task IDs are malformed or too many are requested.
+    """
+    try:
+        ids = list(dict.fromkeys(int(value) for value in task_ids.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="task_ids must be a comma separated list of integers")
+    if len(ids) > MAX_BATCH_TASK_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_TASK_IDS} task IDs can be requested at once")
+    return await service.get_latest_comments_for_tasks(ids, per_task)
+
 @router.delete("/tasks/{task_id}/comments/{comment_id}", response_model=TaskCommentResponse)
 
 async def delete_task_comment(
@@ -72,12 +102,6 @@ async def delete_task_comment(
     Returns:
         TaskCommentResponse: The deleted comment with enriched user information.
     Raises:
-        HTTPException: If the task or comment is not found or if the deletion fails.
+        HTTPException: If the comment is not found on the task or the user is not allowed to delete it.
     """
-    comment = await service.get_comment_by_id(comment_id)
-    if not comment:
-        raise HTTPException(status_code=404, detail="Comment not found")
-    if comment.created_by_user.username != current_user.username and current_user.type != "admin":
-        print(comment)
-        raise HTTPException(status_code=403, detail="You do not have permission to delete this comment")
-    return await service.delete_comment_from_task(task_id, comment_id)
+    return await service.delete_comment_from_task(task_id, comment_id, current_user)
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+from app.models.user import User
+from app.schemas.job import JobResponse
+from app.services.job import JobService
+from app.dependencies.job import get_job_service
+from app.core.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    service: JobService = Depends(get_job_service),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the status, progress and result of a background job.
+    Args:
+        job_id (int): The ID returned when the job was submitted.
+        service (JobService): Job service dependency.
+        current_user (User): The user making the request. Only the submitter or an admin can see a job.
+    Returns:
+        JobResponse: The job with its current status, progress and, once finished, its result or error.
+    Raises:
+        HTTPException: If the job is not found.
+    """
+    return await service.get_job(job_id, current_user)
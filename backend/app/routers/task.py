@@ -1,24 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, WebSocket, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional, Union
 from datetime import datetime
 
 
 from app.models.user import User
 from app.models.task import Task
-from app.schemas.task import TaskUpdate, TaskBulkUpdate, TaskResponse, PaginationParams, TaskCreate
+from app.schemas.task import TaskUpdate, TaskBulkUpdate, TaskResponse, PaginationParams, TaskCreate, TaskStatsResponse, TaskFilterParams, TaskHistoryPage, TaskFieldsResponse
 from app.schemas.auth import UserResponse, UserCreate
 from app.core.database import get_db
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user, get_user_from_token
 from app.repositories.task import TaskRepository
 from app.repositories.interfaces.task import AbstractTaskRepository
 from app.services.task import TaskService
 from app.dependencies.task import get_task_service
+from app.schemas.job import JobResponse
+from app.services.job import JobService
+from app.dependencies.job import get_job_service
+from app.jobs.tasks import BULK_UPDATE_JOB
+from app.core.events import Subscriber, event_broker, task_topic
 
 
 router = APIRouter()
 
+SSE_HEARTBEAT_SECONDS = 15
+SSE_RETRY_MILLISECONDS = 3000
+WS_CLOSE_TASK_NOT_FOUND = 4404
+
+
+def resolve_expected_version(if_match: Optional[str], expected_version: Optional[int]) -> Optional[int]:
+    """
+    Combine the If-Match header and the expected_version field into the version the
+    client expects the task to have. Accepts If-Match values such as 3, "3" or W/"3".
+    """
+    header_version = None
+    if if_match and if_match.strip() != "*":
+        tag = if_match.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        try:
+            header_version = int(tag.strip('"'))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="If-Match must be a task version")
+
+    if header_version is not None and expected_version is not None and header_version != expected_version:
+        raise HTTPException(status_code=400, detail="If-Match and expected_version do not match")
+    return header_version if header_version is not None else expected_version
+
+
+def set_task_etag(response: Response, task: TaskResponse) -> None:
+    # Reads trimmed with fields= only carry the version when it was asked for
+    if task.version is not None:
+        response.headers["ETag"] = f'"{task.version}"'
+
+
 @router.post("/tasks", response_model=TaskResponse)
 
 async def create_task(
@@ -45,6 +83,8 @@ async def create_task(
 async def update_task(
     task_id: int,
     task_update: TaskUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     service: TaskService = Depends(get_task_service),
     current_user: User = Depends(get_current_user)
 ):
@@ -53,16 +93,73 @@ async def update_task(
     Args:
         task_id (int): The ID of the task to update.
         task_update (TaskUpdate): The update data containing fields to update.
+        if_match (str): Optional task version the update is conditional on.
         db (AsyncSession): Database session dependency.
         current_user (User): The user making the request, used for auditing.
     Returns:
         TaskResponse: The updated task.
     Raises:
-        HTTPException: If the task is not found or if the update fails.
+        HTTPException: If the task is not found, if the update fails or 409 if the
+        task changed since the expected version.
     """
-    task = await service.update_task(task_id, task_update, current_user.id)
+    expected_version = resolve_expected_version(if_match, task_update.expected_version)
+    task = await service.update_task(task_id, task_update, current_user.id, expected_version)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    set_task_etag(response, task)
+    return task
+
+@router.patch("/tasks/{task_id}", response_model=TaskResponse)
+
+async def patch_task(
+    task_id: int,
+    task_patch: TaskUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    service: TaskService = Depends(get_task_service),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Partially update a task by its ID.
+    Only the fields present in the request body are changed; omitted fields keep
+    their current value and nullable fields can be cleared by sending null.
+    Args:
+        task_id (int): The ID of the task to update.
+        task_patch (TaskUpdate): The fields to change.
+        if_match (str): Optional task version the patch is conditional on.
+        current_user (User): The user making the request, used for auditing.
+    Returns:
+        TaskResponse: The updated task with enriched user information.
+    Raises:
+        HTTPException: If the task is not found, if the patch is invalid or 409 if the
+        task changed since the expected version.
+    """
+    expected_version = resolve_expected_version(if_match, task_patch.expected_version)
+    task = await service.patch_task(task_id, task_patch, current_user.id, expected_version)
+    set_task_etag(response, task)
+    return task
+
+@router.post("/tasks/claim", response_model=TaskResponse)
+
+async def claim_next_task(
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    service: TaskService = Depends(get_task_service)
+):
+    """
+    Claim the next pending task.
+    Atomically picks the most important unassigned pending task, assigns it to the
+    current user and sets it in progress. Concurrent callers never get the same task.
+    Args:
+        current_user (User): The authenticated user, who gets the task.
+        service (TaskService): Task service dependency.
+    Returns:
+        TaskResponse: The claimed task.
+    Raises:
+        HTTPException: If there is no pending task to claim.
+    """
+    task = await service.claim_next_task(current_user.id)
+    set_task_etag(response, task)
     return task
 
 @router.post("/tasks/bulk_update", response_model=List[TaskResponse])
@@ -83,27 +180,52 @@ async def bulk_update_tasks(
     Raises:
         HTTPException: If no task IDs are provided or if no tasks are found.
     """
+    return await service.bulk_update_tasks(task_update, current_user.id)
+
+@router.post("/tasks/bulk_update/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+
+async def submit_bulk_update_job(
+    task_update: TaskBulkUpdate,
+    service: JobService = Depends(get_job_service),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Run a bulk update in the background, for updates too large to finish within a request.
+    Args:
+        task_update (TaskBulkUpdate): The bulk update data containing task IDs and fields to update.
+        service (JobService): Job service dependency.
+        current_user (User): The user making the request, used for auditing.
+    Returns:
+        JobResponse: The queued job. Poll GET /jobs/{id} for its progress and result.
+    Raises:
+        HTTPException: If no task IDs are provided.
+    """
     if not task_update.task_ids:
         raise HTTPException(status_code=400, detail="No task IDs provided")
-    tasks = await service.bulk_update_tasks(task_update.task_ids, task_update, current_user.id)
-    if not tasks:
-        raise HTTPException(status_code=404, detail="No tasks found")
-    return await tasks
+    return await service.submit_job(BULK_UPDATE_JOB, task_update.dict(), current_user.id)
 
-@router.get("/tasks", response_model=List[TaskResponse])
+# Reads that take fields= leave the fields that weren't requested out of the JSON
+@router.get("/tasks", response_model=List[Union[TaskResponse, TaskFieldsResponse]], response_model_exclude_unset=True)
 
 async def list_tasks(
     pagination: PaginationParams = Depends(),
+    filters: TaskFilterParams = Depends(),
     service: TaskService = Depends(get_task_service)
 ):
     """
-    List all tasks with pagination support.
+    List tasks with optional filters, sorting and pagination support.
+    Filters combine with AND and run as a single query.
     
     Args:
         pagination (PaginationParams): Pagination parameters for the request.
+        filters (TaskFilterParams): Status, priority, assignee, creator, due date range,
+            overdue and title text filters, the sort order, whether to include
+            archived tasks and the fields to return (only their columns are read).
         db (AsyncSession): Database session dependency.
+    Raises:
+        HTTPException: If a filter or sort value is invalid, or no tasks match.
     """
-    tasks = await service.list_tasks(pagination=pagination)
+    tasks = await service.list_tasks(pagination=pagination, filters=filters)
     if not tasks:
         raise HTTPException(status_code=404, detail="No tasks found")
     return tasks
@@ -185,6 +307,47 @@ async def get_overdue_tasks_endpoint(
     tasks = await service.get_overdue_tasks()
     return tasks
 
+@router.get("/tasks/next", response_model=List[Union[TaskResponse, TaskFieldsResponse]], response_model_exclude_unset=True)
+
+async def get_next_tasks(
+    assignee: Optional[int] = None,
+    n: int = Query(10, ge=1, le=100),
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    service: TaskService = Depends(get_task_service)
+):
+    """
+    Get the tasks to work on next.
+    Returns the open tasks of an assignee, most important first: by priority,
+    then by due date, with tasks without a due date last.
+    Args:
+        assignee (Optional[int]): ID of the assignee, the current user by default.
+        n (int): Number of tasks to return.
+        fields (Optional[str]): Comma-separated fields to return, all by default.
+        current_user (User): The authenticated user.
+        service (TaskService): Task service dependency.
+    Returns:
+        List[TaskResponse]: Up to n open tasks, empty when there are none.
+    """
+    assignee_id = current_user.id if assignee is None else assignee
+    return await service.get_next_tasks(assignee_id, n, fields)
+
+@router.get("/tasks/stats", response_model=TaskStatsResponse)
+
+async def get_task_stats(
+    service: TaskService = Depends(get_task_service)
+):
+    """
+    Get task counts for dashboards.
+    The counts are read from counters maintained on every write, so the cost
+    does not grow with the number of tasks.
+    Args:
+        service (TaskService): Task service dependency.
+    Returns:
+        TaskStatsResponse: Task counts by status, priority and assignee, and the number of overdue tasks.
+    """
+    return await service.get_task_stats()
+
 @router.get("/tasks/search", response_model=List[TaskResponse])
 
 async def search_tasks(
@@ -208,6 +371,140 @@ async def search_tasks(
     tasks = await service.search_tasks_by_title(query, pagination.skip, pagination.limit)
     return tasks
 
+async def _release_session(db: AsyncSession) -> None:
+    # Give the connection back to the pool; the stream or socket may stay open for hours
+    await db.close()
+
+
+@router.get("/tasks/events")
+
+async def task_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    token: Optional[str] = None,
+    authorization: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream task and comment changes as Server-Sent Events.
+    Events: task.created, task.updated, task.status_changed, task.deleted,
+    comment.created and comment.deleted, each carrying the serialized resource.
+    Clients that reconnect with a Last-Event-ID header get the events they missed
+    replayed, or a resync event if they fell too far behind.
+    Args:
+        request (Request): The incoming request, used to detect client disconnects.
+        last_event_id (str): ID of the last event the client received.
+        token (str): JWT access token, for EventSource clients that can't send headers;
+            the Authorization header is also accepted.
+        db (AsyncSession): Database session dependency, only used to authenticate.
+    Returns:
+        StreamingResponse: A text/event-stream response.
+    Raises:
+        HTTPException: If the token is invalid or Last-Event-ID is not a valid event ID.
+    """
+    if not token:
+        scheme, _, credentials = (authorization or "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" else None
+    await get_user_from_token(token, db)
+    await _release_session(db)
+
+    try:
+        resume_from = int(last_event_id) if last_event_id else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Last-Event-ID must be an integer")
+
+    subscriber = event_broker.subscribe(resume_from)
+
+    async def stream():
+        try:
+            yield f"retry: {SSE_RETRY_MILLISECONDS}\n\n"
+            while not await request.is_disconnected():
+                # A subscriber dropped for falling behind drains what it has, then closes
+                # so the client reconnects and resumes from its Last-Event-ID
+                if subscriber.overflowed and not subscriber.backlog and subscriber.queue.empty():
+                    break
+                event = await subscriber.next_event(timeout=SSE_HEARTBEAT_SECONDS)
+                yield event.encode() if event else ": keep-alive\n\n"
+        finally:
+            event_broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    # Clients only listen; anything they send is ignored until they disconnect
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+async def _pump_events(websocket: WebSocket, subscriber: Subscriber) -> None:
+    """
+    Forward a subscriber's events to its socket until the client disconnects.
+    Only this connection waits on a slow send; publishers never block, and a
+    subscriber that overflows its buffer is closed so the client can reconnect.
+    """
+    disconnected = asyncio.create_task(_wait_for_disconnect(websocket))
+    next_event = None
+    try:
+        while True:
+            if subscriber.overflowed and subscriber.queue.empty():
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                return
+            next_event = next_event or asyncio.create_task(subscriber.queue.get())
+            done, _ = await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected in done:
+                return
+            event = next_event.result()
+            next_event = None
+            await websocket.send_json(event.to_message())
+    finally:
+        disconnected.cancel()
+        if next_event:
+            next_event.cancel()
+
+
+@router.websocket("/ws/tasks/{task_id}")
+async def task_websocket(
+    websocket: WebSocket,
+    task_id: int,
+    token: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Push live changes of a task to the client: task.updated, task.status_changed,
+    task.deleted, comment.created and comment.deleted.
+    Args:
+        websocket (WebSocket): The client connection.
+        task_id (int): The ID of the task to follow.
+        token (str): JWT access token; the Authorization header is also accepted.
+        db (AsyncSession): Database session dependency, only used during the handshake.
+    Closes the connection with 1008 if the token is invalid and 4404 if the task is not found.
+    """
+    if not token:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" else None
+    try:
+        await get_user_from_token(token, db)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if not await TaskRepository(db).get_task_by_id_in_db(task_id):
+        await websocket.close(code=WS_CLOSE_TASK_NOT_FOUND)
+        return
+    await _release_session(db)
+
+    await websocket.accept()
+    subscriber = event_broker.subscribe(topic=task_topic(task_id))
+    try:
+        await _pump_events(websocket, subscriber)
+    finally:
+        event_broker.unsubscribe(subscriber)
+
 @router.get("/tasks/created_by/{user_id}", response_model=List[TaskResponse])
 
 async def get_tasks_created_by_user_route(
@@ -226,32 +523,66 @@ async def get_tasks_created_by_user_route(
     tasks = await service.get_tasks_created_by_user(user_id)
     return tasks
 
-@router.get("/tasks/{task_id}", response_model=TaskResponse)
+@router.get("/tasks/{task_id}", response_model=Union[TaskResponse, TaskFieldsResponse], response_model_exclude_unset=True)
 
 async def get_task(
     task_id: int,
+    response: Response,
+    include_archived: bool = False,
+    fields: Optional[str] = None,
     service: TaskService = Depends(get_task_service)
 ):
     """
     Get a task by its ID.
     Args:
         task_id (int): The ID of the task to retrieve.
+        include_archived (bool): Also look the task up among the archived ones.
+        fields (Optional[str]): Comma-separated fields to return, all by default.
         db (AsyncSession): Database session dependency.
     Returns:
         TaskResponse: The task with the specified ID, enriched with user information.
     Raises:
         HTTPException: If the task is not found.
     """
-    task = await service.get_task_by_id(task_id)
+    task = await service.get_task_by_id(task_id, include_archived, fields)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    set_task_etag(response, task)
     return task
 
+@router.get("/tasks/{task_id}/history", response_model=TaskHistoryPage)
+
+async def get_task_history(
+    task_id: int,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    service: TaskService = Depends(get_task_service)
+):
+    """
+    Get the change history of a task, newest first.
+    Deleted and archived tasks keep their history.
+    Args:
+        task_id (int): The ID of the task.
+        cursor (Optional[int]): next_cursor of the previous page.
+        limit (int): Number of events per page.
+        current_user (User): The authenticated user.
+        service (TaskService): Task service dependency.
+    Returns:
+        TaskHistoryPage: The events, and the cursor of the next page.
+    Raises:
+        HTTPException: If the task has no history.
+    """
+    return await service.get_task_history(task_id, cursor, limit)
+
 @router.put("/tasks/{task_id}/status", response_model=TaskResponse)
 
 async def update_task_status(
     task_id: int,
     status: str,
+    response: Response,
+    expected_version: Optional[int] = None,
+    if_match: Optional[str] = Header(None),
     service: TaskService = Depends(get_task_service),
     current_user: User = Depends(get_current_user)
 ):
@@ -260,19 +591,24 @@ async def update_task_status(
     Args:
         task_id (int): The ID of the task to update.
         status (str): The new status for the task.
+        expected_version (int): Optional task version the change is conditional on.
+        if_match (str): Same as expected_version, sent as a header.
         db (AsyncSession): Database session dependency.
         current_user (User): The user making the request, used for auditing.
     Returns:
         TaskResponse: The updated task with the new status.
     Raises:
-        HTTPException: If the task is not found or if the status update fails.
+        HTTPException: If the task is not found, if the status update fails or 409 if
+        the task changed since the expected version.
     """
+    expected_version = resolve_expected_version(if_match, expected_version)
     try:
-        task = await service.update_task_status(task_id, status, current_user.id)
+        task = await service.update_task_status(task_id, status, current_user.id, expected_version)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    set_task_etag(response, task)
     return task
 
 @router.delete("/tasks/{task_id}", response_model=TaskResponse)
@@ -295,7 +631,7 @@ async def delete_task(
     task = await service.get_task_by_id(task_id)
     if task.created_by != current_user.username and current_user.type != "admin":
         raise HTTPException(status_code=403, detail="You do not have permission to delete this task")
-    task = await service.delete_task(task_id)
+    task = await service.delete_task(task_id, current_user.id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
\ No newline at end of file
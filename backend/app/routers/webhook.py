@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+from app.models.user import User
+from app.schemas.webhook import WebhookCreate, WebhookResponse
+from app.services.webhook import WebhookService
+from app.dependencies.webhook import get_webhook_service
+from app.core.auth import get_current_user
+
+router = APIRouter()
+
+
+def ensure_admin(current_user: User):
+    if current_user.type != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can manage webhooks")
+
+
+@router.post("/webhooks", response_model=WebhookResponse)
+async def create_webhook(
+    webhook_data: WebhookCreate,
+    service: WebhookService = Depends(get_webhook_service),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Register an endpoint that receives task and comment change events.
+    Args:
+        webhook_data (WebhookCreate): The URL the events are POSTed to.
+        service (WebhookService): Webhook service dependency.
+        current_user (User): The user making the request, must be an admin.
+    Returns:
+        WebhookResponse: The registered webhook. It receives events written from now on.
+    Raises:
+        HTTPException: If the current user is not an admin.
+    """
+    ensure_admin(current_user)
+    return await service.create_webhook(webhook_data)
+
+@router.get("/webhooks", response_model=List[WebhookResponse])
+async def get_webhooks(
+    service: WebhookService = Depends(get_webhook_service),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List the registered webhooks with their delivery state.
+    Args:
+        service (WebhookService): Webhook service dependency.
+        current_user (User): The user making the request, must be an admin.
+    Returns:
+        List[WebhookResponse]: The registered webhooks.
+    Raises:
+        HTTPException: If the current user is not an admin.
+    """
+    ensure_admin(current_user)
+    return await service.get_all_webhooks()
+
+@router.delete("/webhooks/{webhook_id}", response_model=WebhookResponse)
+async def delete_webhook(
+    webhook_id: int,
+    service: WebhookService = Depends(get_webhook_service),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Unregister a webhook.
+    Args:
+        webhook_id (int): The ID of the webhook to delete.
+        service (WebhookService): Webhook service dependency.
+        current_user (User): The user making the request, must be an admin.
+    Returns:
+        WebhookResponse: The deleted webhook.
+    Raises:
+        HTTPException: If the current user is not an admin or the webhook is not found.
+    """
+    ensure_admin(current_user)
+    return await service.delete_webhook(webhook_id)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime
 
 class UserCreate(BaseModel):
@@ -20,6 +20,24 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class UserSummary(BaseModel):
+    """Lean projection of a user for pickers."""
+    id: int
+    username: str
+
+    class Config:
+        from_attributes = True
+
+class UserSuggestion(BaseModel):
+    id: int
+    username: str
+    full_name: Optional[str] = None
+
+class UserPage(BaseModel):
+    items: List[Union[UserResponse, UserSummary]]
+    # Pass as cursor to get the next page; None on the last page
+    next_cursor: Optional[str] = None
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -34,8 +52,12 @@ class LoginRequest(BaseModel):
 class LoginResponse(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
     user: UserResponse
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 class UserCreateWithType(UserCreate):
     type: Optional[str] = "user"
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from app.schemas.auth import UserResponse
 
@@ -23,19 +23,43 @@ class TaskResponse(BaseModel):
     created_by: str  # Username of the creator
     updated_by: Optional[str]  #  Username of the last updater
     assigned_to: Optional[str]  #   Username of the assignee
+    comments_count: int = 0
+    last_commented_at: Optional[datetime] = None
+    version: int = 1  # Send back as If-Match / expected_version to detect concurrent edits
 
 
     class Config:
         from_attributes = True
-        
+
+# Fields a read can be trimmed to with fields=, e.g. for list views
+TASK_RESPONSE_FIELDS = tuple(TaskResponse.model_fields)
+
+class TaskFieldsResponse(BaseModel):
+    """A TaskResponse trimmed to the requested fields; the others are left out of the JSON."""
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    due_date: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    created_by: Optional[str] = None
+    updated_by: Optional[str] = None
+    assigned_to: Optional[str] = None
+    comments_count: Optional[int] = None
+    last_commented_at: Optional[datetime] = None
+    version: Optional[int] = None
+
 class TaskUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
-    status: Optional[str] = "pending"
-    priority: Optional[str] = "low"  # e.g., low, medium, high, urgent
+    status: Optional[str] = None
+    priority: Optional[str] = None  # e.g., low, medium, high, urgent
     due_date: Optional[datetime] = None
     assigned_to: Optional[int] = None
     updated_by: Optional[int] = None
+    expected_version: Optional[int] = None  # Reject the update if the task changed since this version
 
 class TaskBulkUpdate(BaseModel):
     task_ids: List[int]
@@ -45,9 +69,43 @@ class TaskBulkUpdate(BaseModel):
     due_date: Optional[datetime] = None
     updated_by: Optional[int] = None
     
+class TaskStatsResponse(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_assignee: Dict[str, int]  # Keyed by user ID, "unassigned" for tasks without assignee
+    overdue: int
+
+class TaskEventResponse(BaseModel):
+    id: int
+    event_type: str  # created, updated, status_changed, claimed, deleted, archived
+    changes: Dict[str, Any]  # New value of each field the write set
+    previous: Optional[Dict[str, Any]] = None  # Value those fields had before the write
+    version: Optional[int] = None
+    changed_by: Optional[str] = None  # Username of the user who made the change
+    created_at: datetime
+
+class TaskHistoryPage(BaseModel):
+    items: List[TaskEventResponse]
+    # Pass as cursor to get older events; None on the last page
+    next_cursor: Optional[int] = None
+
 class TaskStatus(str):
     status: Optional[str] = "Pending"
 
+class TaskFilterParams(BaseModel):
+    status: Optional[str] = None  # Comma-separated, e.g. pending,in_progress
+    priority: Optional[str] = None  # Comma-separated, e.g. high,urgent
+    assigned_to: Optional[int] = None
+    created_by: Optional[int] = None
+    due_after: Optional[datetime] = None
+    due_before: Optional[datetime] = None
+    overdue: Optional[bool] = None
+    q: Optional[str] = None  # Text contained in the title
+    sort: Optional[str] = None  # Comma-separated fields, "-" for descending, e.g. -priority,due_date
+    include_archived: bool = False  # Also search the archived (long closed) tasks
+    fields: Optional[str] = None  # Comma-separated TaskResponse fields to return, e.g. id,title,status
+
 class PaginationParams(BaseModel):
     page: int = 1
     skip: int = 0
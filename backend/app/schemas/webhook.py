@@ -0,0 +1,19 @@
+from pydantic import BaseModel, HttpUrl
+from typing import Optional
+from datetime import datetime
+
+class WebhookCreate(BaseModel):
+    url: HttpUrl
+
+class WebhookResponse(BaseModel):
+    id: int
+    url: str
+    is_active: bool
+    created_at: datetime
+    last_event_id: int
+    failure_count: int
+    next_attempt_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,167 @@
+"""
+Production server launcher: python -m app.serve
+
+Runs a pre-forking master with WEB_CONCURRENCY uvicorn workers (--workers), one by
+default:
+
+- The app is imported, and the database prepared, once in the master. gc.freeze()
+  then moves every object created so far out of the collector's reach, so the
+  workers forked afterwards keep sharing those pages copy-on-write instead of
+  dirtying them on their first collection.
+- Workers share one listening socket and run uvloop and httptools when installed.
+- SIGTERM/SIGINT are forwarded to the workers, which stop accepting connections
+  and finish in-flight requests (up to GRACEFUL_TIMEOUT_SECONDS) before exiting.
+  Workers that die unexpectedly are replaced.
+
+Only worker 0 runs the webhook dispatcher, so events aren't delivered once per worker,
+the task archiver, the stats reconciler and the sweep that fails jobs of dead workers.
+
+More than one worker is opt-in because some state is per process:
+- The SSE/WebSocket feeds have no cross-process fan-out, so a client only sees changes
+  made through the worker it is connected to.
+- The user prefix index behind /users/suggest and the token denylist are copies per
+  worker; writes through another worker show up after USER_INDEX_RELOAD_SECONDS and
+  TOKEN_DENYLIST_SYNC_SECONDS respectively.
+"""
+import argparse
+import asyncio
+import gc
+import importlib.util
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+
+import uvicorn
+
+GRACEFUL_TIMEOUT_SECONDS = int(os.getenv("GRACEFUL_TIMEOUT_SECONDS", "30"))
+
+
+def default_worker_count() -> int:
+    # One process unless asked for more: the live feeds don't fan out across workers
+    return int(os.getenv("WEB_CONCURRENCY", "1"))
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def prepare(app_module) -> None:
+    """Run the one-off startup tasks in the master, then drop its database connections."""
+    from app.core.database import engine
+
+    async def _prepare():
+        await app_module.run_startup_tasks()
+        # Connections must not be inherited by the forked workers
+        await engine.dispose()
+
+    asyncio.run(_prepare())
+    print(f"⏱️ Startup: {app_module.startup_timer.report()}")
+
+
+def run_worker(app, sock: socket.socket, worker_id: int, log_level: str) -> None:
+    os.environ["APP_STARTUP_TASKS_ENABLED"] = "false"
+    if worker_id != 0:
+        os.environ["WEBHOOK_DISPATCHER_ENABLED"] = "false"
+        os.environ["TASK_ARCHIVER_ENABLED"] = "false"
+        os.environ["TASK_STATS_RECONCILER_ENABLED"] = "false"
+        os.environ["JOB_RECOVERY_ENABLED"] = "false"
+
+    config = uvicorn.Config(
+        app,
+        loop="uvloop" if _installed("uvloop") else "auto",
+        http="httptools" if _installed("httptools") else "auto",
+        log_level=log_level,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT_SECONDS,
+    )
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    sys.exit(0)
+
+
+class Master:
+    def __init__(self, app, sock: socket.socket, workers: int, log_level: str):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self.children: Dict[int, int] = {}  # pid -> worker id
+        self.stopping = False
+
+    def spawn(self, worker_id: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            run_worker(self.app, self.sock, worker_id, self.log_level)
+        self.children[pid] = worker_id
+
+    def stop(self, signum, frame) -> None:
+        self.stopping = True
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for worker_id in range(self.workers):
+            self.spawn(worker_id)
+        print(f"🚀 Serving with {self.workers} workers (master pid {os.getpid()})")
+
+        deadline = None
+        while self.children:
+            if self.stopping and deadline is None:
+                deadline = time.monotonic() + GRACEFUL_TIMEOUT_SECONDS + 5
+            if deadline is not None and time.monotonic() > deadline:
+                for pid in self.children:
+                    os.kill(pid, signal.SIGKILL)
+
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(0.2)
+                continue
+
+            worker_id = self.children.pop(pid)
+            if not self.stopping:
+                print(f"⚠️ Worker {worker_id} (pid {pid}) exited with status {status}, restarting")
+                self.spawn(worker_id)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run the API with a pre-forking master.")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=default_worker_count())
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    args = parser.parse_args(argv)
+
+    # Preload: import and prepare once, before forking
+    app_module = importlib.import_module("app.main")
+    prepare(app_module)
+    sock = bind_socket(args.host, args.port)
+
+    gc.collect()
+    gc.freeze()
+
+    Master(app_module.app, sock, max(1, args.workers), args.log_level).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,78 @@
+import base64
+import binascii
+import uuid
+from datetime import datetime, timedelta
 from fastapi import HTTPException, status
-from passlib.context import CryptContext
+from app.core.auth import REFRESH_TOKEN_EXPIRE_DAYS, generate_refresh_token, hash_refresh_token
+from app.core.denylist import prune_expired_tokens
+from app.core.user_index import user_index
 from app.repositories.auth import AuthRepository
+from app.repositories.token import RefreshTokenRepository
 from app.schemas.auth import UserCreate
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 class AuthService:
-    def __init__(self, repo: AuthRepository):
+    def __init__(self, repo: AuthRepository, tokens: RefreshTokenRepository):
         self.repo = repo
+        self.tokens = tokens
 
     async def authenticate_user(self, username: str, password: str):
         user = await self.repo.get_user_by_username(username)
-        if not user or not self.repo.verify_password(password, user.hashed_password):
+        if not user:
+            return None
+        verified, new_hash = self.repo.verify_and_update_password(password, user.hashed_password)
+        if not verified:
             return None
+        if new_hash:
+            # The stored hash predates the current hashing policy
+            await self.repo.update_password_hash_in_db(user.id, new_hash)
+            user.hashed_password = new_hash
         return user
 
+    def _refresh_token_expiry(self) -> datetime:
+        return datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+
+    async def start_session(self, user):
+        """
+        Issue the first refresh token of a new login session.
+        Returns the refresh token and the session id.
+        """
+        session_id = uuid.uuid4().hex
+        refresh_token = generate_refresh_token()
+        await self.tokens.add_refresh_token_in_db(
+            user.id, session_id, hash_refresh_token(refresh_token), self._refresh_token_expiry()
+        )
+        return refresh_token, session_id
+
+    async def refresh_session(self, refresh_token: str):
+        """
+        Exchange a refresh token for its successor without checking the password again.
+        Returns the user, the new refresh token and the session id.
+        A token that was already exchanged means a copy leaked, so presenting it
+        again revokes every token of its session.
+        """
+        invalid_token = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+        stored = await self.tokens.get_refresh_token_by_hash_in_db(hash_refresh_token(refresh_token))
+        if stored is None or stored.revoked_at is not None or stored.expires_at <= datetime.utcnow():
+            raise invalid_token
+
+        session_id, user_id = stored.family_id, stored.user_id
+        new_refresh_token = generate_refresh_token()
+        reused = stored.used_at is not None or not await self.tokens.rotate_refresh_token_in_db(
+            stored.id, hash_refresh_token(new_refresh_token), self._refresh_token_expiry()
+        )
+        if reused:
+            await self.tokens.revoke_refresh_token_family_in_db(session_id)
+            raise invalid_token
+
+        user = await self.repo.get_user_by_id_in_db(user_id)
+        if user is None or not user.is_active:
+            raise invalid_token
+        return user, new_refresh_token, session_id
+
+    async def end_session(self, session_id: str):
+        await self.tokens.revoke_refresh_token_family_in_db(session_id)
+        await prune_expired_tokens(self.tokens.db)
+
     async def register_user(self, user_data: UserCreate):
         existing_user = await self.repo.get_user_by_username(user_data.username)
         if existing_user:
@@ -29,6 +87,34 @@ class AuthService:
     async def get_all_users(self):
         return await self.repo.get_all_users_in_db()
 
+    async def suggest_users(self, query: str, limit: int = 10):
+        """Users whose username or full name starts with query, from the in-memory index."""
+        if user_index.is_stale():
+            user_index.load(await self.repo.get_user_index_entries_in_db())
+        return user_index.suggest(query, limit)
+
+    async def list_users(self, limit: int, cursor=None, type=None, is_active=None, search=None, compact: bool = False):
+        """
+        One page of the user directory in username order.
+        Returns the users and the cursor of the next page, None on the last one.
+        """
+        after_username = None
+        if cursor:
+            try:
+                after_username = base64.b64decode(cursor, altchars=b"-_", validate=True).decode()
+            except (binascii.Error, UnicodeDecodeError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        # One extra row tells whether there is a next page
+        users = await self.repo.list_users_in_db(
+            limit + 1, after_username=after_username, type=type, is_active=is_active, search=search, compact=compact
+        )
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = base64.urlsafe_b64encode(users[-1].username.encode()).decode()
+        return users, next_cursor
+
     async def admin_create_user(self, user_data: UserCreate):
         return await self.register_user(user_data)
 
@@ -1,12 +1,20 @@
 from fastapi import HTTPException
-from typing import List
+from fastapi.encoders import jsonable_encoder
+from typing import Dict, List
 from app.repositories.interfaces.comment import AbstractCommentRepository
 from app.schemas.comment import TaskComment, TaskCommentResponse
+from app.models.user import User
+from app.core.events import EventBroker, event_broker, task_topic
 class CommentService:
 
-    def __init__(self, repo: AbstractCommentRepository, task_repo: AbstractCommentRepository):
+    def __init__(self, repo: AbstractCommentRepository, task_repo: AbstractCommentRepository, events: EventBroker = event_broker):
         self.repo = repo
         self.task_repo = task_repo
+        self.events = events
+
+    def _publish(self, event_type: str, comment: TaskCommentResponse):
+        # Called only after the repository committed the write
+        self.events.publish(event_type, jsonable_encoder(comment), topic=task_topic(comment.task_id))
     
     async def get_comment_by_id(self, comment_id: int) -> TaskCommentResponse:
         comment = await self.repo.get_comment_by_id_in_db(comment_id)
@@ -14,30 +22,44 @@ class CommentService:
             raise HTTPException(status_code=404, detail="Comment not found")
         return TaskCommentResponse.from_orm(comment)
 
-    async def get_comments_for_task(self, task_id: int) -> List[TaskCommentResponse]:
+    async def get_comments_for_task(self, task_id: int, include_archived: bool = False) -> List[TaskCommentResponse]:
         task = await self.task_repo.get_task_by_id_in_db(task_id)
         if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
+            if not include_archived or not await self.task_repo.get_archived_task_in_db(task_id):
+                raise HTTPException(status_code=404, detail="Task not found")
+            comments = await self.repo.get_archived_comments_for_task_in_db(task_id)
+            return [TaskCommentResponse.from_orm(comment) for comment in comments]
         
         comments = await self.repo.get_comments_for_task_in_db(task_id)
         return [TaskCommentResponse.from_orm(comment) for comment in comments]
 
+    async def get_latest_comments_for_tasks(self, task_ids: List[int], per_task: int) -> Dict[int, List[TaskCommentResponse]]:
+        if not task_ids:
+            raise HTTPException(status_code=400, detail="No task IDs provided")
+
+        grouped = await self.repo.get_latest_comments_for_tasks_in_db(task_ids, per_task)
+        return {
+            task_id: [TaskCommentResponse.from_orm(comment) for comment in comments]
+            for task_id, comments in grouped.items()
+        }
+
     async def add_comment_to_task(self, task_id: int, comment_data: TaskComment, user_id: int) -> TaskCommentResponse:
-        task = await self.task_repo.get_task_by_id_in_db(task_id)
-        if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
-        
         new_comment = await self.repo.add_comment_to_task_in_db(task_id, comment_data, user_id)
-        return TaskCommentResponse.from_orm(new_comment)
-
-    async def delete_comment_from_task(self, task_id: int, comment_id: int) -> TaskCommentResponse:
-        task = await self.task_repo.get_task_by_id_in_db(task_id)
-        if not task:
+        if not new_comment:
             raise HTTPException(status_code=404, detail="Task not found")
-        
-        comment = await self.repo.delete_comment_from_task_in_db(comment_id)
-        if not comment:
+        self._publish("comment.created", new_comment)
+        return new_comment
+
+    async def delete_comment_from_task(self, task_id: int, comment_id: int, user: User) -> TaskCommentResponse:
+        # Ownership is enforced by the DELETE itself; admins may delete any comment
+        owner_id = None if user.type == "admin" else user.id
+        comment = await self.repo.delete_comment_from_task_in_db(comment_id, task_id=task_id, owner_id=owner_id)
+        if comment:
+            self._publish("comment.deleted", comment)
+            return comment
+
+        # Nothing was deleted: look the comment up only to report why
+        existing = await self.repo.get_comment_by_id_in_db(comment_id)
+        if not existing or existing.task_id != task_id:
             raise HTTPException(status_code=404, detail="Comment not found")
-        
-        return TaskCommentResponse.from_orm(comment)
-    
\ No newline at end of file
+        raise HTTPException(status_code=403, detail="You do not have permission to delete this comment")
@@ -0,0 +1,25 @@
+from fastapi import HTTPException
+from app.jobs.runner import JobRunner, job_runner
+from app.models.user import User
+from app.repositories.job import JobRepository
+from app.schemas.job import JobResponse
+
+class JobService:
+    def __init__(self, repo: JobRepository, runner: JobRunner = job_runner):
+        self.repo = repo
+        self.runner = runner
+
+    async def submit_job(self, job_type: str, payload: dict, user_id: int) -> JobResponse:
+        if not self.runner.has_handler(job_type):
+            raise HTTPException(status_code=400, detail=f"Unknown job type: {job_type}")
+
+        job = await self.repo.create_job_in_db(job_type, payload, user_id, self.runner.owner_id)
+        self.runner.submit(job)
+        return JobResponse.from_orm(job)
+
+    async def get_job(self, job_id: int, user: User) -> JobResponse:
+        job = await self.repo.get_job_by_id_in_db(job_id)
+        # Other users' jobs are reported as missing rather than forbidden
+        if not job or (job.created_by != user.id and user.type != "admin"):
+            raise HTTPException(status_code=404, detail="Job not found")
+        return JobResponse.from_orm(job)
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
@@ -6,45 +7,164 @@ from datetime import datetime
 
 
 from app.models.user import User
-from app.models.task import Task
-from app.schemas.task import TaskUpdate, TaskBulkUpdate, TaskResponse, PaginationParams, TaskCreate
+from app.models.task import TASK_PRIORITY_RANKS, Task
+from app.schemas.task import TaskUpdate, TaskBulkUpdate, TaskResponse, PaginationParams, TaskCreate, TaskStatsResponse, TaskFilterParams, TaskEventResponse, TaskHistoryPage, TASK_RESPONSE_FIELDS
 from app.schemas.auth import UserResponse, UserCreate
 from app.core.database import get_db
 from app.core.auth import get_current_user
-from app.repositories.task import TaskRepository
+from app.repositories.task import TASK_SORT_COLUMNS, TaskRepository
 from app.repositories.interfaces.task import AbstractTaskRepository
+from app.core.events import EventBroker, event_broker, task_topic
+
+TASK_STATUSES = ["pending", "in_progress", "completed", "cancelled", "hold"]
+TASK_PRIORITIES = list(TASK_PRIORITY_RANKS)
+# Fields a PATCH may set, and the subset that can be cleared with null
+PATCHABLE_TASK_FIELDS = {"title", "description", "status", "priority", "due_date", "assigned_to"}
+NULLABLE_TASK_FIELDS = {"description", "due_date", "assigned_to"}
+# Sort keys one listing may combine
+MAX_SORT_KEYS = 3
 
 class TaskService:
-    def __init__(self, repo):
+    def __init__(self, repo, events: EventBroker = event_broker):
         self.repo = repo
+        self.events = events
+
+    def _publish(self, event_type: str, task: TaskResponse):
+        # Called only after the repository committed the write
+        self.events.publish(event_type, jsonable_encoder(task), topic=task_topic(task.id))
 
     async def create_task(self, task_data: TaskCreate, user_id: int) -> TaskResponse:
         new_task = await self.repo.create_task_in_db(task_data, user_id)
-        return (await self.repo.enrich_tasks_with_usernames(tasks=[new_task]))[0]
+        task = (await self.repo.enrich_tasks_with_usernames(tasks=[new_task]))[0]
+        self._publish("task.created", task)
+        return task
 
-    async def update_task(self, task_id: int, task_update: TaskUpdate, user_id: int) -> TaskResponse:
-        task = await self.repo.update_task_in_db(task_id, task_update, user_id)
+    async def _raise_not_found_or_conflict(self, task_id: int, expected_version: int | None):
+        # A conditional update that matched no rows means either the task is gone
+        # or someone else changed it first; only look it up to tell which
+        if expected_version is not None and await self.repo.get_task_by_id_in_db(task_id):
+            raise HTTPException(status_code=409, detail="Task was modified by another request")
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    async def update_task(self, task_id: int, task_update: TaskUpdate, user_id: int, expected_version: int | None = None) -> TaskResponse:
+        task = await self.repo.update_task_in_db(task_id, task_update, user_id, expected_version)
         if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
-        return (await self.repo.enrich_tasks_with_usernames(tasks=[task]))[0]
+            await self._raise_not_found_or_conflict(task_id, expected_version)
+        task = (await self.repo.enrich_tasks_with_usernames(tasks=[task]))[0]
+        self._publish("task.updated", task)
+        return task
     
+    async def patch_task(self, task_id: int, task_patch: TaskUpdate, user_id: int, expected_version: int | None = None) -> TaskResponse:
+        fields = {
+            key: value
+            for key, value in task_patch.dict(exclude_unset=True).items()
+            if key in PATCHABLE_TASK_FIELDS
+        }
+        if not fields:
+            raise HTTPException(status_code=400, detail="No fields to update")
+
+        for key, value in fields.items():
+            if value is None and key not in NULLABLE_TASK_FIELDS:
+                raise HTTPException(status_code=400, detail=f"Field '{key}' cannot be null")
+        for name, allowed in (("status", TASK_STATUSES), ("priority", TASK_PRIORITIES)):
+            if name in fields and fields[name] not in allowed:
+                raise HTTPException(status_code=400, detail=f"Invalid {name} value")
+
+        task = await self.repo.patch_task_in_db(task_id, fields, user_id, expected_version)
+        if not task:
+            await self._raise_not_found_or_conflict(task_id, expected_version)
+        self._publish("task.updated", task)
+        return task
+
+    def _parse_choices(self, name: str, value: str, allowed: List[str]) -> List[str]:
+        choices = [choice.strip() for choice in value.split(",") if choice.strip()]
+        invalid = [choice for choice in choices if choice not in allowed]
+        if invalid or not choices:
+            raise HTTPException(status_code=400, detail=f"Invalid {name} value")
+        return choices
+
+    def _parse_sort(self, value: str | None) -> List[tuple]:
+        sort = []
+        for field in (value or "").split(","):
+            field = field.strip()
+            if not field:
+                continue
+            descending = field.startswith("-")
+            field = field.lstrip("-")
+            if field not in TASK_SORT_COLUMNS:
+                raise HTTPException(status_code=400, detail=f"Cannot sort by '{field}'")
+            if any(field == sorted_field for sorted_field, _ in sort):
+                raise HTTPException(status_code=400, detail=f"Cannot sort by '{field}' more than once")
+            sort.append((field, descending))
+        if len(sort) > MAX_SORT_KEYS:
+            raise HTTPException(status_code=400, detail=f"Cannot sort by more than {MAX_SORT_KEYS} fields")
+        return sort
+
+    def _parse_fields(self, value: str | None) -> tuple | None:
+        """
+        The requested fields in TaskResponse order, id always included; None for all of them.
+        The result is part of the statement cache key, so every spelling of the same
+        fieldset, and a fieldset naming every field, must come out the same.
+        """
+        if not value:
+            return None
+        requested = set(self._parse_choices("fields", value, list(TASK_RESPONSE_FIELDS))) | {"id"}
+        if requested >= set(TASK_RESPONSE_FIELDS):
+            return None
+        return tuple(field for field in TASK_RESPONSE_FIELDS if field in requested)
+
+    def _build_filters(self, params: TaskFilterParams) -> dict:
+        filters = {}
+        if params.status:
+            filters["status"] = self._parse_choices("status", params.status, TASK_STATUSES)
+        if params.priority:
+            filters["priority"] = self._parse_choices("priority", params.priority, TASK_PRIORITIES)
+        for name in ("assigned_to", "created_by", "due_after", "due_before"):
+            if getattr(params, name) is not None:
+                filters[name] = getattr(params, name)
+        if params.overdue:
+            filters["overdue"] = datetime.utcnow()
+        if params.q:
+            escaped = params.q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            filters["search"] = f"%{escaped}%"
+        return filters
+
     async def list_tasks(self,
         pagination: PaginationParams = Depends(),
+        filters: TaskFilterParams | None = None,
     ):
-        tasks = await self.repo.get_all_tasks_in_db(skip=pagination.skip, limit=pagination.limit)
+        filters = filters or TaskFilterParams()
+        tasks = await self.repo.filter_tasks_in_db(
+            self._build_filters(filters),
+            sort=self._parse_sort(filters.sort),
+            skip=pagination.skip,
+            limit=pagination.limit,
+            include_archived=filters.include_archived,
+            fields=self._parse_fields(filters.fields),
+        )
         if not tasks:
             raise HTTPException(status_code=404, detail="No tasks found")
-        return await self.repo.enrich_tasks_with_usernames(tasks=tasks)
+        return tasks
     
     async def bulk_update_tasks(self, task_update: TaskBulkUpdate, user_id: int) -> List[TaskResponse]:
         if not task_update.task_ids:
             raise HTTPException(status_code=400, detail="No task IDs provided")
         
-        tasks = await self.repo.bulk_update_tasks_in_db(task_update.task_ids, task_update, user_id)
+        tasks = await self.apply_bulk_update(task_update.task_ids, task_update, user_id)
         if not tasks:
             raise HTTPException(status_code=404, detail="No tasks found")
-        
-        return await self.repo.enrich_tasks_with_usernames(tasks=tasks)
+        return tasks
+
+    async def apply_bulk_update(self, task_ids: List[int], task_update: TaskBulkUpdate, user_id: int) -> List[TaskResponse]:
+        """Apply a bulk update to the given tasks, skipping IDs that don't exist."""
+        tasks = await self.repo.bulk_update_tasks_in_db(task_ids, task_update, user_id)
+        if not tasks:
+            return []
+
+        tasks = await self.repo.enrich_tasks_with_usernames(tasks=tasks)
+        for task in tasks:
+            self._publish("task.updated", task)
+        return tasks
     
     async def get_tasks_created_by_user(self, user_id: int) -> List[TaskResponse]:
         tasks = await self.repo.get_tasks_created_by_specific_user_in_db(user_id)
@@ -64,6 +184,40 @@ class TaskService:
             raise HTTPException(status_code=404, detail="No tasks found for this user")
         return await self.repo.enrich_tasks_with_usernames(tasks=tasks)
     
+    async def get_task_stats(self) -> TaskStatsResponse:
+        return TaskStatsResponse(**await self.repo.get_task_stats_in_db())
+
+    async def claim_next_task(self, user_id: int) -> TaskResponse:
+        task = await self.repo.claim_next_task_in_db(user_id)
+        if not task:
+            raise HTTPException(status_code=404, detail="No pending tasks to claim")
+        self._publish("task.claimed", task)
+        return task
+
+    async def get_next_tasks(self, assignee_id: int, limit: int, fields: str | None = None) -> List[TaskResponse]:
+        return await self.repo.get_next_tasks_in_db(assignee_id, limit, self._parse_fields(fields))
+
+    async def get_task_history(self, task_id: int, cursor: int | None, limit: int) -> TaskHistoryPage:
+        # One extra row tells whether there is another page
+        rows = await self.repo.get_task_history_in_db(task_id, cursor, limit + 1)
+        if not rows and cursor is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+        items = [
+            TaskEventResponse(
+                id=event.id,
+                event_type=event.event_type,
+                changes=event.changes,
+                previous=event.previous,
+                version=event.version,
+                changed_by=username,
+                created_at=event.created_at,
+            )
+            for event, username in rows[:limit]
+        ]
+        next_cursor = items[-1].id if len(rows) > limit else None
+        return TaskHistoryPage(items=items, next_cursor=next_cursor)
+
     async def get_overdue_tasks(self) -> List[TaskResponse]:
         tasks = await self.repo.get_overdue_tasks_in_db()
         if not tasks:
@@ -80,25 +234,38 @@ class TaskService:
         
         return await self.repo.enrich_tasks_with_usernames(tasks=tasks)
     
-    async def get_task_by_id(self, task_id: int) -> TaskResponse:
+    async def get_task_by_id(self, task_id: int, include_archived: bool = False, fields: str | None = None) -> TaskResponse:
+        if fields:
+            task = await self.repo.get_task_fields_in_db(task_id, self._parse_fields(fields), include_archived)
+            if not task:
+                raise HTTPException(status_code=404, detail="Task not found")
+            return task
+
         task = await self.repo.get_task_by_id_in_db(task_id)
         if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
+            archived = await self.repo.get_archived_task_in_db(task_id) if include_archived else None
+            if not archived:
+                raise HTTPException(status_code=404, detail="Task not found")
+            return archived
         return (await self.repo.enrich_tasks_with_usernames(tasks=[task]))[0]
     
-    async def update_task_status(self, task_id: int, status: str, user_id: int) -> TaskResponse:
-        if status not in ["pending", "in_progress", "completed", "cancelled", "hold"]:
+    async def update_task_status(self, task_id: int, status: str, user_id: int, expected_version: int | None = None) -> TaskResponse:
+        if status not in TASK_STATUSES:
             raise HTTPException(status_code=400, detail="Invalid status value")
         
-        task = await self.repo.update_task_status_in_db(task_id, status, user_id)
+        task = await self.repo.update_task_status_in_db(task_id, status, user_id, expected_version)
         if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
+            await self._raise_not_found_or_conflict(task_id, expected_version)
         
-        return (await self.repo.enrich_tasks_with_usernames(tasks=[task]))[0]
+        task = (await self.repo.enrich_tasks_with_usernames(tasks=[task]))[0]
+        self._publish("task.status_changed", task)
+        return task
     
-    async def delete_task(self, task_id: int) -> TaskResponse:
-        task = await self.repo.delete_task_in_db(task_id)
+    async def delete_task(self, task_id: int, user_id: int | None = None) -> TaskResponse:
+        task = await self.repo.delete_task_in_db(task_id, user_id)
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
         
-        return (await self.repo.enrich_tasks_with_usernames(tasks=[task]))[0]
+        task = (await self.repo.enrich_tasks_with_usernames(tasks=[task]))[0]
+        self._publish("task.deleted", task)
+        return task
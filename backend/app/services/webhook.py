@@ -0,0 +1,22 @@
+from fastapi import HTTPException
+from typing import List
+from app.repositories.webhook import WebhookRepository
+from app.schemas.webhook import WebhookCreate, WebhookResponse
+
+class WebhookService:
+    def __init__(self, repo: WebhookRepository):
+        self.repo = repo
+
+    async def create_webhook(self, webhook_data: WebhookCreate) -> WebhookResponse:
+        webhook = await self.repo.create_webhook_in_db(webhook_data)
+        return WebhookResponse.from_orm(webhook)
+
+    async def get_all_webhooks(self) -> List[WebhookResponse]:
+        webhooks = await self.repo.get_all_webhooks_in_db()
+        return [WebhookResponse.from_orm(webhook) for webhook in webhooks]
+
+    async def delete_webhook(self, webhook_id: int) -> WebhookResponse:
+        webhook = await self.repo.delete_webhook_in_db(webhook_id)
+        if not webhook:
+            raise HTTPException(status_code=404, detail="Webhook not found")
+        return WebhookResponse.from_orm(webhook)
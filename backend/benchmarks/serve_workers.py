@@ -0,0 +1,99 @@
+"""
+Compare throughput of the launcher with 1 worker and with N workers.
+
+    USE_SQLITE=true python -m benchmarks.serve_workers --workers 4 --duration 10
+
+Starts python -m app.serve for each worker count, drives GET /tasks/stats (a
+database-backed endpoint that needs no auth) with a fixed number of concurrent
+connections and prints requests per second and latency percentiles.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+async def wait_until_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+
+async def drive(url: str, concurrency: int, duration: float) -> list:
+    latencies = []
+    stop_at = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        async def user():
+            while time.monotonic() < stop_at:
+                started = time.perf_counter()
+                response = await client.get(url)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+    return latencies
+
+
+def run(workers: int, port: int, concurrency: int, duration: float) -> dict:
+    env = dict(
+        os.environ,
+        WEBHOOK_DISPATCHER_ENABLED="false",
+        TASK_ARCHIVER_ENABLED="false",
+        TASK_STATS_RECONCILER_ENABLED="false",
+        JOB_RECOVERY_ENABLED="false",
+        LOG_LEVEL="warning",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}/tasks/stats"
+    try:
+        asyncio.run(wait_until_ready(url))
+        latencies = asyncio.run(drive(url, concurrency, duration))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    latencies.sort()
+    return {
+        "workers": workers,
+        "requests_per_second": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="N to compare against 1 worker")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    for workers in sorted({1, args.workers}):
+        result = run(workers, args.port, args.concurrency, args.duration)
+        print(
+            f"{result['workers']:>3} workers: {result['requests_per_second']:8.1f} req/s  "
+            f"p50 {result['p50_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from datetime import datetime
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import Column, DateTime, Float, MetaData, String, Table, pool
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import app.models  # noqa: F401 - registers every model on Base.metadata
+from app.models.base import Base
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Bookkeeping table recording how long each migration took to apply
+MIGRATION_HISTORY_TABLE = "migration_history"
+migration_history = Table(
+    MIGRATION_HISTORY_TABLE,
+    MetaData(),
+    Column("revision", String, nullable=False),
+    Column("description", String),
+    Column("direction", String, nullable=False),
+    Column("duration_seconds", Float, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def database_url() -> str:
+    url = config.get_main_option("sqlalchemy.url")
+    if url:
+        return url
+    from app.core.database import DATABASE_URL
+    return DATABASE_URL
+
+
+def include_name(name, type_, parent_names):
+    # Keep autogenerate from proposing to drop the bookkeeping table
+    return not (type_ == "table" and name == MIGRATION_HISTORY_TABLE)
+
+
+class MigrationClock:
+    """Times each migration step; Alembic only calls back once a step has been applied."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+
+    def record(self, ctx, step, heads, run_args):
+        duration = time.perf_counter() - self.started
+        direction = "upgrade" if step.is_upgrade else "downgrade"
+        ctx.connection.execute(
+            migration_history.insert().values(
+                revision=step.up_revision_id,
+                description=step.up_revision.doc if step.up_revision else None,
+                direction=direction,
+                duration_seconds=duration,
+                applied_at=datetime.utcnow(),
+            )
+        )
+        print(f"⏱️ Migration {step.up_revision_id} ({direction}) took {duration:.3f}s")
+        self.started = time.perf_counter()
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection) -> None:
+    migration_history.create(connection, checkfirst=True)
+    connection.commit()
+
+    clock = MigrationClock()
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        # Each migration commits on its own, so a failure keeps the earlier ones
+        transaction_per_migration=True,
+        on_version_apply=clock.record,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    engine = create_async_engine(database_url(), poolclass=pool.NullPool)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
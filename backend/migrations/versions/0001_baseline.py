@@ -0,0 +1,71 @@
+"""Baseline schema: users, tasks and comments
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Creates the tables as they were before migrations were introduced. Every
+operation is conditional, so databases built by create_all can be upgraded too.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String()),
+        sa.Column("email", sa.String()),
+        sa.Column("full_name", sa.String(), nullable=True),
+        sa.Column("hashed_password", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("type", sa.String()),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_users_id", "users", ["id"], if_not_exists=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True, if_not_exists=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True, if_not_exists=True)
+
+    op.create_table(
+        "tasks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String()),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("status", sa.String()),
+        sa.Column("priority", sa.String()),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("due_date", sa.DateTime(), nullable=True),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("updated_by", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("assigned_to", sa.Integer(), sa.ForeignKey("users.id")),
+        if_not_exists=True,
+    )
+    op.create_index("ix_tasks_id", "tasks", ["id"], if_not_exists=True)
+    op.create_index("ix_tasks_title", "tasks", ["title"], if_not_exists=True)
+
+    op.create_table(
+        "comments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("task_id", sa.Integer(), sa.ForeignKey("tasks.id"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_index("ix_comments_id", "comments", ["id"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_table("comments")
+    op.drop_table("tasks")
+    op.drop_table("users")
@@ -0,0 +1,37 @@
+"""Add comment stats and version columns to tasks
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+The columns are added with constant defaults, which Postgres records without
+rewriting the table. The comment stats are then backfilled in throttled batches.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import add_column_if_missing, backfill_in_batches
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing("tasks", sa.Column("comments_count", sa.Integer(), nullable=False, server_default="0"))
+    add_column_if_missing("tasks", sa.Column("last_commented_at", sa.DateTime(), nullable=True))
+    add_column_if_missing("tasks", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+    backfill_in_batches(
+        "tasks",
+        "comments_count = (SELECT COUNT(*) FROM comments WHERE comments.task_id = tasks.id), "
+        "last_commented_at = (SELECT MAX(comments.created_at) FROM comments WHERE comments.task_id = tasks.id)",
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.drop_column("version")
+        batch_op.drop_column("last_commented_at")
+        batch_op.drop_column("comments_count")
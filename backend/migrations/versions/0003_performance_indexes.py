@@ -0,0 +1,34 @@
+"""Indexes for the task filters and per-task comment queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+Built online (CREATE INDEX CONCURRENTLY on Postgres) so writes keep flowing
+while they are created.
+"""
+from app.core.migrations import create_index_online, drop_index_online
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_tasks_status", "tasks", ["status"]),
+    ("ix_tasks_due_date", "tasks", ["due_date"]),
+    ("ix_tasks_created_by", "tasks", ["created_by"]),
+    ("ix_tasks_updated_by", "tasks", ["updated_by"]),
+    ("ix_tasks_assigned_to", "tasks", ["assigned_to"]),
+    ("ix_comments_task_id_created_at", "comments", ["task_id", "created_at"]),
+]
+
+
+def upgrade():
+    for index_name, table_name, columns in INDEXES:
+        create_index_online(index_name, table_name, columns)
+
+
+def downgrade():
+    for index_name, table_name, _ in reversed(INDEXES):
+        drop_index_online(index_name, table_name)
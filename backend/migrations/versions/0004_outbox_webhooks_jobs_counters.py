@@ -0,0 +1,98 @@
+"""Outbox, webhooks, jobs, task counters and schema version tables
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+The task counters are seeded from the existing tasks so /tasks/stats is
+correct right after the upgrade.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "outbox",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("event_type", sa.String(), nullable=False),
+        sa.Column("aggregate_type", sa.String(), nullable=False),
+        sa.Column("aggregate_id", sa.Integer(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "webhooks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("last_event_id", sa.Integer(), nullable=False),
+        sa.Column("failure_count", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.String(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_webhooks_id", "webhooks", ["id"], if_not_exists=True)
+
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("progress", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=True),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_jobs_id", "jobs", ["id"], if_not_exists=True)
+    op.create_index("ix_jobs_type", "jobs", ["type"], if_not_exists=True)
+
+    op.create_table(
+        "task_counters",
+        sa.Column("dimension", sa.String(), primary_key=True),
+        sa.Column("key", sa.String(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "schema_version",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("fingerprint", sa.String(), nullable=False),
+        sa.Column("applied_at", sa.DateTime()),
+        if_not_exists=True,
+    )
+
+    op.execute("DELETE FROM task_counters")
+    for dimension, column, fallback in (
+        ("status", "status", "none"),
+        ("priority", "priority", "none"),
+        ("assignee", "assigned_to", "unassigned"),
+    ):
+        key = f"COALESCE(CAST({column} AS VARCHAR), '{fallback}')"
+        op.execute(
+            f"INSERT INTO task_counters (dimension, key, count) "
+            f"SELECT '{dimension}', {key}, COUNT(id) FROM tasks GROUP BY {key}"
+        )
+
+
+def downgrade():
+    op.drop_table("schema_version")
+    op.drop_table("task_counters")
+    op.drop_table("jobs")
+    op.drop_table("webhooks")
+    op.drop_table("outbox")
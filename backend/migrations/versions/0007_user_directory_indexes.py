@@ -0,0 +1,41 @@
+"""Indexes for the paginated user directory
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+Built online (CREATE INDEX CONCURRENTLY on Postgres) so signups and profile
+updates keep flowing while they are created.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import create_index_online, drop_index_online
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+PREFIX_INDEXES = [
+    ("ix_users_username_prefix", "username"),
+    ("ix_users_email_prefix", "email"),
+    ("ix_users_full_name_prefix", "full_name"),
+]
+
+
+def _prefix_expression(column: str):
+    ops = " text_pattern_ops" if op.get_bind().dialect.name == "postgresql" else ""
+    return sa.text(f"lower({column}){ops}")
+
+
+def upgrade():
+    create_index_online("ix_users_type_is_active_username", "users", ["type", "is_active", "username"])
+    for index_name, column in PREFIX_INDEXES:
+        create_index_online(index_name, "users", [_prefix_expression(column)])
+
+
+def downgrade():
+    for index_name, _ in reversed(PREFIX_INDEXES):
+        drop_index_online(index_name, "users")
+    drop_index_online("ix_users_type_is_active_username", "users")
@@ -0,0 +1,20 @@
+"""Index for the task priority filter
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from app.core.migrations import create_index_online, drop_index_online
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_index_online("ix_tasks_priority", "tasks", ["priority"])
+
+
+def downgrade():
+    drop_index_online("ix_tasks_priority", "tasks")
@@ -0,0 +1,42 @@
+"""Numeric task priority and the work queue index
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+
+priority_rank is added with a constant default, which Postgres records without
+rewriting the table, then backfilled from priority in throttled batches before
+the indexes are built online.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import add_column_if_missing, backfill_in_batches, create_index_online, drop_index_online
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing("tasks", sa.Column("priority_rank", sa.SmallInteger(), nullable=False, server_default="0"))
+    backfill_in_batches(
+        "tasks",
+        "priority_rank = CASE priority WHEN 'medium' THEN 1 WHEN 'high' THEN 2 WHEN 'urgent' THEN 3 ELSE 0 END",
+    )
+    create_index_online("ix_tasks_priority_rank", "tasks", ["priority_rank"])
+    create_index_online(
+        "ix_tasks_next",
+        "tasks",
+        ["assigned_to", sa.text("priority_rank DESC"), "due_date", "id"],
+        postgresql_where=sa.text("status NOT IN ('completed', 'cancelled')"),
+        sqlite_where=sa.text("status NOT IN ('completed', 'cancelled')"),
+    )
+
+
+def downgrade():
+    drop_index_online("ix_tasks_next", "tasks")
+    drop_index_online("ix_tasks_priority_rank", "tasks")
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.drop_column("priority_rank")
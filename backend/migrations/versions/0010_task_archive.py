@@ -0,0 +1,71 @@
+"""Archive tables for closed tasks and their comments
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+
+The tables start empty; the archiver fills them in throttled batches once it runs,
+so the upgrade itself moves no data.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import create_index_online, drop_index_online
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "tasks_archive",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String()),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("status", sa.String()),
+        sa.Column("priority", sa.String()),
+        sa.Column("priority_rank", sa.SmallInteger(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("due_date", sa.DateTime(), nullable=True),
+        sa.Column("comments_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_commented_at", sa.DateTime(), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("updated_by", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("assigned_to", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_index("ix_tasks_archive_created_by", "tasks_archive", ["created_by"], if_not_exists=True)
+    op.create_index("ix_tasks_archive_assigned_to", "tasks_archive", ["assigned_to"], if_not_exists=True)
+
+    op.create_table(
+        "comments_archive",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("task_id", sa.Integer(), sa.ForeignKey("tasks_archive.id"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_comments_archive_task_id_created_at", "comments_archive", ["task_id", "created_at"], if_not_exists=True
+    )
+
+    create_index_online(
+        "ix_tasks_archivable",
+        "tasks",
+        ["updated_at"],
+        postgresql_where=sa.text("status IN ('completed', 'cancelled')"),
+        sqlite_where=sa.text("status IN ('completed', 'cancelled')"),
+    )
+
+
+def downgrade():
+    drop_index_online("ix_tasks_archivable", "tasks")
+    op.drop_table("comments_archive")
+    op.drop_table("tasks_archive")
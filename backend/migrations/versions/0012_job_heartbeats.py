@@ -0,0 +1,29 @@
+"""Job owner and heartbeat
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19
+
+Jobs record which runner process holds them and when it last checked in, so a
+booting process only fails the jobs whose owner stopped heartbeating.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import add_column_if_missing
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing("jobs", sa.Column("owner_id", sa.String(), nullable=True))
+    add_column_if_missing("jobs", sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.drop_column("heartbeat_at")
+        batch_op.drop_column("owner_id")
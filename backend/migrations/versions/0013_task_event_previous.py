@@ -0,0 +1,27 @@
+"""Previous values in the task history
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19
+
+Events written before this revision have no previous values; their earlier values
+are still the ones the events before them left.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import add_column_if_missing
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing("task_events", sa.Column("previous", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("task_events") as batch_op:
+        batch_op.drop_column("previous")
@@ -0,0 +1,49 @@
+"""Covering index for the work queue
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19
+
+ix_tasks_queue replaces ix_tasks_next with the same key and predicate plus, on
+Postgres, the queue's fixed-size columns as INCLUDE columns. The new index is built
+online before the old one is dropped, so the queue is never without one.
+"""
+import sqlalchemy as sa
+
+from app.core.migrations import create_index_online, drop_index_online
+
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+OPEN_TASKS = sa.text("status NOT IN ('completed', 'cancelled')")
+QUEUE_KEY = ["assigned_to", sa.text("priority_rank DESC"), "due_date", "id"]
+QUEUE_INCLUDE = [
+    "status",
+    "priority",
+    "created_at",
+    "updated_at",
+    "created_by",
+    "updated_by",
+    "comments_count",
+    "last_commented_at",
+    "version",
+]
+
+
+def upgrade():
+    create_index_online(
+        "ix_tasks_queue",
+        "tasks",
+        QUEUE_KEY,
+        postgresql_include=QUEUE_INCLUDE,
+        postgresql_where=OPEN_TASKS,
+        sqlite_where=OPEN_TASKS,
+    )
+    drop_index_online("ix_tasks_next", "tasks")
+
+
+def downgrade():
+    create_index_online("ix_tasks_next", "tasks", QUEUE_KEY, postgresql_where=OPEN_TASKS, sqlite_where=OPEN_TASKS)
+    drop_index_online("ix_tasks_queue", "tasks")
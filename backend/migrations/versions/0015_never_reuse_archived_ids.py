@@ -0,0 +1,70 @@
+"""Never reuse the ids of archived tasks and comments
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-19
+
+Without AUTOINCREMENT, SQLite hands out max(rowid) + 1, so once the newest tasks are
+archived a new task could take an archived task's id, and its history. The tables
+are rebuilt as AUTOINCREMENT and their sequences start past the archived ids too.
+Postgres sequences never reuse an id, so nothing changes there.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import create_index_online, drop_index_online
+
+revision = "0015"
+down_revision = "0014"
+branch_labels = None
+depends_on = None
+
+ARCHIVED_TABLES = {"tasks": "tasks_archive", "comments": "comments_archive"}
+
+
+def _rebuild(table_name: str, autoincrement: bool) -> None:
+    with op.batch_alter_table(table_name, recreate="always", table_kwargs={"sqlite_autoincrement": autoincrement}):
+        pass
+
+
+def _restore_task_indexes() -> None:
+    # Rebuilding reflects the table, which loses the DESC of the queue index and may
+    # lose the partial predicates, so both are created again from their definitions
+    drop_index_online("ix_tasks_queue", "tasks")
+    drop_index_online("ix_tasks_archivable", "tasks")
+    create_index_online(
+        "ix_tasks_queue",
+        "tasks",
+        ["assigned_to", sa.text("priority_rank DESC"), "due_date", "id"],
+        sqlite_where=sa.text("status NOT IN ('completed', 'cancelled')"),
+    )
+    create_index_online(
+        "ix_tasks_archivable",
+        "tasks",
+        ["updated_at"],
+        sqlite_where=sa.text("status IN ('completed', 'cancelled')"),
+    )
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for table_name, archive_name in ARCHIVED_TABLES.items():
+        _rebuild(table_name, autoincrement=True)
+        op.execute(sa.text("DELETE FROM sqlite_sequence WHERE name = :name").bindparams(name=table_name))
+        op.execute(
+            sa.text(
+                "INSERT INTO sqlite_sequence (name, seq) SELECT :name, MAX("
+                f"(SELECT COALESCE(MAX(id), 0) FROM {table_name}), "
+                f"(SELECT COALESCE(MAX(id), 0) FROM {archive_name}))"
+            ).bindparams(name=table_name)
+        )
+    _restore_task_indexes()
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for table_name in ARCHIVED_TABLES:
+        _rebuild(table_name, autoincrement=False)
+    _restore_task_indexes()
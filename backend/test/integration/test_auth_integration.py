@@ -192,6 +192,44 @@ async def test_logout(async_client):
     assert "Logout successful" in data["message"]
 
 
+@pytest.mark.asyncio
+async def test_logout_revokes_token(async_client, admin_token):
+    """Test a token can't be used after logging out with it."""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    assert (await async_client.get("/jobs/999", headers=headers)).status_code == 404
+
+    response = await async_client.post("/auth/logout", headers=headers)
+
+    assert response.status_code == 200
+    assert "revoked" in response.json()["message"]
+    assert (await async_client.get("/jobs/999", headers=headers)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_flow(async_client, admin_token):
+    """Test refreshing, rotation and logout ending the session."""
+    login = await async_client.post("/auth/login", data={"username": "admin", "password": "admin123"})
+    refresh_token = login.json()["refresh_token"]
+
+    response = await async_client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["user"]["username"] == "admin"
+    assert data["refresh_token"] != refresh_token
+    headers = {"Authorization": f"Bearer {data['access_token']}"}
+    assert (await async_client.get("/jobs/999", headers=headers)).status_code == 404
+
+    # The used token can't be exchanged again
+    reused = await async_client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    assert reused.status_code == 401
+
+    login = await async_client.post("/auth/login", data={"username": "admin", "password": "admin123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    await async_client.post("/auth/logout", headers=headers)
+    response = await async_client.post("/auth/refresh", json={"refresh_token": login.json()["refresh_token"]})
+    assert response.status_code == 401
+
+
 @pytest.mark.asyncio
 async def test_get_all_users(async_client, admin_token):
     """Test getting all users as admin."""
@@ -199,12 +237,60 @@ async def test_get_all_users(async_client, admin_token):
         pytest.skip("Admin token not available")
     
     headers = {"Authorization": f"Bearer {admin_token}"}
-    response = await async_client.get("/users/getall", headers=headers)
+    response = await async_client.get("/users", headers=headers)
     
     assert response.status_code == 200
     data = response.json()
-    assert isinstance(data, list)
-    assert len(data) >= 1  # At least the admin user
+    assert isinstance(data["items"], list)
+    assert len(data["items"]) >= 1  # At least the admin user
+    assert data["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_list_users_paginates_and_filters(async_client, admin_token):
+    """Test walking the user directory with cursors, filters and the compact view."""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    for name in ("carol", "bob", "alice"):
+        await async_client.post("/users", headers=headers, json={
+            "username": name, "email": f"{name}@test.com", "password": "secret123",
+            "full_name": f"{name.title()} Smith", "type": "user",
+        })
+
+    first = (await async_client.get("/users?limit=2&type=user", headers=headers)).json()
+    assert [u["username"] for u in first["items"]] == ["alice", "bob"]
+    second = (await async_client.get(f"/users?limit=2&type=user&cursor={first['next_cursor']}", headers=headers)).json()
+    assert [u["username"] for u in second["items"]] == ["carol"]
+    assert second["next_cursor"] is None
+
+    compact = (await async_client.get("/users?type=user&view=compact", headers=headers)).json()
+    assert compact["items"] == [
+        {"id": u["id"], "username": u["username"]} for u in first["items"] + second["items"]
+    ]
+    by_full_name = (await async_client.get("/users?q=BOB%20S", headers=headers)).json()["items"]
+    assert [u["email"] for u in by_full_name] == ["bob@test.com"]
+    by_email = (await async_client.get("/users?q=carol@", headers=headers)).json()["items"]
+    assert [u["username"] for u in by_email] == ["carol"]
+    assert (await async_client.get("/users?is_active=false", headers=headers)).json()["items"] == []
+    assert (await async_client.get("/users?cursor=%25%25", headers=headers)).status_code == 400
+    assert (await async_client.get("/users")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_suggest_users(async_client, admin_token):
+    """Test the autocomplete endpoint serves users from the prefix index."""
+    from app.core.user_index import user_index
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    # Startup loaded the index from the application database, not the test one
+    user_index.invalidate()
+    await async_client.post("/users", headers=headers, json={
+        "username": "zoe", "email": "zoe@test.com", "password": "secret123", "full_name": "Zoe Adams",
+    })
+
+    response = await async_client.get("/users/suggest?q=ad", headers=headers)
+
+    assert response.status_code == 200
+    assert [u["username"] for u in response.json()] == ["admin", "zoe"]
+    assert (await async_client.get("/users/suggest?q=ad")).status_code == 401
 
 
 @pytest.mark.asyncio
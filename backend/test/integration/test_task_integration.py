@@ -2,6 +2,7 @@ import pytest
 import pytest_asyncio
 from httpx import AsyncClient
 from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 import asyncio
@@ -10,6 +11,7 @@ from datetime import datetime, timedelta
 from app.main import app
 from app.core.database import get_db
 from app.models.base import Base
+from app.repositories.task import TaskRepository
 
 
 class AsyncTestClient:
@@ -25,6 +27,9 @@ class AsyncTestClient:
     async def put(self, *args, **kwargs):
         return self.client.put(*args, **kwargs)
     
+    async def patch(self, *args, **kwargs):
+        return self.client.patch(*args, **kwargs)
+
     async def delete(self, *args, **kwargs):
         return self.client.delete(*args, **kwargs)
 
@@ -275,6 +280,145 @@ async def test_update_task_not_found(async_client, auth_token):
     assert "Task not found" in response.json()["detail"]
 
 
+@pytest.mark.asyncio
+async def test_patch_task_partial_update(async_client, auth_token):
+    """Test patching a task only changes the fields sent."""
+    if not auth_token:
+        pytest.skip("Auth token not available")
+
+    task_data = {
+        "title": "Patch Task",
+        "description": "Task to patch",
+        "status": "in_progress",
+        "priority": "high"
+    }
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    create_response = await async_client.post("/tasks", json=task_data, headers=headers)
+    task_id = create_response.json()["id"]
+
+    response = await async_client.patch(f"/tasks/{task_id}", json={"description": None}, headers=headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["title"] == "Patch Task"
+    assert data["description"] is None
+    assert data["status"] == "in_progress"
+    assert data["priority"] == "high"
+    assert data["updated_by"] == "testuser"
+
+
+@pytest.mark.asyncio
+async def test_patch_task_invalid(async_client, auth_token):
+    """Test patching with invalid values or a missing task."""
+    if not auth_token:
+        pytest.skip("Auth token not available")
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    create_response = await async_client.post("/tasks", json={"title": "Patch Task"}, headers=headers)
+    task_id = create_response.json()["id"]
+
+    response = await async_client.patch(f"/tasks/{task_id}", json={"status": "invalid_status"}, headers=headers)
+    assert response.status_code == 400
+
+    response = await async_client.patch(f"/tasks/{task_id}", json={"priority": "bogus"}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid priority value"
+    assert (await async_client.get(f"/tasks/{task_id}", headers=headers)).json()["priority"] == "low"
+
+    response = await async_client.patch(f"/tasks/{task_id}", json={"title": None}, headers=headers)
+    assert response.status_code == 400
+
+    response = await async_client.patch("/tasks/99999", json={"title": "Missing"}, headers=headers)
+    assert response.status_code == 404
+    assert "Task not found" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_update_task_version_conflict(async_client, auth_token):
+    """Test conditional updates return 409 when the task changed meanwhile."""
+    if not auth_token:
+        pytest.skip("Auth token not available")
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    create_response = await async_client.post("/tasks", json={"title": "Versioned Task"}, headers=headers)
+    task_id = create_response.json()["id"]
+    assert create_response.json()["version"] == 1
+
+    response = await async_client.put(
+        f"/tasks/{task_id}", json={"title": "First"}, headers={**headers, "If-Match": '"1"'}
+    )
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.headers["ETag"] == '"2"'
+
+    response = await async_client.patch(
+        f"/tasks/{task_id}", json={"title": "Stale", "expected_version": 1}, headers=headers
+    )
+    assert response.status_code == 409
+
+    response = await async_client.put(
+        f"/tasks/{task_id}/status?status=completed&expected_version=1", headers=headers
+    )
+    assert response.status_code == 409
+
+    response = await async_client.get(f"/tasks/{task_id}", headers=headers)
+    assert response.json()["title"] == "First"
+
+
+@pytest.mark.asyncio
+async def test_task_websocket_pushes_changes(async_client, auth_token):
+    """Test the task WebSocket pushes comment and task changes to subscribers."""
+    if not auth_token:
+        pytest.skip("Auth token not available")
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    create_response = await async_client.post("/tasks", json={"title": "Live Task"}, headers=headers)
+    task_id = create_response.json()["id"]
+
+    with async_client.client.websocket_connect(f"/ws/tasks/{task_id}?token={auth_token}") as websocket:
+        comment = {"task_id": task_id, "user_id": 0, "content": "Live comment"}
+        await async_client.post(f"/tasks/{task_id}/comments", json=comment, headers=headers)
+        await async_client.put(f"/tasks/{task_id}/status?status=completed", headers=headers)
+
+        message = websocket.receive_json()
+        assert message["type"] == "comment.created"
+        assert message["data"]["content"] == "Live comment"
+
+        message = websocket.receive_json()
+        assert message["type"] == "task.status_changed"
+        assert message["data"]["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_task_websocket_rejects_invalid_token(async_client):
+    """Test the task WebSocket refuses connections without a valid token."""
+    with pytest.raises(WebSocketDisconnect) as excinfo:
+        with async_client.client.websocket_connect("/ws/tasks/1?token=invalid") as websocket:
+            websocket.receive_json()
+    assert excinfo.value.code == 1008
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_tasks(async_client, auth_token):
+    """Test bulk updating several tasks in one request."""
+    if not auth_token:
+        pytest.skip("Auth token not available")
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    task_ids = []
+    for i in range(2):
+        response = await async_client.post("/tasks", json={"title": f"Bulk {i}"}, headers=headers)
+        task_ids.append(response.json()["id"])
+
+    response = await async_client.post(
+        "/tasks/bulk_update", json={"task_ids": task_ids, "status": "completed"}, headers=headers
+    )
+
+    assert response.status_code == 200
+    assert [task["status"] for task in response.json()] == ["completed", "completed"]
+
+
 @pytest.mark.asyncio
 async def test_update_task_status(async_client, auth_token):
     """Test updating task status."""
@@ -379,6 +523,133 @@ async def test_list_tasks_with_pagination(async_client, auth_token):
     assert isinstance(data, list)
     assert len(data) <= 2
 
+@pytest.mark.asyncio
+async def test_list_tasks_with_filters_and_sort(async_client, auth_token):
+    """Test filtering and sorting the task list."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for title, status, priority in [("Alpha", "pending", "low"), ("Beta", "pending", "urgent"), ("Gamma", "completed", "high")]:
+        await async_client.post("/tasks", json={"title": title, "status": status, "priority": priority}, headers=headers)
+
+    response = await async_client.get("/tasks?status=pending&sort=-priority", headers=headers)
+    assert response.status_code == 200
+    assert [t["title"] for t in response.json()] == ["Beta", "Alpha"]
+
+    response = await async_client.get("/tasks?priority=high,urgent&q=mm", headers=headers)
+    assert [t["title"] for t in response.json()] == ["Gamma"]
+
+    assert (await async_client.get("/tasks?status=done", headers=headers)).status_code == 400
+    assert (await async_client.get("/tasks?sort=password", headers=headers)).status_code == 400
+    assert (await async_client.get("/tasks?sort=priority,-priority", headers=headers)).status_code == 400
+    assert (await async_client.get("/tasks?sort=priority,due_date,title,created_at", headers=headers)).status_code == 400
+    assert (await async_client.get("/tasks?status=cancelled", headers=headers)).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_next_tasks(async_client, auth_token):
+    """Test the work queue of the current user."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    login = await async_client.post("/auth/login", data={"username": "testuser", "password": "test123"})
+    user_id = login.json()["user"]["id"]
+    for title, priority in [("Low", "low"), ("Urgent", "urgent"), ("Medium", "medium")]:
+        await async_client.post("/tasks", json={"title": title, "priority": priority, "assigned_to": user_id}, headers=headers)
+
+    response = await async_client.get("/tasks/next?n=2", headers=headers)
+
+    assert response.status_code == 200
+    assert [t["title"] for t in response.json()] == ["Urgent", "Medium"]
+    assert (await async_client.get(f"/tasks/next?assignee={user_id + 100}", headers=headers)).json() == []
+
+
+@pytest.mark.asyncio
+async def test_claim_next_task(async_client, auth_token):
+    """Test workers claiming pending tasks."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for title, priority in [("Low", "low"), ("Urgent", "urgent")]:
+        await async_client.post("/tasks", json={"title": title, "priority": priority}, headers=headers)
+
+    response = await async_client.post("/tasks/claim", headers=headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["title"], data["status"], data["assigned_to"]) == ("Urgent", "in_progress", "testuser")
+    assert response.headers["ETag"] == '"2"'
+    assert (await async_client.post("/tasks/claim", headers=headers)).json()["title"] == "Low"
+    assert (await async_client.post("/tasks/claim", headers=headers)).status_code == 404
+    assert (await async_client.post("/tasks/claim")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_get_task_history(async_client, auth_token):
+    """Test paging through a task's history, newest first."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    task_id = (await async_client.post("/tasks", json={"title": "Tracked"}, headers=headers)).json()["id"]
+    for status in ("in_progress", "completed"):
+        await async_client.put(f"/tasks/{task_id}/status?status={status}", headers=headers)
+
+    first = (await async_client.get(f"/tasks/{task_id}/history?limit=2", headers=headers)).json()
+    assert [(e["event_type"], e["changes"], e["previous"]) for e in first["items"]] == [
+        ("status_changed", {"status": "completed"}, {"status": "in_progress"}),
+        ("status_changed", {"status": "in_progress"}, {"status": "pending"}),
+    ]
+    assert first["items"][0]["changed_by"] == "testuser"
+    second = (await async_client.get(f"/tasks/{task_id}/history?limit=2&cursor={first['next_cursor']}", headers=headers)).json()
+    assert [e["event_type"] for e in second["items"]] == ["created"]
+    assert second["next_cursor"] is None
+    assert (await async_client.get("/tasks/99999/history", headers=headers)).status_code == 404
+    assert (await async_client.get(f"/tasks/{task_id}/history")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_task_reads_with_sparse_fields(async_client, auth_token):
+    """Test fields= trims task reads to the requested fields."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    task_id = (await async_client.post("/tasks", json={"title": "Lean", "description": "Long text"}, headers=headers)).json()["id"]
+
+    listed = (await async_client.get("/tasks?fields=title,status", headers=headers)).json()
+    assert listed == [{"id": task_id, "title": "Lean", "status": "pending"}]
+    response = await async_client.get(f"/tasks/{task_id}?fields=title,version", headers=headers)
+    assert response.json() == {"id": task_id, "title": "Lean", "version": 1}
+    assert response.headers["ETag"] == '"1"'
+
+    full = (await async_client.get("/tasks", headers=headers)).json()[0]
+    assert full["description"] == "Long text" and full["due_date"] is None
+    assert (await async_client.get("/tasks?fields=password", headers=headers)).status_code == 400
+
+    # Spellings of the same fieldset share one cached statement, and naming every field
+    # is the same shape as naming none
+    shapes = len(TaskRepository._filter_statements)
+    for fields in ("status,title", "title,status,id", "status,title,title"):
+        assert (await async_client.get(f"/tasks?fields={fields}", headers=headers)).json() == listed
+    every_field = ",".join(full)
+    assert (await async_client.get(f"/tasks?fields={every_field}", headers=headers)).json() == [full]
+    assert len(TaskRepository._filter_statements) == shapes
+
+
+@pytest.mark.asyncio
+async def test_task_event_stream_requires_auth(async_client):
+    """Test the SSE feed rejects clients without a valid token, like the WebSocket feed."""
+    assert (await async_client.get("/tasks/events")).status_code == 401
+    assert (await async_client.get("/tasks/events?token=invalid")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_get_task_stats(async_client, auth_token):
+    """Test task stats are served from the counters."""
+    if not auth_token:
+        pytest.skip("Auth token not available")
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    await async_client.post("/tasks", json={"title": "Counted", "priority": "high"}, headers=headers)
+
+    response = await async_client.get("/tasks/stats", headers=headers)
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["total"] == 1
+    assert stats["by_priority"] == {"high": 1}
+    assert stats["by_assignee"] == {"unassigned": 1}
+
+
 @pytest.mark.asyncio
 async def test_search_tasks_empty_query(async_client, auth_token):
     """Test searching with empty query."""
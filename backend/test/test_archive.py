@@ -0,0 +1,106 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.jobs.archive import TaskArchiver
+from app.models.archive import ArchivedComment, ArchivedTask
+from app.models.comment import Comment
+from app.models.task import Task
+from app.repositories.comment import CommentRepository
+from app.repositories.task import TaskRepository
+from app.schemas.comment import TaskCommentCreate
+from app.schemas.task import TaskCreate
+
+def make_archiver(test_engine, **kwargs):
+    session_factory = sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+    return TaskArchiver(session_factory=session_factory, archive_after=timedelta(days=30), pause=0, **kwargs)
+
+async def count(db_session, model):
+    return (await db_session.execute(select(func.count()).select_from(model))).scalar()
+
+@pytest.mark.asyncio
+async def test_archiver_moves_old_closed_tasks_with_their_comments(db_session, test_engine, create_test_user):
+    """Test only tasks closed long enough ago move to the archive, in batches, comments included."""
+    user = await create_test_user("archivist", "password123")
+    user_id = user.id
+    repo = TaskRepository(db_session)
+    long_ago = datetime.utcnow() - timedelta(days=60)
+    task_ids = {}
+    for title, status, updated_at in [
+        ("Old done", "completed", long_ago),
+        ("Old cancelled", "cancelled", long_ago),
+        ("Recently done", "completed", None),
+        ("Old open", "in_progress", long_ago),
+    ]:
+        task = await repo.create_task_in_db(TaskCreate(title=title, status=status, assigned_to=user_id), user_id)
+        task_ids[title] = task.id
+        if updated_at:
+            await db_session.execute(update(Task).where(Task.id == task.id).values(updated_at=updated_at))
+    await db_session.commit()
+    await CommentRepository(db_session).add_comment_to_task_in_db(task_ids["Old done"], TaskCommentCreate(content="Shipped"), user_id)
+    await db_session.execute(update(Task).where(Task.id == task_ids["Old done"]).values(updated_at=long_ago))
+    await db_session.commit()
+
+    archiver = make_archiver(test_engine, batch_size=1)
+    assert await archiver.archive_once() == 2
+    assert await archiver.archive_once() == 0
+
+    db_session.expire_all()
+    hot = (await db_session.execute(select(Task.title).order_by(Task.id))).scalars().all()
+    assert hot == ["Recently done", "Old open"]
+    archived = (await db_session.execute(select(ArchivedTask).order_by(ArchivedTask.id))).scalars().all()
+    assert [(t.title, t.comments_count) for t in archived] == [("Old done", 1), ("Old cancelled", 0)]
+    assert all(t.archived_at is not None for t in archived)
+    assert await count(db_session, Comment) == 0
+    assert await count(db_session, ArchivedComment) == 1
+
+    stats = await repo.get_task_stats_in_db()
+    assert stats["by_status"] == {"completed": 1, "in_progress": 1}
+    assert stats["by_assignee"] == {str(user_id): 2}
+
+@pytest.mark.asyncio
+async def test_archived_tasks_are_read_only_on_request(db_session, test_engine, create_test_user):
+    """Test reads skip archived tasks unless include_archived is set."""
+    user = await create_test_user("historian", "password123")
+    user_id = user.id
+    repo = TaskRepository(db_session)
+    for title, status in [("Live", "pending"), ("History", "completed")]:
+        task = await repo.create_task_in_db(TaskCreate(title=title, status=status), user_id)
+    archived_id = task.id
+    await CommentRepository(db_session).add_comment_to_task_in_db(archived_id, TaskCommentCreate(content="Done"), user_id)
+    await db_session.execute(update(Task).where(Task.id == archived_id).values(updated_at=datetime.utcnow() - timedelta(days=31)))
+    await db_session.commit()
+    await make_archiver(test_engine, batch_size=10).archive_once()
+    # The archiver ran in its own session; forget the objects this one still holds
+    db_session.expunge_all()
+
+    assert [t.title for t in await repo.filter_tasks_in_db({})] == ["Live"]
+    everything = await repo.filter_tasks_in_db({"search": "%i%"}, sort=[("title", False)], include_archived=True)
+    assert [t.title for t in everything] == ["History", "Live"]
+    assert await repo.get_task_by_id_in_db(archived_id) is None
+    archived = await repo.get_archived_task_in_db(archived_id)
+    assert (archived.title, archived.created_by) == ("History", "historian")
+    comments = await CommentRepository(db_session).get_archived_comments_for_task_in_db(archived_id)
+    assert [(c.content, c.created_by_user.username) for c in comments] == [("Done", "historian")]
+
+@pytest.mark.asyncio
+async def test_new_task_never_reuses_an_archived_id(db_session, test_engine, create_test_user):
+    """Test archiving the newest task doesn't free its id for the next task, or its history."""
+    user = await create_test_user("archivist", "password123")
+    user_id = user.id
+    repo = TaskRepository(db_session)
+    newest = await repo.create_task_in_db(TaskCreate(title="Newest", status="completed"), user_id)
+    archived_id = newest.id
+    await db_session.execute(
+        update(Task).where(Task.id == archived_id).values(updated_at=datetime.utcnow() - timedelta(days=60))
+    )
+    await db_session.commit()
+    assert await make_archiver(test_engine).archive_once() == 1
+
+    fresh = await repo.create_task_in_db(TaskCreate(title="Fresh"), user_id)
+
+    assert fresh.id > archived_id
+    history = await repo.get_task_history_in_db(fresh.id, None, 10)
+    assert [event.event_type for event, _ in history] == ["created"]
+    assert (await repo.get_archived_task_in_db(archived_id)).title == "Newest"
@@ -4,6 +4,10 @@ from app.repositories.auth import AuthRepository
 from app.schemas.auth import UserCreate
 from app.models.user import User
 from passlib.context import CryptContext
+import app.core.passwords as passwords
+from app.core.passwords import build_password_context, calibrate
+from app.repositories.token import RefreshTokenRepository
+from app.services.auth import AuthService
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -132,6 +136,30 @@ async def test_hash_password_generates_different_hashes(db_session):
     assert pwd_context.verify(password, hash1)
     assert pwd_context.verify(password, hash2)
 
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_password_hash(db_session, create_test_user, monkeypatch):
+    """Test a successful login replaces a hash that doesn't follow the hashing policy."""
+    user = await create_test_user("rehashuser", "password123")
+    assert user.hashed_password.startswith("$2b$12$")
+    monkeypatch.setattr(passwords, "pwd_context", build_password_context("bcrypt", bcrypt_rounds=4))
+    service = AuthService(AuthRepository(db_session), RefreshTokenRepository(db_session))
+
+    assert await service.authenticate_user("rehashuser", "wrongpassword") is None
+    authenticated = await service.authenticate_user("rehashuser", "password123")
+
+    assert authenticated.hashed_password.startswith("$2b$04$")
+    stored = await AuthRepository(db_session).get_user_by_username_in_db("rehashuser")
+    await db_session.refresh(stored)
+    assert stored.hashed_password.startswith("$2b$04$")
+    assert passwords.verify_password("password123", stored.hashed_password)
+
+def test_calibrate_password_hashing():
+    """Test calibration stays at the lowest cost when the target can't be met."""
+    settings, elapsed_ms = calibrate("bcrypt", target_ms=0, samples=1, max_cost=6)
+
+    assert settings == {"PASSWORD_HASH_SCHEME": "bcrypt", "PASSWORD_BCRYPT_ROUNDS": 4}
+    assert elapsed_ms > 0
+
 @pytest.mark.asyncio
 async def test_get_all_users_in_db(db_session, create_test_user):
     """Test getting all users from database."""
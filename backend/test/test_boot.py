@@ -0,0 +1,49 @@
+import pytest
+from passlib.context import CryptContext
+from sqlalchemy import select, text
+from app.core.boot import StartupTimer
+from app.core.database import DEFAULT_ADMIN_PASSWORD_HASH, ensure_schema, schema_fingerprint
+from app.models.schema_version import SchemaVersion
+
+@pytest.mark.asyncio
+async def test_ensure_schema_runs_create_all_only_when_schema_changed(db_session, test_engine):
+    """Test the schema is created once and later boots only check the version table."""
+    assert await ensure_schema(test_engine) is True
+    assert await ensure_schema(test_engine) is False
+
+    # A model change shows up as a different fingerprint
+    version = await db_session.get(SchemaVersion, 1)
+    version.fingerprint = "outdated"
+    await db_session.commit()
+
+    assert await ensure_schema(test_engine) is True
+    result = await db_session.execute(select(SchemaVersion.fingerprint))
+    assert result.scalars().all() == [schema_fingerprint(test_engine.dialect)]
+
+@pytest.mark.asyncio
+async def test_ensure_schema_refuses_to_stamp_a_schema_missing_an_index(db_session, test_engine):
+    """Test an existing table that lacks part of the models' schema isn't stamped as current."""
+    assert await ensure_schema(test_engine) is True
+    async with test_engine.begin() as conn:
+        await conn.execute(text("DROP INDEX ix_tasks_queue"))
+        await conn.execute(text("UPDATE schema_version SET fingerprint = 'outdated'"))
+
+    with pytest.raises(RuntimeError, match="ix_tasks_queue.*alembic upgrade head"):
+        await ensure_schema(test_engine)
+    result = await db_session.execute(select(SchemaVersion.fingerprint))
+    assert result.scalars().all() == ["outdated"]
+
+def test_default_admin_hash_matches_default_password():
+    """Test the precomputed admin hash still verifies against the default password."""
+    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    assert pwd_context.verify("admin123", DEFAULT_ADMIN_PASSWORD_HASH)
+
+def test_startup_timer_records_phases():
+    """Test each startup phase is timed and reported."""
+    timer = StartupTimer()
+    with timer.phase("schema"):
+        pass
+    timer.mark("imports")
+
+    assert set(timer.phases) == {"schema", "imports"}
+    assert "schema" in timer.report() and "total" in timer.report()
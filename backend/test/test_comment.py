@@ -0,0 +1,134 @@
+import pytest
+from sqlalchemy import update
+from app.models.task import Task
+from app.schemas.comment import TaskCommentCreate
+from app.schemas.task import TaskCreate
+from app.repositories.comment import CommentRepository
+from app.repositories.task import TaskRepository
+
+@pytest.mark.asyncio
+async def test_add_comment_updates_task_stats(db_session, create_test_user):
+    """Test adding comments increments the task comment stats."""
+    user = await create_test_user("commenter", "password123")
+    task_repo = TaskRepository(db_session)
+    task = await task_repo.create_task_in_db(TaskCreate(title="Commented Task"), user.id)
+    repo = CommentRepository(db_session)
+
+    await repo.add_comment_to_task_in_db(task.id, TaskCommentCreate(content="First"), user.id)
+    second = await repo.add_comment_to_task_in_db(task.id, TaskCommentCreate(content="Second"), user.id)
+
+    await db_session.refresh(task)
+    assert task.comments_count == 2
+    assert task.last_commented_at == second.created_at
+
+@pytest.mark.asyncio
+async def test_delete_comment_updates_task_stats(db_session, create_test_user):
+    """Test deleting a comment decrements the count and rewinds last activity."""
+    user = await create_test_user("commenter", "password123")
+    task_repo = TaskRepository(db_session)
+    task = await task_repo.create_task_in_db(TaskCreate(title="Commented Task"), user.id)
+    repo = CommentRepository(db_session)
+
+    first = await repo.add_comment_to_task_in_db(task.id, TaskCommentCreate(content="First"), user.id)
+    second = await repo.add_comment_to_task_in_db(task.id, TaskCommentCreate(content="Second"), user.id)
+    await repo.delete_comment_from_task_in_db(second.id)
+
+    await db_session.refresh(task)
+    assert task.comments_count == 1
+    assert task.last_commented_at == first.created_at
+
+    await repo.delete_comment_from_task_in_db(first.id)
+    await db_session.refresh(task)
+    assert task.comments_count == 0
+    assert task.last_commented_at is None
+
+@pytest.mark.asyncio
+async def test_recompute_comment_stats_in_db(db_session, create_test_user):
+    """Test the repair job restores drifted comment stats in batches."""
+    user = await create_test_user("commenter", "password123")
+    task_repo = TaskRepository(db_session)
+    repo = CommentRepository(db_session)
+    tasks = [
+        await task_repo.create_task_in_db(TaskCreate(title=f"Task {i}"), user.id)
+        for i in range(3)
+    ]
+    latest = await repo.add_comment_to_task_in_db(tasks[0].id, TaskCommentCreate(content="Hi"), user.id)
+
+    # Simulate drift
+    await db_session.execute(update(Task).values(comments_count=42, last_commented_at=None))
+    await db_session.commit()
+
+    processed = await repo.recompute_comment_stats_in_db(batch_size=2)
+
+    assert processed == 3
+    for task in tasks:
+        await db_session.refresh(task)
+    assert tasks[0].comments_count == 1
+    assert tasks[0].last_commented_at == latest.created_at
+    assert tasks[1].comments_count == 0
+    assert tasks[2].last_commented_at is None
+
+@pytest.mark.asyncio
+async def test_get_latest_comments_for_tasks_in_db(db_session, create_test_user):
+    """Test fetching the latest N comments of several tasks at once."""
+    user = await create_test_user("commenter", "password123")
+    task_repo = TaskRepository(db_session)
+    repo = CommentRepository(db_session)
+    busy = await task_repo.create_task_in_db(TaskCreate(title="Busy Task"), user.id)
+    quiet = await task_repo.create_task_in_db(TaskCreate(title="Quiet Task"), user.id)
+    empty = await task_repo.create_task_in_db(TaskCreate(title="Empty Task"), user.id)
+
+    for i in range(4):
+        await repo.add_comment_to_task_in_db(busy.id, TaskCommentCreate(content=f"Busy {i}"), user.id)
+    await repo.add_comment_to_task_in_db(quiet.id, TaskCommentCreate(content="Quiet 0"), user.id)
+
+    grouped = await repo.get_latest_comments_for_tasks_in_db([busy.id, quiet.id, empty.id], per_task=2)
+
+    assert [c.content for c in grouped[busy.id]] == ["Busy 3", "Busy 2"]
+    assert [c.content for c in grouped[quiet.id]] == ["Quiet 0"]
+    assert grouped[empty.id] == []
+    assert grouped[busy.id][0].created_by_user.username == "commenter"
+
+@pytest.mark.asyncio
+async def test_add_comment_to_missing_task(db_session, create_test_user):
+    """Test adding a comment to a non-existent task returns None and writes nothing."""
+    user = await create_test_user("commenter", "password123")
+    repo = CommentRepository(db_session)
+
+    result = await repo.add_comment_to_task_in_db(99999, TaskCommentCreate(content="Lost"), user.id)
+
+    assert result is None
+    grouped = await repo.get_latest_comments_for_tasks_in_db([99999], per_task=5)
+    assert grouped[99999] == []
+
+@pytest.mark.asyncio
+async def test_add_comment_returns_author(db_session, create_test_user):
+    """Test the inserted comment comes back with its author's fields."""
+    user = await create_test_user("commenter", "password123")
+    task = await TaskRepository(db_session).create_task_in_db(TaskCreate(title="Task"), user.id)
+    repo = CommentRepository(db_session)
+
+    comment = await repo.add_comment_to_task_in_db(task.id, TaskCommentCreate(content="Hello"), user.id)
+
+    assert comment.id is not None
+    assert comment.task_id == task.id
+    assert comment.content == "Hello"
+    assert comment.created_by_user.username == "commenter"
+
+@pytest.mark.asyncio
+async def test_delete_comment_checks_task_and_owner(db_session, create_test_user):
+    """Test a delete restricted by task and owner only removes matching comments."""
+    author = await create_test_user("author", "password123")
+    other = await create_test_user("other", "password456")
+    task = await TaskRepository(db_session).create_task_in_db(TaskCreate(title="Task"), author.id)
+    repo = CommentRepository(db_session)
+    comment = await repo.add_comment_to_task_in_db(task.id, TaskCommentCreate(content="Mine"), author.id)
+
+    assert await repo.delete_comment_from_task_in_db(comment.id, task_id=task.id + 1) is None
+    assert await repo.delete_comment_from_task_in_db(comment.id, task_id=task.id, owner_id=other.id) is None
+
+    deleted = await repo.delete_comment_from_task_in_db(comment.id, task_id=task.id, owner_id=author.id)
+
+    assert deleted.id == comment.id
+    assert deleted.created_by_user.username == "author"
+    assert await repo.get_comment_by_id_in_db(comment.id) is None
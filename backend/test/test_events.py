@@ -0,0 +1,127 @@
+import pytest
+from app.core.events import EventBroker, task_topic
+from app.repositories.task import TaskRepository
+from app.schemas.task import TaskCreate
+from app.services.task import TaskService
+
+@pytest.mark.asyncio
+async def test_publish_delivers_to_subscribers():
+    """Test every subscriber receives published events in order."""
+    broker = EventBroker()
+    first = broker.subscribe()
+    second = broker.subscribe()
+
+    broker.publish("task.created", {"id": 1})
+    broker.publish("task.deleted", {"id": 1})
+
+    for subscriber in (first, second):
+        created = await subscriber.next_event(timeout=1)
+        deleted = await subscriber.next_event(timeout=1)
+        assert (created.type, deleted.type) == ("task.created", "task.deleted")
+        assert created.id < deleted.id
+
+@pytest.mark.asyncio
+async def test_next_event_times_out_when_idle():
+    """Test an idle subscriber gets None after the timeout."""
+    broker = EventBroker()
+    subscriber = broker.subscribe()
+
+    assert await subscriber.next_event(timeout=0.01) is None
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped_on_overflow():
+    """Test a full buffer drops that subscriber without affecting the others."""
+    broker = EventBroker(buffer_size=2)
+    slow = broker.subscribe()
+    fast = broker.subscribe()
+
+    broker.publish("task.updated", {"id": 1})
+    await fast.next_event(timeout=1)
+    broker.publish("task.updated", {"id": 2})
+    await fast.next_event(timeout=1)
+    broker.publish("task.updated", {"id": 3})
+
+    assert slow.overflowed
+    assert not fast.overflowed
+    assert broker.subscriber_count == 1
+    assert (await fast.next_event(timeout=1)).data == {"id": 3}
+
+@pytest.mark.asyncio
+async def test_subscribe_resumes_from_last_event_id():
+    """Test resuming replays only the events after Last-Event-ID."""
+    broker = EventBroker()
+    events = [broker.publish("task.updated", {"id": i}) for i in range(3)]
+
+    subscriber = broker.subscribe(last_event_id=events[0].id)
+
+    assert (await subscriber.next_event(timeout=1)).data == {"id": 1}
+    assert (await subscriber.next_event(timeout=1)).data == {"id": 2}
+    assert await subscriber.next_event(timeout=0.01) is None
+
+@pytest.mark.asyncio
+async def test_subscribe_requests_resync_when_history_is_gone():
+    """Test resuming from an event older than the history asks for a resync."""
+    broker = EventBroker(history_size=2)
+    events = [broker.publish("task.updated", {"id": i}) for i in range(4)]
+
+    subscriber = broker.subscribe(last_event_id=events[0].id)
+
+    assert (await subscriber.next_event(timeout=1)).type == "resync"
+    assert (await subscriber.next_event(timeout=1)).data == {"id": 2}
+
+@pytest.mark.asyncio
+async def test_subscribe_requests_resync_for_ids_of_another_process():
+    """Test a Last-Event-ID from a restarted or different process gets a resync, not a silent gap."""
+    previous = EventBroker(epoch=1000)
+    stale_id = [previous.publish("task.updated", {"id": i}) for i in range(5)][-1].id
+    # Restarted with a lower counter than the client has seen
+    broker = EventBroker(epoch=0)
+    broker.publish("task.updated", {"id": "new"})
+
+    from_the_future = broker.subscribe(last_event_id=stale_id)
+    assert (await from_the_future.next_event(timeout=1)).type == "resync"
+    assert await from_the_future.next_event(timeout=0.01) is None
+
+    # A later process numbers above every id an earlier one issued
+    restarted = EventBroker(epoch=stale_id + 1000)
+    event = restarted.publish("task.updated", {"id": "newer"})
+    from_the_past = restarted.subscribe(last_event_id=stale_id)
+    assert (await from_the_past.next_event(timeout=1)).type == "resync"
+    assert (await from_the_past.next_event(timeout=1)).id == event.id
+    assert EventBroker().subscribe(last_event_id=stale_id).backlog[0].type == "resync"
+
+@pytest.mark.asyncio
+async def test_topic_subscribers_only_receive_their_topic():
+    """Test topic subscribers get only their task's events while the firehose gets all."""
+    broker = EventBroker()
+    firehose = broker.subscribe()
+    task_one = broker.subscribe(topic=task_topic(1))
+    task_two = broker.subscribe(topic=task_topic(2))
+
+    broker.publish("comment.created", {"task_id": 1}, topic=task_topic(1))
+
+    assert (await task_one.next_event(timeout=1)).data == {"task_id": 1}
+    assert (await firehose.next_event(timeout=1)).data == {"task_id": 1}
+    assert await task_two.next_event(timeout=0.01) is None
+
+    broker.unsubscribe(task_one)
+    broker.unsubscribe(task_two)
+    assert broker.subscriber_count == 1
+
+@pytest.mark.asyncio
+async def test_task_service_publishes_after_write(db_session, create_test_user):
+    """Test task writes publish serialized change events."""
+    user = await create_test_user("publisher", "password123")
+    broker = EventBroker()
+    subscriber = broker.subscribe()
+    service = TaskService(TaskRepository(db_session), events=broker)
+
+    task = await service.create_task(TaskCreate(title="Published Task"), user.id)
+    await service.update_task_status(task.id, "completed", user.id)
+    await service.delete_task(task.id)
+
+    received = [await subscriber.next_event(timeout=1) for _ in range(3)]
+    assert [event.type for event in received] == ["task.created", "task.status_changed", "task.deleted"]
+    assert received[0].data["title"] == "Published Task"
+    assert received[1].data["status"] == "completed"
+    assert "id: " in received[2].encode()
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.jobs.runner import JobRunner
+from app.jobs.tasks import BULK_UPDATE_JOB, run_bulk_update
+from app.models.task import Task
+from app.repositories.job import JobRepository
+from app.repositories.task import TaskRepository
+from app.schemas.task import TaskCreate
+
+def make_runner(test_engine, **kwargs):
+    return JobRunner(session_factory=sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False), **kwargs)
+
+@pytest.mark.asyncio
+async def test_bulk_update_job_reports_progress_and_result(db_session, test_engine, create_test_user):
+    """Test the bulk update job updates the tasks and records its outcome."""
+    user = await create_test_user("jobber", "password123")
+    task_repo = TaskRepository(db_session)
+    tasks = [await task_repo.create_task_in_db(TaskCreate(title=f"Task {i}"), user.id) for i in range(3)]
+    task_ids = [task.id for task in tasks] + [99999]
+    runner = make_runner(test_engine)
+    runner.register(BULK_UPDATE_JOB)(run_bulk_update)
+
+    job = await JobRepository(db_session).create_job_in_db(
+        BULK_UPDATE_JOB, {"task_ids": task_ids, "status": "completed"}, user.id
+    )
+    await runner.submit(job)
+
+    await db_session.refresh(job)
+    assert job.status == "succeeded"
+    assert (job.progress, job.total) == (4, 4)
+    assert job.result == {"updated": 3, "not_found": [99999]}
+    assert job.started_at and job.finished_at
+    for task in tasks:
+        await db_session.refresh(task)
+        assert task.status == "completed"
+
+@pytest.mark.asyncio
+async def test_failed_job_records_error(db_session, test_engine, create_test_user):
+    """Test an exception in a handler marks the job as failed with the error."""
+    user = await create_test_user("jobber", "password123")
+    runner = make_runner(test_engine)
+
+    @runner.register("broken")
+    async def broken(db, job, progress):
+        raise ValueError("boom")
+
+    job = await JobRepository(db_session).create_job_in_db("broken", {}, user.id)
+    await runner.submit(job)
+
+    await db_session.refresh(job)
+    assert job.status == "failed"
+    assert job.error == "boom"
+
+@pytest.mark.asyncio
+async def test_job_type_concurrency_is_capped(db_session, test_engine, create_test_user):
+    """Test no more jobs of a type run at once than its concurrency cap allows."""
+    user = await create_test_user("jobber", "password123")
+    runner = make_runner(test_engine)
+    running = 0
+    peak = 0
+
+    @runner.register("slow", max_concurrency=2)
+    async def slow(db, job, progress):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    repo = JobRepository(db_session)
+    jobs = [await repo.create_job_in_db("slow", {}, user.id) for _ in range(5)]
+    await asyncio.gather(*(runner.submit(job) for job in jobs))
+
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_recover_fails_only_jobs_with_stale_heartbeats(db_session, test_engine, create_test_user):
+    """Test startup fails the jobs of dead processes and leaves live workers' jobs alone."""
+    user = await create_test_user("jobber", "password123")
+    repo = JobRepository(db_session)
+    lost = await repo.create_job_in_db(BULK_UPDATE_JOB, {"task_ids": [1]}, user.id, "gone:1:x")
+    alive = await repo.create_job_in_db(BULK_UPDATE_JOB, {"task_ids": [2]}, user.id, "busy:2:y")
+    lost.heartbeat_at = datetime.utcnow() - timedelta(minutes=5)
+    await db_session.commit()
+
+    assert await make_runner(test_engine).recover() == 1
+
+    await db_session.refresh(lost)
+    await db_session.refresh(alive)
+    assert lost.status == "failed"
+    assert alive.status == "queued"
+
+@pytest.mark.asyncio
+async def test_runner_heartbeats_its_unfinished_jobs(db_session, test_engine, create_test_user):
+    """Test the runner keeps refreshing the heartbeat of the jobs it holds."""
+    user = await create_test_user("jobber", "password123")
+    runner = make_runner(test_engine, heartbeat_interval=0.01)
+    release = asyncio.Event()
+
+    @runner.register("slow")
+    async def slow(db, job, progress):
+        await release.wait()
+
+    job = await JobRepository(db_session).create_job_in_db("slow", {}, user.id, runner.owner_id)
+    created_heartbeat = job.heartbeat_at
+    task = runner.submit(job)
+    await asyncio.sleep(0.1)
+
+    await db_session.refresh(job)
+    assert job.status == "running"
+    assert job.heartbeat_at > created_heartbeat
+
+    release.set()
+    await task
+    await runner.stop()
+
+@pytest.mark.asyncio
+async def test_started_runner_keeps_failing_lost_jobs(db_session, test_engine, create_test_user):
+    """Test the recovery sweep also fails jobs lost after startup, e.g. by a dead worker."""
+    user = await create_test_user("jobber", "password123")
+    runner = make_runner(test_engine, heartbeat_timeout=0.05)
+    runner.start()
+
+    job = await JobRepository(db_session).create_job_in_db(BULK_UPDATE_JOB, {"task_ids": [1]}, user.id, "gone:1:x")
+    await asyncio.sleep(0.3)
+    await runner.stop()
+
+    await db_session.refresh(job)
+    assert job.status == "failed"
@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from app.core.loader import DataLoader, loaders_for
+from app.repositories.task import TaskRepository
+from app.schemas.task import TaskCreate
+
+def counting_loader(values):
+    """A loader over values that records the keys of every batch it runs."""
+    batches = []
+    async def batch(keys):
+        batches.append(sorted(keys))
+        return {key: values[key] for key in keys if key in values}
+    return DataLoader(batch), batches
+
+@pytest.mark.asyncio
+async def test_loads_in_one_tick_share_a_batch():
+    """Test concurrent loads are merged into one batch and memoized afterwards."""
+    loader, batches = counting_loader({1: "one", 2: "two"})
+
+    assert await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(3)) == ["one", "two", "one", None]
+    assert await loader.load_many([2, 3]) == ["two", None]
+    assert batches == [[1, 2, 3]]
+
+    loader.clear(2)
+    loader.prime(4, "four")
+    assert await loader.load_many([2, 4]) == ["two", "four"]
+    assert batches == [[1, 2, 3], [2]]
+
+@pytest.mark.asyncio
+async def test_running_batch_is_referenced_until_done():
+    """Test the loader holds its in-flight dispatch task, so it can't be garbage collected."""
+    release = asyncio.Event()
+    async def batch(keys):
+        await release.wait()
+        return {key: key for key in keys}
+    loader = DataLoader(batch)
+
+    future = loader.load(1)
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert len(loader._dispatches) == 1
+
+    release.set()
+    assert await future == 1
+    await asyncio.sleep(0)
+    assert not loader._dispatches
+
+@pytest.mark.asyncio
+async def test_key_cleared_before_its_batch_still_resolves():
+    """Test clearing a key whose load is still queued neither hangs the load nor repeats the key."""
+    loader, batches = counting_loader({1: "one"})
+
+    first = loader.load(1)
+    loader.clear(1)
+    second = loader.load(1)
+
+    assert await asyncio.wait_for(asyncio.gather(first, second), timeout=1) == ["one", "one"]
+    assert batches == [[1]]
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_not_memoized():
+    """Test a failing batch fails its loads and the keys are retried by the next load."""
+    calls = []
+    async def batch(keys):
+        calls.append(keys)
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+        return {key: key * 10 for key in keys}
+    loader = DataLoader(batch)
+
+    with pytest.raises(RuntimeError):
+        await loader.load(1)
+    assert await loader.load(1) == 10
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_repositories_share_the_session_loaders(db_session, create_test_user):
+    """Test enrichment reads users through the session's loaders, and writes drop stale tasks."""
+    user = await create_test_user("loaded", "password123")
+    user_id = user.id
+    repo = TaskRepository(db_session)
+    task = await repo.create_task_in_db(TaskCreate(title="Cached", assigned_to=user_id), user_id)
+    task_id = task.id
+
+    assert repo.loaders is loaders_for(db_session)
+    assert (await repo.enrich_tasks_with_usernames([task]))[0].assigned_to == "loaded"
+    assert (await repo.get_task_by_id_in_db(task_id)).title == "Cached"
+
+    await repo.patch_task_in_db(task_id, {"title": "Renamed"}, user_id)
+    assert (await TaskRepository(db_session).get_task_by_id_in_db(task_id)).title == "Renamed"
@@ -0,0 +1,74 @@
+import sqlite3
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+from app.models.base import Base
+from app.models.task import Task
+import app.core.migrations as migrations
+
+@pytest.fixture
+def alembic_config(tmp_path, monkeypatch):
+    """Alembic config pointing at a throwaway SQLite database, with backfill throttling off."""
+    monkeypatch.setattr(migrations, "MIGRATION_BATCH_SIZE", 2)
+    monkeypatch.setattr(migrations, "MIGRATION_BATCH_PAUSE_SECONDS", 0)
+    database = tmp_path / "migrations.db"
+    config = Config()
+    config.set_main_option("script_location", "migrations")
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{database}")
+    config.attributes["database"] = str(database)
+    return config
+
+def test_migrations_match_models(alembic_config):
+    """Test upgrading to head yields the schema the models describe."""
+    command.upgrade(alembic_config, "head")
+
+    engine = create_engine(f"sqlite:///{alembic_config.attributes['database']}")
+    with engine.connect() as connection:
+        context = MigrationContext.configure(
+            connection, opts={"include_name": lambda name, type_, parents: name != "migration_history"}
+        )
+        diff = compare_metadata(context, Base.metadata)
+    engine.dispose()
+
+    assert diff == []
+
+def test_upgrade_backfills_existing_rows_and_records_timings(alembic_config):
+    """Test data written before the upgrade gets its stats and counters backfilled."""
+    command.upgrade(alembic_config, "0001")
+    db = sqlite3.connect(alembic_config.attributes["database"])
+    db.execute("INSERT INTO users (id, username, email) VALUES (1, 'old', 'old@test.com')")
+    for task_id, priority in zip(range(1, 4), ("low", "urgent", "high")):
+        db.execute("INSERT INTO tasks (id, title, status, priority) VALUES (?, 'Old task', 'pending', ?)", (task_id, priority))
+    for created_at in ("2024-01-01 10:00:00", "2024-01-02 10:00:00"):
+        db.execute(
+            "INSERT INTO comments (content, created_at, task_id, user_id) VALUES ('Hi', ?, 3, 1)", (created_at,)
+        )
+    db.commit()
+
+    command.upgrade(alembic_config, "head")
+
+    assert db.execute("SELECT id, comments_count, last_commented_at, version FROM tasks ORDER BY id").fetchall() == [
+        (1, 0, None, 1),
+        (2, 0, None, 1),
+        (3, 2, "2024-01-02 10:00:00", 1),
+    ]
+    assert db.execute("SELECT count FROM task_counters WHERE dimension = 'status' AND key = 'pending'").fetchone() == (3,)
+    assert db.execute("SELECT priority_rank FROM tasks ORDER BY id").fetchall() == [(0,), (3,), (2,)]
+    history = db.execute("SELECT revision, direction, duration_seconds FROM migration_history").fetchall()
+    assert [row[0] for row in history] == ["0001", "0002", "0003", "0004", "0005", "0006", "0007", "0008", "0009", "0010", "0011", "0012", "0013", "0014", "0015"]
+    assert all(direction == "upgrade" and duration >= 0 for _, direction, duration in history)
+    db.close()
+
+def test_queue_index_covers_the_queue_on_postgres():
+    """Test ix_tasks_queue carries the queue's fixed-size columns as INCLUDE columns on Postgres."""
+    index = next(index for index in Task.__table__.indexes if index.name == "ix_tasks_queue")
+
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+    assert "INCLUDE (status, priority, created_at, updated_at, created_by, updated_by, comments_count, last_commented_at, version)" in ddl
+    assert "WHERE status NOT IN ('completed', 'cancelled')" in ddl
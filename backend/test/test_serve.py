@@ -0,0 +1,9 @@
+from app.serve import default_worker_count
+
+def test_worker_count_defaults_to_available_cpus(monkeypatch):
+    """Test the launcher runs one worker per usable CPU unless WEB_CONCURRENCY says otherwise."""
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert default_worker_count() >= 1
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert default_worker_count() == 3
@@ -1,6 +1,11 @@
 import pytest
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from app.schemas.task import TaskCreate, TaskUpdate, TaskBulkUpdate
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.jobs.task_stats import TaskStatsReconciler
+from app.repositories import task as task_repository
 from app.repositories.task import TaskRepository
 
 @pytest.mark.asyncio
@@ -182,6 +187,151 @@ async def test_get_all_tasks_in_db(db_session, create_test_user):
     assert len(second_page) >= 1
     assert first_page[0].id != second_page[0].id
 
+@pytest.mark.asyncio
+async def test_filter_tasks_in_db(db_session, create_test_user):
+    """Test filters combine, sort applies and statements are reused per filter shape."""
+    user = await create_test_user("task_filterer", "password123")
+    other = await create_test_user("task_assignee", "password123")
+    repo = TaskRepository(db_session)
+    now = datetime.utcnow()
+    for title, status, priority, due_in in [
+        ("Write report", "pending", "low", 1),
+        ("Review report", "in_progress", "urgent", 3),
+        ("Ship 100% done", "pending", "high", -1),
+        ("Archive", "completed", "medium", -2),
+    ]:
+        await repo.create_task_in_db(
+            TaskCreate(title=title, status=status, priority=priority, due_date=now + timedelta(days=due_in), assigned_to=other.id),
+            user.id,
+        )
+
+    open_tasks = await repo.filter_tasks_in_db(
+        {"status": ["pending", "in_progress"], "assigned_to": other.id}, sort=[("priority", True)]
+    )
+    assert [t.title for t in open_tasks] == ["Review report", "Ship 100% done", "Write report"]
+    assert open_tasks[0].assigned_to == "task_assignee"
+
+    reports = await repo.filter_tasks_in_db({"search": "%REPORT%", "due_after": now}, sort=[("due_date", True)], limit=1)
+    assert [t.title for t in reports] == ["Review report"]
+    assert [t.title for t in await repo.filter_tasks_in_db({"overdue": now})] == ["Ship 100% done"]
+    assert [t.title for t in await repo.filter_tasks_in_db({"search": "%100\\%%"})] == ["Ship 100% done"]
+
+    shapes = len(TaskRepository._filter_statements)
+    await repo.filter_tasks_in_db({"status": ["completed"], "assigned_to": user.id}, sort=[("priority", True)])
+    assert len(TaskRepository._filter_statements) == shapes
+
+@pytest.mark.asyncio
+async def test_filter_statement_cache_is_bounded(db_session, monkeypatch):
+    """Test the statement cache drops the least recently used shape once full."""
+    monkeypatch.setattr(TaskRepository, "_filter_statements", OrderedDict())
+    monkeypatch.setattr(task_repository, "FILTER_STATEMENT_CACHE_SIZE", 2)
+    repo = TaskRepository(db_session)
+
+    await repo.filter_tasks_in_db({}, sort=[("title", False)])
+    await repo.filter_tasks_in_db({}, sort=[("priority", False)])
+    await repo.filter_tasks_in_db({}, sort=[("title", False)])
+    await repo.filter_tasks_in_db({}, sort=[("due_date", False)])
+
+    sorts = [shape[1] for shape in TaskRepository._filter_statements]
+    assert sorts == [(("title", False),), (("due_date", False),)]
+
+@pytest.mark.asyncio
+async def test_get_next_tasks_in_db(db_session, create_test_user):
+    """Test the work queue orders open tasks by priority rank, then due date."""
+    user = await create_test_user("queue_owner", "password123")
+    repo = TaskRepository(db_session)
+    now = datetime.utcnow()
+    tasks = {}
+    for title, status, priority, due_in in [
+        ("Someday", "pending", "high", None),
+        ("Soon", "pending", "high", 1),
+        ("Later", "in_progress", "high", 5),
+        ("Minor", "pending", "low", 0),
+        ("Done", "completed", "urgent", 0),
+    ]:
+        due_date = now + timedelta(days=due_in) if due_in is not None else None
+        tasks[title] = await repo.create_task_in_db(
+            TaskCreate(title=title, status=status, priority=priority, due_date=due_date, assigned_to=user.id), user.id
+        )
+    assert tasks["Minor"].priority_rank == 0 and tasks["Soon"].priority_rank == 2
+
+    next_tasks = await repo.get_next_tasks_in_db(user.id, 3)
+    assert [t.title for t in next_tasks] == ["Soon", "Later", "Someday"]
+
+    await repo.patch_task_in_db(tasks["Minor"].id, {"priority": "urgent"}, user.id)
+    assert [t.title for t in await repo.get_next_tasks_in_db(user.id, 2)] == ["Minor", "Soon"]
+
+@pytest.mark.asyncio
+async def test_task_writes_append_history(db_session, create_test_user):
+    """Test every task write appends its changes to the task's history."""
+    user = await create_test_user("chronicler", "password123")
+    user_id = user.id
+    repo = TaskRepository(db_session)
+    first = await repo.create_task_in_db(TaskCreate(title="Draft", priority="high"), user_id)
+    second = await repo.create_task_in_db(TaskCreate(title="Other"), user_id)
+    first_id, second_id = first.id, second.id
+
+    await repo.patch_task_in_db(first_id, {"title": "Final"}, user_id)
+    await repo.update_task_status_in_db(first_id, "hold", user_id)
+    await repo.bulk_update_tasks_in_db([first_id, second_id], TaskBulkUpdate(task_ids=[first_id, second_id], status="pending"), user_id)
+    await repo.claim_next_task_in_db(user_id)
+    await repo.delete_task_in_db(first_id, user_id)
+
+    events = [event for event, _ in await repo.get_task_history_in_db(first_id, None, 10)]
+    assert [(e.event_type, e.version, e.changes, e.previous) for e in reversed(events)] == [
+        ("created", 1, {"title": "Draft", "description": None, "status": "pending", "priority": "high", "due_date": None, "assigned_to": None}, None),
+        ("updated", 2, {"title": "Final"}, {"title": "Draft"}),
+        ("status_changed", 3, {"status": "hold"}, {"status": "pending"}),
+        ("updated", 4, {"status": "pending"}, {"status": "hold"}),
+        ("claimed", 5, {"status": "in_progress", "assigned_to": user_id}, {"status": "pending", "assigned_to": None}),
+        ("deleted", 5, {}, {"title": "Final", "description": None, "status": "in_progress", "priority": "high", "due_date": None, "assigned_to": user_id}),
+    ]
+    older = await repo.get_task_history_in_db(first_id, events[2].id, 10)
+    assert [event.event_type for event, _ in older] == ["status_changed", "updated", "created"]
+    assert {username for _, username in older} == {"chronicler"}
+    assert [event.event_type for event, _ in await repo.get_task_history_in_db(second_id, None, 10)] == ["updated", "created"]
+
+@pytest.mark.asyncio
+async def test_filter_tasks_in_db_reads_only_requested_fields(db_session, create_test_user):
+    """Test a sparse fieldset selects only its columns and returns only its fields."""
+    user = await create_test_user("sparse", "password123")
+    user_id = user.id
+    repo = TaskRepository(db_session)
+    await repo.create_task_in_db(TaskCreate(title="Wide", description="x" * 10000, assigned_to=user_id), user_id)
+    fields = ("id", "title", "assigned_to")
+
+    statement = str(repo._filter_statement((), (), False, False, fields))
+    tasks = await repo.filter_tasks_in_db({}, fields=fields)
+
+    assert "description" not in statement and "created_by_username" not in statement
+    assert [t.model_dump(exclude_unset=True) for t in tasks] == [{"id": tasks[0].id, "title": "Wide", "assigned_to": "sparse"}]
+    next_tasks = await repo.get_next_tasks_in_db(user_id, 5, ("id", "priority"))
+    assert next_tasks[0].model_dump(exclude_unset=True) == {"id": tasks[0].id, "priority": "low"}
+
+@pytest.mark.asyncio
+async def test_claim_next_task_in_db(db_session, create_test_user):
+    """Test claiming hands out each unassigned pending task once, most important first."""
+    owner = await create_test_user("claim_owner", "password123")
+    worker = await create_test_user("claim_worker", "password123")
+    owner_id, worker_id = owner.id, worker.id
+    repo = TaskRepository(db_session)
+    for title, priority, assigned_to in [
+        ("Low", "low", None),
+        ("Urgent", "urgent", None),
+        ("Taken", "urgent", owner_id),
+        ("High", "high", None),
+    ]:
+        await repo.create_task_in_db(TaskCreate(title=title, priority=priority, assigned_to=assigned_to), owner_id)
+
+    claimed = [await repo.claim_next_task_in_db(worker_id) for _ in range(3)]
+
+    assert [t.title for t in claimed] == ["Urgent", "High", "Low"]
+    assert all(t.status == "in_progress" and t.assigned_to == "claim_worker" and t.version == 2 for t in claimed)
+    assert await repo.claim_next_task_in_db(worker_id) is None
+    stats = await repo.get_task_stats_in_db()
+    assert stats["by_status"] == {"pending": 1, "in_progress": 3}
+    assert stats["by_assignee"] == {str(owner_id): 1, str(worker_id): 3}
+
 @pytest.mark.asyncio
 async def test_get_tasks_created_by_user_in_db(db_session, create_test_user):
     """Test getting tasks created by specific user."""
@@ -414,3 +564,105 @@ async def test_enrich_tasks_with_missing_users(db_session, create_test_user):
     assert enriched_task.created_by == user.username
     assert enriched_task.updated_by == user.username
     assert enriched_task.assigned_to is None
+
+@pytest.mark.asyncio
+async def test_patch_task_in_db_only_touches_given_fields(db_session, create_test_user):
+    """Test patching a task changes only the given fields and returns the enriched row."""
+    creator = await create_test_user("patch_creator", "password123")
+    editor = await create_test_user("patch_editor", "password456")
+    repo = TaskRepository(db_session)
+
+    task_data = TaskCreate(
+        title="Patch Me",
+        description="Keep this",
+        priority="high",
+        status="in_progress",
+        assigned_to=creator.id
+    )
+    task = await repo.create_task_in_db(task_data, creator.id)
+
+    patched = await repo.patch_task_in_db(task.id, {"title": "Patched"}, editor.id)
+
+    assert patched.title == "Patched"
+    assert patched.description == "Keep this"
+    assert patched.priority == "high"
+    assert patched.status == "in_progress"
+    assert patched.created_by == creator.username
+    assert patched.updated_by == editor.username
+    assert patched.assigned_to == creator.username
+
+@pytest.mark.asyncio
+async def test_patch_task_in_db_not_found(db_session, create_test_user):
+    """Test patching a non-existent task."""
+    user = await create_test_user("patch_user", "password123")
+    repo = TaskRepository(db_session)
+
+    result = await repo.patch_task_in_db(99999, {"title": "Nope"}, user.id)
+    assert result is None
+
+@pytest.mark.asyncio
+async def test_update_task_in_db_version_conflict(db_session, create_test_user):
+    """Test a write conditional on a stale version is not applied."""
+    user = await create_test_user("version_user", "password123")
+    repo = TaskRepository(db_session)
+
+    task = await repo.create_task_in_db(TaskCreate(title="Versioned Task"), user.id)
+    assert task.version == 1
+
+    updated = await repo.update_task_in_db(task.id, TaskUpdate(title="First"), user.id, expected_version=1)
+    assert updated.version == 2
+
+    stale = await repo.update_task_in_db(task.id, TaskUpdate(title="Stale"), user.id, expected_version=1)
+    assert stale is None
+    assert await repo.update_task_status_in_db(task.id, "completed", user.id, expected_version=1) is None
+    assert await repo.patch_task_in_db(task.id, {"title": "Stale"}, user.id, expected_version=1) is None
+
+    patched = await repo.patch_task_in_db(task.id, {"title": "Second"}, user.id, expected_version=2)
+    assert patched.title == "Second"
+    assert patched.version == 3
+
+@pytest.mark.asyncio
+async def test_task_stats_follow_writes(db_session, create_test_user):
+    """Test the stats counters stay in step with every kind of task write."""
+    user = await create_test_user("stats_user", "password123")
+    repo = TaskRepository(db_session)
+
+    first = await repo.create_task_in_db(TaskCreate(title="First", priority="high"), user.id)
+    second = await repo.create_task_in_db(
+        TaskCreate(title="Second", due_date=datetime.utcnow() - timedelta(days=1)), user.id
+    )
+    third = await repo.create_task_in_db(TaskCreate(title="Third"), user.id)
+    await repo.patch_task_in_db(first.id, {"assigned_to": user.id}, user.id)
+    await repo.update_task_in_db(third.id, TaskUpdate(title="Third!", priority="urgent"), user.id)
+    await repo.update_task_status_in_db(second.id, "in_progress", user.id)
+    await repo.bulk_update_tasks_in_db([first.id, third.id], TaskBulkUpdate(task_ids=[], priority="low"), user.id)
+    await repo.delete_task_in_db(third.id)
+
+    stats = await repo.get_task_stats_in_db()
+
+    assert stats["total"] == 2
+    assert stats["by_status"] == {"pending": 1, "in_progress": 1}
+    assert stats["by_priority"] == {"low": 2}
+    assert stats["by_assignee"] == {str(user.id): 1, "unassigned": 1}
+    assert stats["overdue"] == 1
+
+@pytest.mark.asyncio
+async def test_reconcile_task_counters_repairs_drift(db_session, test_engine, create_test_user):
+    """Test the in-app reconciler rebuilds the counters from the tasks table."""
+    user = await create_test_user("stats_user", "password123")
+    repo = TaskRepository(db_session)
+    for status in ("pending", "pending", "completed"):
+        await repo.create_task_in_db(TaskCreate(title="Task", status=status), user.id)
+    expected = await repo.get_task_stats_in_db()
+
+    # Simulate drift
+    await repo.counters.apply_change(None, {"status": "cancelled", "priority": "urgent", "assigned_to": None})
+    await db_session.commit()
+    assert (await repo.get_task_stats_in_db())["total"] == 4
+
+    reconciler = TaskStatsReconciler(
+        session_factory=sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    assert await reconciler.reconcile_once() > 0
+
+    assert await repo.get_task_stats_in_db() == expected
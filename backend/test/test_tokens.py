@@ -0,0 +1,120 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from app.core.auth import create_access_token, get_user_from_token, revoke_token
+from app.core.denylist import TokenDenylist
+from app.repositories.auth import AuthRepository
+from app.repositories.token import RefreshTokenRepository, RevokedTokenRepository
+from app.services.auth import AuthService
+import app.core.auth as auth
+
+def make_auth_service(db_session):
+    return AuthService(AuthRepository(db_session), RefreshTokenRepository(db_session))
+
+@pytest.mark.asyncio
+async def test_access_tokens_get_unique_ids(db_session, create_test_user):
+    """Test every issued token carries its own jti."""
+    user = await create_test_user("tokenuser", "password123")
+    first = create_access_token({"sub": user.username})
+    second = create_access_token({"sub": user.username})
+
+    assert first != second
+    assert (await get_user_from_token(first, db_session)).id == user.id
+
+@pytest.mark.asyncio
+async def test_revoked_token_is_rejected(db_session, create_test_user, monkeypatch):
+    """Test a revoked token stops authenticating while other tokens keep working."""
+    monkeypatch.setattr(auth, "token_denylist", TokenDenylist())
+    user = await create_test_user("tokenuser", "password123")
+    revoked = create_access_token({"sub": user.username})
+    other = create_access_token({"sub": user.username})
+
+    assert (await revoke_token(revoked, db_session))["sub"] == user.username
+
+    with pytest.raises(HTTPException) as exc:
+        await get_user_from_token(revoked, db_session)
+    assert exc.value.status_code == 401
+    assert (await get_user_from_token(other, db_session)).id == user.id
+
+@pytest.mark.asyncio
+async def test_denylist_is_shared_through_the_database(db_session):
+    """Test a revocation made by one worker reaches another on its next sync."""
+    worker_a = TokenDenylist(sync_interval=60)
+    worker_b = TokenDenylist(sync_interval=60)
+    assert await worker_b.is_revoked(db_session, "abc") is False
+
+    await worker_a.revoke(db_session, "abc", datetime.utcnow() + timedelta(minutes=5))
+
+    # Still within worker B's sync interval: no database round trip
+    assert await worker_b.is_revoked(db_session, "abc") is False
+    await worker_b.sync(db_session)
+    assert await worker_b.is_revoked(db_session, "abc") is True
+
+@pytest.mark.asyncio
+async def test_denylist_forgets_expired_tokens(db_session):
+    """Test entries for tokens past their expiry are dropped from memory."""
+    denylist = TokenDenylist(sync_interval=0)
+    await denylist.revoke(db_session, "old", datetime.utcnow() - timedelta(seconds=1))
+    await denylist.revoke(db_session, "new", datetime.utcnow() + timedelta(minutes=5))
+
+    assert await denylist.is_revoked(db_session, "old") is False
+    assert set(denylist._entries) == {"new"}
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_the_token(db_session, create_test_user):
+    """Test a refresh token is exchanged for a new one in the same session."""
+    user = await create_test_user("tokenuser", "password123")
+    service = make_auth_service(db_session)
+    first, session_id = await service.start_session(user)
+
+    refreshed_user, second, refreshed_session_id = await service.refresh_session(first)
+
+    assert refreshed_user.id == user.id
+    assert second != first
+    assert refreshed_session_id == session_id
+    # Only the digest is stored
+    assert await RefreshTokenRepository(db_session).get_refresh_token_by_hash_in_db(first) is None
+
+@pytest.mark.asyncio
+async def test_refresh_token_reuse_revokes_the_session(db_session, create_test_user):
+    """Test presenting an already exchanged refresh token invalidates the whole session."""
+    user = await create_test_user("tokenuser", "password123")
+    service = make_auth_service(db_session)
+    first, _ = await service.start_session(user)
+    _, second, _ = await service.refresh_session(first)
+    other_session, _ = await service.start_session(user)
+
+    with pytest.raises(HTTPException) as exc:
+        await service.refresh_session(first)
+    assert exc.value.status_code == 401
+
+    # The legitimate successor is revoked too, other sessions are untouched
+    with pytest.raises(HTTPException):
+        await service.refresh_session(second)
+    assert (await service.refresh_session(other_session))[0].id == user.id
+
+@pytest.mark.asyncio
+async def test_end_session_revokes_refresh_tokens(db_session, create_test_user):
+    """Test ending a session makes its refresh token unusable."""
+    user = await create_test_user("tokenuser", "password123")
+    service = make_auth_service(db_session)
+    refresh_token, session_id = await service.start_session(user)
+
+    await service.end_session(session_id)
+
+    with pytest.raises(HTTPException):
+        await service.refresh_session(refresh_token)
+
+@pytest.mark.asyncio
+async def test_end_session_prunes_expired_tokens(db_session, create_test_user):
+    """Test a logout also drops revoked tokens that have expired from the table."""
+    user = await create_test_user("tokenuser", "password123")
+    service = make_auth_service(db_session)
+    _, session_id = await service.start_session(user)
+    denylist = TokenDenylist()
+    await denylist.revoke(db_session, "old", datetime.utcnow() - timedelta(seconds=1))
+    await denylist.revoke(db_session, "new", datetime.utcnow() + timedelta(minutes=5))
+
+    await service.end_session(session_id)
+
+    assert set(await RevokedTokenRepository(db_session).get_active_revoked_tokens_in_db(datetime.min)) == {"new"}
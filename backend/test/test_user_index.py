@@ -0,0 +1,59 @@
+import pytest
+from app.core.user_index import UserPrefixIndex
+from app.repositories.auth import AuthRepository
+from app.schemas.auth import UserCreate
+import app.repositories.auth as auth_repository
+
+def make_index():
+    index = UserPrefixIndex()
+    index.load([
+        (1, "jo", "Joanna Smith"),
+        (2, "john", "John Doe"),
+        (3, "alice", "Alice Johnson"),
+        (4, "bob", None),
+    ])
+    return index
+
+def test_suggest_ranks_usernames_before_full_names():
+    """Test username matches come first, then matches on any word of the full name."""
+    index = make_index()
+
+    assert [user_id for user_id, _, _ in index.suggest("JO")] == [1, 2, 3]
+    assert index.suggest("smi") == [(1, "jo", "Joanna Smith")]
+    assert index.suggest("jo", limit=2) == [(1, "jo", "Joanna Smith"), (2, "john", "John Doe")]
+    assert index.suggest("zz") == []
+    assert index.suggest("  ") == []
+
+def test_upsert_and_remove_update_the_index():
+    """Test incremental updates, including deactivated users dropping out."""
+    index = make_index()
+
+    index.upsert(2, "johnny", "Johnny Walker")
+    assert index.suggest("doe") == []
+    assert index.suggest("walk") == [(2, "johnny", "Johnny Walker")]
+
+    index.upsert(3, "alice", "Alice Johnson", is_active=False)
+    assert [user_id for user_id, _, _ in index.suggest("jo")] == [1, 2]
+
+    index.remove(1)
+    index.remove(99)
+    assert index.suggest("jo") == [(2, "johnny", "Johnny Walker")]
+
+@pytest.mark.asyncio
+async def test_auth_repository_keeps_index_current(db_session, monkeypatch):
+    """Test users created, updated and deleted through the repository reach the index."""
+    index = UserPrefixIndex()
+    monkeypatch.setattr(auth_repository, "user_index", index)
+    repo = AuthRepository(db_session)
+
+    user = await repo.create_user_in_db(
+        UserCreate(username="maria", email="maria@test.com", full_name="Maria Lopez", password="secret")
+    )
+    assert index.suggest("lop") == [(user.id, "maria", "Maria Lopez")]
+
+    await repo.update_user_in_db(user.id, {"full_name": "Maria Garcia"})
+    assert index.suggest("lop") == []
+    assert index.suggest("gar") == [(user.id, "maria", "Maria Garcia")]
+
+    await repo.delete_user_in_db(user.id)
+    assert index.suggest("mar") == []
@@ -0,0 +1,162 @@
+import json
+from datetime import datetime, timedelta
+import httpx
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.jobs.webhooks import WebhookDispatcher
+from app.models.outbox import OutboxEvent
+from app.repositories.comment import CommentRepository
+from app.repositories.task import TaskRepository
+from app.repositories.webhook import WebhookRepository
+from app.schemas.comment import TaskCommentCreate
+from app.schemas.task import TaskCreate
+from app.schemas.webhook import WebhookCreate
+
+def make_dispatcher(test_engine, handler, **kwargs):
+    """Build a dispatcher on the test database that POSTs to a local mock transport."""
+    session_factory = sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    kwargs.setdefault("visibility_lag", 0)
+    return WebhookDispatcher(session_factory=session_factory, client=client, **kwargs)
+
+async def outbox_count(db_session):
+    return (await db_session.execute(select(func.count(OutboxEvent.id)))).scalar()
+
+@pytest.mark.asyncio
+async def test_writes_stage_outbox_events(db_session, create_test_user):
+    """Test task and comment writes record outbox events in the same transaction."""
+    user = await create_test_user("hooked", "password123")
+    task_repo = TaskRepository(db_session)
+    comment_repo = CommentRepository(db_session)
+    task = await task_repo.create_task_in_db(TaskCreate(title="Outboxed"), user.id)
+    task_id = task.id
+    await task_repo.update_task_status_in_db(task_id, "completed", user.id)
+    await comment_repo.add_comment_to_task_in_db(task_id, TaskCommentCreate(content="Hi"), user.id)
+    # A comment on a missing task is rolled back together with its event
+    await comment_repo.add_comment_to_task_in_db(99999, TaskCommentCreate(content="Lost"), user.id)
+
+    result = await db_session.execute(select(OutboxEvent).order_by(OutboxEvent.id))
+    events = result.scalars().all()
+
+    assert [e.event_type for e in events] == ["task.created", "task.status_changed", "comment.created"]
+    assert events[0].aggregate_id == task_id
+    assert events[1].payload["status"] == "completed"
+    assert events[2].aggregate_type == "comment"
+
+@pytest.mark.asyncio
+async def test_dispatcher_delivers_batches_in_order(db_session, test_engine, create_test_user):
+    """Test an endpoint receives its pending events in id order, batch by batch."""
+    user = await create_test_user("hooked", "password123")
+    webhook = await WebhookRepository(db_session).create_webhook_in_db(WebhookCreate(url="http://hooks.test/a"))
+    task_repo = TaskRepository(db_session)
+    for i in range(5):
+        await task_repo.create_task_in_db(TaskCreate(title=f"Task {i}"), user.id)
+
+    batches = []
+    def handler(request):
+        batches.append(json.loads(request.content)["events"])
+        return httpx.Response(200)
+    dispatcher = make_dispatcher(test_engine, handler, batch_size=2)
+
+    assert await dispatcher.dispatch_once() == 2
+    assert await dispatcher.dispatch_once() == 2
+    assert await dispatcher.dispatch_once() == 1
+    assert await dispatcher.dispatch_once() == 0
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    ids = [event["id"] for batch in batches for event in batch]
+    assert ids == sorted(ids)
+    assert [event["data"]["title"] for batch in batches for event in batch] == [f"Task {i}" for i in range(5)]
+
+    await db_session.refresh(webhook)
+    assert webhook.last_event_id == ids[-1]
+    # Every endpoint acknowledged everything, so the outbox has been pruned
+    assert await outbox_count(db_session) == 0
+
+@pytest.mark.asyncio
+async def test_dispatcher_backs_off_and_retries_failed_batch(db_session, test_engine, create_test_user):
+    """Test a failing endpoint keeps its cursor, backs off and gets the same batch again."""
+    user = await create_test_user("hooked", "password123")
+    webhook_repo = WebhookRepository(db_session)
+    flaky = await webhook_repo.create_webhook_in_db(WebhookCreate(url="http://hooks.test/flaky"))
+    healthy = await webhook_repo.create_webhook_in_db(WebhookCreate(url="http://hooks.test/healthy"))
+    await TaskRepository(db_session).create_task_in_db(TaskCreate(title="Retried"), user.id)
+
+    responses = {"flaky": [500, 200]}
+    delivered = []
+    def handler(request):
+        if request.url.path == "/flaky":
+            status = responses["flaky"].pop(0)
+        else:
+            status = 200
+        if status == 200:
+            delivered.append(request.url.path)
+        return httpx.Response(status)
+    # The in-memory test database is a single shared connection, so deliver one endpoint at a time
+    dispatcher = make_dispatcher(test_engine, handler, base_backoff=60, max_concurrency=1)
+
+    assert await dispatcher.dispatch_once() == 1
+    assert delivered == ["/healthy"]
+    await db_session.refresh(flaky)
+    assert flaky.failure_count == 1
+    assert flaky.next_attempt_at is not None
+    assert flaky.last_error
+    # The flaky endpoint still holds back the shared outbox
+    assert await outbox_count(db_session) == 1
+
+    # Not due yet: backoff keeps it out of the next round
+    assert await dispatcher.dispatch_once() == 0
+    assert delivered == ["/healthy"]
+
+    await webhook_repo.record_failure_in_db(flaky.id, "forced due", flaky.created_at)
+    assert await dispatcher.dispatch_once() == 1
+    assert delivered == ["/healthy", "/flaky"]
+    await db_session.refresh(flaky)
+    await db_session.refresh(healthy)
+    assert flaky.failure_count == 0
+    assert flaky.next_attempt_at is None
+    assert flaky.last_event_id == healthy.last_event_id
+    assert await outbox_count(db_session) == 0
+
+@pytest.mark.asyncio
+async def test_dispatcher_stops_at_the_visibility_horizon(db_session, test_engine, create_test_user):
+    """Test events younger than the lag, and every id after them, wait for a later round."""
+    user = await create_test_user("hooked", "password123")
+    webhook = await WebhookRepository(db_session).create_webhook_in_db(WebhookCreate(url="http://hooks.test/a"))
+    task_repo = TaskRepository(db_session)
+    for i in range(3):
+        await task_repo.create_task_in_db(TaskCreate(title=f"Task {i}"), user.id)
+    events = (await db_session.execute(select(OutboxEvent).order_by(OutboxEvent.id))).scalars().all()
+    # The middle event is fresh: ids after it may still be joined by slower transactions
+    for event, age in zip(events, (600, 0, 600)):
+        event.created_at = datetime.utcnow() - timedelta(seconds=age)
+    await db_session.commit()
+
+    delivered = []
+    def handler(request):
+        delivered.extend(event["id"] for event in json.loads(request.content)["events"])
+        return httpx.Response(200)
+    dispatcher = make_dispatcher(test_engine, handler, visibility_lag=60)
+
+    assert await dispatcher.dispatch_once() == 1
+    assert await dispatcher.dispatch_once() == 0
+    assert delivered == [events[0].id]
+    await db_session.refresh(webhook)
+    assert webhook.last_event_id == events[0].id
+    # Nothing past the horizon is pruned
+    assert await outbox_count(db_session) == 2
+
+    dispatcher.visibility_lag = 0
+    assert await dispatcher.dispatch_once() == 2
+    assert delivered == [event.id for event in events]
+    assert await outbox_count(db_session) == 0
+
+def test_backoff_grows_exponentially_up_to_the_cap():
+    """Test the retry delay doubles per failure, with jitter, and never exceeds the cap."""
+    dispatcher = WebhookDispatcher(base_backoff=1, max_backoff=30)
+
+    assert 0.5 <= dispatcher.backoff_delay(1) <= 1
+    assert 4 <= dispatcher.backoff_delay(4) <= 8
+    assert 15 <= dispatcher.backoff_delay(20) <= 30
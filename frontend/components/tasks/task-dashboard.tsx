@@ -90,16 +90,28 @@ export function TaskDashboard({ onLogout }: TaskDashboardProps) {
   const fetchUsers = async () => {
     try {
       const token = localStorage.getItem("token")
-      const response = await fetch("http://localhost:8000/users/getall", {
-        headers: {
-          Authorization: `Bearer ${token}`,
-        },
-      })
-
-      if (response.ok) {
-        const data = await response.json()
-        setUsers(data)
-      }
+      // GET /users is paginated: follow next_cursor until the last page
+      const allUsers: User[] = []
+      let cursor: string | null = null
+      do {
+        const params = new URLSearchParams({ limit: "200" })
+        if (cursor) {
+          params.set("cursor", cursor)
+        }
+        const response = await fetch(`http://localhost:8000/users?${params}`, {
+          headers: {
+            Authorization: `Bearer ${token}`,
+          },
+        })
+        if (!response.ok) {
+          return
+        }
+        const page: { items: User[]; next_cursor: string | null } = await response.json()
+        allUsers.push(...page.items)
+        cursor = page.next_cursor
+      } while (cursor)
+
+      setUsers(allUsers)
     } catch (error) {
       console.error("Failed to fetch users:", error)
     }